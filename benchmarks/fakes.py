@@ -0,0 +1,495 @@
+"""부하 테스트용 인프로세스 가짜 외부 서비스 (Gemini Live, Pinecone, GCS, MongoDB, 분석 서버)
+
+실제 서비스 코드(SessionManager, memory_service, audio_service, recording_job_queue)는 그대로 두고
+그 아래의 외부 클라이언트만 설정 가능한 지연을 가진 가짜로 바꿉니다. 블로킹 클라이언트(Pinecone, GCS)는
+실제처럼 time.sleep으로, 비동기 클라이언트(Gemini, Motor, 분석 서버 httpx)는 asyncio.sleep으로 지연을 흉내 냅니다.
+"""
+import json
+import time
+import uuid
+import asyncio
+import hashlib
+import logging
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+MODEL_SAMPLE_RATE = 24000
+
+@dataclass
+class FakeProfile:
+    """가짜 서비스 동작과 지연 설정"""
+    utterance_seconds: float = 2.0     # 이만큼의 사용자 오디오를 받으면 한 턴으로 보고 응답
+    first_audio_delay: float = 0.3     # 발화 끝에서 첫 모델 오디오까지 (도구 호출 제외)
+    reply_seconds: float = 3.0         # 모델 응답 오디오 길이
+    reply_chunk_ms: int = 40           # 모델 오디오 청크 길이
+    reply_speed: float = 2.0           # 실시간 대비 모델 오디오 생성 속도
+    tool_every: int = 3                # N번째 턴마다 search_memories 도구 호출 (0이면 안 함)
+    go_away_after_turns: int = 0       # 한 연결에서 N턴 후 go_away 전송 (세션 재개 확인용, 0이면 안 함)
+    go_away_time_left: float = 10.0    # go_away의 종료까지 남은 시간(초)
+    embed_latency: float = 0.05
+    query_latency: float = 0.03
+    gcs_write_latency: float = 0.002
+    mongo_latency: float = 0.005
+    analysis_latency: float = 0.05
+    dimension: int = 1024
+
+    @property
+    def utterance_bytes(self) -> int:
+        return int(self.utterance_seconds * 16000) * 2
+
+def _sine_pcm(seconds: float, sample_rate: int, frequency: float = 220.0) -> bytes:
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    return (8000 * np.sin(2 * np.pi * frequency * t)).astype("<i2").tobytes()
+
+# --- Gemini Live ---
+
+class FakeLiveSession:
+    """client.aio.live.connect()가 돌려주는 세션의 가짜
+
+    받은 발화 오디오(무음 제외)가 utterance_seconds만큼 쌓이면 입력 전사, (필요하면) 도구 호출, 모델 오디오와 출력 전사,
+    turn_complete 순서로 응답합니다. receive()는 실제 SDK처럼 turn_complete까지만 내보내고 끝납니다.
+    세션 재개가 설정되어 있으면 턴마다 재개 핸들을 보내고, go_away_after_turns 턴 후에는 go_away를 보냅니다.
+    """
+
+    def __init__(self, profile: FakeProfile, reply_chunk: bytes, resumable: bool = False):
+        self.profile = profile
+        self._reply_chunk = reply_chunk
+        self._resumable = resumable
+        self._responses: asyncio.Queue = asyncio.Queue()
+        self._received = 0
+        self._responding: Optional[asyncio.Task] = None
+        self._tool_response = asyncio.Event()
+        self._closed = False
+        self.turns = 0
+
+    async def send_realtime_input(self, media=None, audio_stream_end: Optional[bool] = None, **kwargs):
+        if self._closed:
+            raise ConnectionError("가짜 Gemini 연결이 닫혔습니다.")
+        if media is None:
+            return
+        data = media["data"] if isinstance(media, dict) else media.data
+        # 발화만 센다: 응답 중에 들어온 오디오와 무음(모두 0인) 프레임은 발화 길이에 넣지 않음
+        if self._responding is not None or not data.strip(b"\0"):
+            return
+        self._received += len(data)
+        if self._received >= self.profile.utterance_bytes:
+            self._responding = asyncio.create_task(self._respond())
+
+    async def send_tool_response(self, function_responses=None, **kwargs):
+        self._tool_response.set()
+
+    async def receive(self):
+        while True:
+            message = await self._responses.get()
+            if message is None:  # 연결 닫힘
+                return
+            yield message
+            if message.server_content and message.server_content.turn_complete:
+                return
+
+    async def _respond(self):
+        try:
+            self.turns += 1
+            self._put(server_content=types.LiveServerContent(
+                input_transcription=types.Transcription(text=f"사용자 발화 {self.turns}")
+            ))
+
+            if self.profile.tool_every and self.turns % self.profile.tool_every == 0:
+                self._tool_response.clear()
+                self._put(tool_call=types.LiveServerToolCall(function_calls=[types.FunctionCall(
+                    id=str(uuid.uuid4()), name="search_memories", args={"query": f"기억 {self.turns}"}
+                )]))
+                await asyncio.wait_for(self._tool_response.wait(), timeout=10)
+
+            await asyncio.sleep(self.profile.first_audio_delay)
+            chunk_seconds = self.profile.reply_chunk_ms / 1000
+            for index in range(max(1, int(self.profile.reply_seconds / chunk_seconds))):
+                self._put(server_content=types.LiveServerContent(
+                    model_turn=types.Content(role="model", parts=[types.Part(inline_data=types.Blob(
+                        data=self._reply_chunk, mime_type=f"audio/pcm;rate={MODEL_SAMPLE_RATE}"
+                    ))]),
+                    output_transcription=types.Transcription(text="응답 ") if index % 10 == 0 else None,
+                ))
+                await asyncio.sleep(chunk_seconds / self.profile.reply_speed)
+            self._put(server_content=types.LiveServerContent(turn_complete=True))
+            if self._resumable:
+                self._put(session_resumption_update=types.LiveServerSessionResumptionUpdate(
+                    new_handle=f"fake-handle-{uuid.uuid4().hex}", resumable=True
+                ))
+            if self.profile.go_away_after_turns and self.turns == self.profile.go_away_after_turns:
+                self._put(go_away=types.LiveServerGoAway(time_left=f"{self.profile.go_away_time_left}s"))
+        except Exception as e:
+            logger.error(f"가짜 Gemini 응답 중 오류: {e}")
+        finally:
+            self._received = 0
+            self._responding = None
+
+    def _put(self, **kwargs):
+        self._responses.put_nowait(types.LiveServerMessage(**kwargs))
+
+    async def close(self):
+        self._closed = True
+        if self._responding:
+            self._responding.cancel()
+        self._responses.put_nowait(None)
+
+class _FakeConnection:
+    def __init__(self, live: "FakeLive", config: Any):
+        self._live = live
+        self._config = config
+        self._session: Optional[FakeLiveSession] = None
+
+    async def __aenter__(self) -> FakeLiveSession:
+        resumption = getattr(self._config, "session_resumption", None)
+        self._session = FakeLiveSession(self._live.profile, self._live.reply_chunk, resumable=resumption is not None)
+        self._live.connections += 1
+        if resumption is not None and resumption.handle:
+            self._live.resumed_connections += 1
+        return self._session
+
+    async def __aexit__(self, *exc_info):
+        await self._session.close()
+
+class FakeLive:
+    def __init__(self, profile: FakeProfile):
+        self.profile = profile
+        self.reply_chunk = _sine_pcm(profile.reply_chunk_ms / 1000, MODEL_SAMPLE_RATE)
+        self.connections = 0
+        self.resumed_connections = 0
+
+    def connect(self, model: str = None, config: Any = None) -> _FakeConnection:
+        return _FakeConnection(self, config)
+
+class FakeGenaiClient:
+    """genai.Client 중 세션이 사용하는 client.aio.live만 흉내 냄"""
+
+    def __init__(self, profile: FakeProfile):
+        self.aio = SimpleNamespace(live=FakeLive(profile))
+
+# --- Pinecone ---
+
+class FakePinecone:
+    """pinecone.inference.embed만 흉내 냄 (텍스트 해시로 만든 결정적 임베딩)"""
+
+    def __init__(self, profile: FakeProfile):
+        self.profile = profile
+        self.inference = self
+        self.calls = 0
+
+    def embed(self, model: str, inputs: List[str], parameters: Dict[str, Any] = None):
+        self.calls += 1
+        time.sleep(self.profile.embed_latency)
+        return [SimpleNamespace(values=self.vector(text)) for text in inputs]
+
+    def vector(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:8], "little")
+        values = np.random.default_rng(seed).standard_normal(self.profile.dimension)
+        return (values / np.linalg.norm(values)).astype(np.float32).tolist()
+
+class FakeVectorStore:
+    """VectorStore 인터페이스의 메모리 구현 (조회 지연 포함)"""
+
+    def __init__(self, profile: FakeProfile):
+        self.profile = profile
+        self._vectors: Dict[str, Dict[str, Any]] = {}
+
+    def setup(self) -> None:
+        pass
+
+    def warm_up(self) -> None:
+        pass
+
+    def query(self, vector: List[float], top_k: int, user_id: Optional[str] = None):
+        from services.vector_store import MemorySearchResult
+        time.sleep(self.profile.query_latency)
+        candidates = [v for v in self._vectors.values() if user_id is None or v["metadata"].get("user_id") == user_id]
+        if not candidates:
+            return []
+        matrix = np.asarray([c["values"] for c in candidates], dtype=np.float32)
+        scores = matrix @ np.asarray(vector, dtype=np.float32)
+        order = np.argsort(-scores)[:top_k]
+        return [
+            MemorySearchResult(score=float(scores[i]), metadata=candidates[i]["metadata"])
+            for i in order
+        ]
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        time.sleep(self.profile.query_latency)
+        for vector in vectors:
+            self._vectors[vector["id"]] = vector
+
+    def fetch_user_vectors(self, user_id: str, limit: int):
+        time.sleep(self.profile.query_latency)
+        records = [(v["id"], v["values"], v["metadata"]) for v in self._vectors.values()
+                   if v["metadata"].get("user_id") == user_id]
+        return records[:limit]
+
+    def close(self) -> None:
+        pass
+
+# --- Google Cloud Storage ---
+
+class _FakeBlobWriter:
+    def __init__(self, blob: "FakeBlob"):
+        self._blob = blob
+
+    def write(self, data: bytes) -> int:
+        time.sleep(self._blob.bucket.profile.gcs_write_latency)
+        self._blob.size += len(data)
+        return len(data)
+
+    def close(self):
+        self._blob.bucket.objects[self._blob.name] = self._blob.size
+
+class FakeBlob:
+    """저장 내용 대신 크기만 기록하는 블롭"""
+
+    def __init__(self, bucket: "FakeBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+        self.size = bucket.objects.get(name, 0)
+
+    def open(self, mode: str = "wb", **kwargs) -> _FakeBlobWriter:
+        self.size = 0
+        return _FakeBlobWriter(self)
+
+    def exists(self) -> bool:
+        return self.name in self.bucket.objects
+
+    def reload(self):
+        self.size = self.bucket.objects.get(self.name, 0)
+
+    def upload_from_string(self, data: bytes, **kwargs):
+        self.bucket.objects[self.name] = len(data)
+
+    def upload_from_filename(self, path: str, **kwargs):
+        import os
+        time.sleep(self.bucket.profile.gcs_write_latency)
+        self.bucket.objects[self.name] = os.path.getsize(path)
+
+    def compose(self, sources: List["FakeBlob"]):
+        self.bucket.objects[self.name] = sum(self.bucket.objects.get(s.name, 0) for s in sources)
+
+    def delete(self):
+        self.bucket.objects.pop(self.name, None)
+
+class FakeBucket:
+    def __init__(self, name: str, profile: FakeProfile):
+        self.name = name
+        self.profile = profile
+        self.objects: Dict[str, int] = {}
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self, name)
+
+    def reload(self):
+        pass
+
+class FakeStorageClient:
+    def __init__(self, profile: FakeProfile):
+        self.profile = profile
+        self.buckets: Dict[str, FakeBucket] = {}
+
+    def bucket(self, name: str) -> FakeBucket:
+        return self.buckets.setdefault(name, FakeBucket(name, self.profile))
+
+    def close(self):
+        pass
+
+# --- MongoDB (Motor) ---
+
+def _matches(document: Dict[str, Any], query: Dict[str, Any]) -> bool:
+    for key, condition in query.items():
+        value = document.get(key)
+        if isinstance(condition, dict):
+            if "$lte" in condition and not (value is not None and value <= condition["$lte"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+class FakeCollection:
+    """Motor 컬렉션 중 이 서비스가 쓰는 메서드만 흉내 냄 (쿼리는 값 일치와 $lte만 지원)
+
+    claimable이 아니면 find_one_and_update가 항상 None을 돌려줘 작업 큐 워커가 작업을 꺼내지 않습니다.
+    """
+
+    def __init__(self, profile: FakeProfile, claimable: bool = False):
+        self.profile = profile
+        self.claimable = claimable
+        self.documents: Dict[Any, Dict[str, Any]] = {}
+        self.operations = 0
+
+    async def _delay(self):
+        self.operations += 1
+        await asyncio.sleep(self.profile.mongo_latency)
+
+    def _match(self, query: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        for document in self.documents.values():
+            if _matches(document, query):
+                return document
+        return None
+
+    def _apply(self, document: Dict[str, Any], update: Dict[str, Any]):
+        document.update(update.get("$set", {}))
+        for key, amount in update.get("$inc", {}).items():
+            document[key] = document.get(key, 0) + amount
+        for key in update.get("$unset", {}):
+            document.pop(key, None)
+        for key, value in update.get("$push", {}).items():
+            items = value.get("$each", []) if isinstance(value, dict) else [value]
+            document.setdefault(key, []).extend(items)
+
+    async def insert_one(self, document: Dict[str, Any]):
+        await self._delay()
+        document.setdefault("_id", str(uuid.uuid4()))
+        self.documents[document["_id"]] = document
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def update_one(self, query: Dict[str, Any], update: Dict[str, Any], upsert: bool = False):
+        await self._delay()
+        document = self._match(query)
+        if document is None and upsert:
+            document = {"_id": str(uuid.uuid4()), **{k: v for k, v in query.items() if not isinstance(v, dict)}}
+            document.update(update.get("$setOnInsert", {}))
+            self.documents[document["_id"]] = document
+        if document is None:
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+        self._apply(document, update)
+        return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+
+    async def update_many(self, query: Dict[str, Any], update: Dict[str, Any]):
+        await self._delay()
+        return SimpleNamespace(matched_count=0, modified_count=0)
+
+    async def find_one(self, query: Dict[str, Any], *args, **kwargs):
+        await self._delay()
+        return self._match(query)
+
+    async def find_one_and_update(self, query: Dict[str, Any], update: Dict[str, Any], *args, **kwargs):
+        await self._delay()
+        if not self.claimable:
+            return None
+        document = self._match(query)
+        if document is not None:
+            self._apply(document, update)
+        return document
+
+    async def count_documents(self, query: Dict[str, Any]) -> int:
+        await self._delay()
+        return sum(1 for document in self.documents.values() if _matches(document, query))
+
+    async def delete_one(self, query: Dict[str, Any]):
+        await self._delay()
+        document = self._match(query)
+        if document is not None:
+            del self.documents[document["_id"]]
+        return SimpleNamespace(deleted_count=1 if document is not None else 0)
+
+# --- 분석 서버 ---
+
+class FakeAnalysisServer:
+    """분석 서버 (httpx.MockTransport 핸들러, 단건과 {"sessions": [...]} 배치 요청 모두 받음)"""
+
+    def __init__(self, profile: FakeProfile):
+        self.profile = profile
+        self.calls = 0
+        self.sessions = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls += 1
+        body = json.loads(request.content)
+        self.sessions += len(body["sessions"]) if "sessions" in body else 1
+        await asyncio.sleep(self.profile.analysis_latency)
+        return httpx.Response(200, json={"status": "ok"})
+
+    def client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handle))
+
+# --- 설치 ---
+
+@dataclass
+class InstalledFakes:
+    genai_client: FakeGenaiClient
+    pinecone: FakePinecone
+    vector_store: FakeVectorStore
+    storage_client: FakeStorageClient
+    transcripts: FakeCollection
+    recording_jobs: FakeCollection
+    analysis_outbox: FakeCollection
+    analysis: FakeAnalysisServer
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "gemini_connections": self.genai_client.aio.live.connections,
+            "gemini_resumed_connections": self.genai_client.aio.live.resumed_connections,
+            "embed_calls": self.pinecone.calls,
+            "mongo_operations": self.transcripts.operations + self.recording_jobs.operations + self.analysis_outbox.operations,
+            "transcripts": len(self.transcripts.documents),
+            "gcs_objects": sum(len(b.objects) for b in self.storage_client.buckets.values()),
+            "analysis_posts": self.analysis.calls,
+            "analysis_sessions": self.analysis.sessions,
+        }
+
+def install(profile: FakeProfile) -> InstalledFakes:
+    """서비스 모듈이 잡고 있는 외부 클라이언트를 가짜로 교체하고, client_registry 시작/종료를 가짜용으로 바꿈
+
+    main을 import하기 전후 어느 때나 호출할 수 있지만, 서버가 요청을 받기 전에 호출해야 합니다.
+    """
+    import database
+    from services.memory_service import memory_service
+    from services.audio_service import audio_service
+    from services.recording_jobs import recording_job_queue
+    from services.analysis_outbox import analysis_outbox
+    from services.client_registry import client_registry
+    from services.embedder import PineconeEmbedder
+
+    fakes = InstalledFakes(
+        genai_client=FakeGenaiClient(profile),
+        pinecone=FakePinecone(profile),
+        vector_store=FakeVectorStore(profile),
+        storage_client=FakeStorageClient(profile),
+        transcripts=FakeCollection(profile),
+        recording_jobs=FakeCollection(profile, claimable=True),
+        analysis_outbox=FakeCollection(profile, claimable=True),
+        analysis=FakeAnalysisServer(profile),
+    )
+
+    memory_service.pinecone = fakes.pinecone
+    memory_service.embedder = PineconeEmbedder(fakes.pinecone, memory_service.embedding_model)
+    memory_service.vector_store = fakes.vector_store
+    memory_service.vector_store_backend = "fake"
+
+    database.db.db = {
+        "transcripts": fakes.transcripts,
+        "recording_jobs": fakes.recording_jobs,
+        "analysis_outbox": fakes.analysis_outbox,
+    }
+
+    async def startup():
+        client_registry.genai_client = fakes.genai_client
+        client_registry.gcs_client = fakes.storage_client
+        audio_service.start(fakes.storage_client)
+        await audio_service.start_uploader()
+        analysis_outbox.client = fakes.analysis.client()
+        await analysis_outbox.start(fakes.analysis_outbox)
+        await recording_job_queue.start(fakes.recording_jobs)
+        client_registry.started = True
+
+    async def shutdown():
+        await recording_job_queue.stop()
+        await analysis_outbox.stop()
+        await audio_service.stop_uploader()
+        await memory_service.write_buffer.close()
+        client_registry.started = False
+
+    client_registry.startup = startup
+    client_registry.shutdown = shutdown
+    return fakes
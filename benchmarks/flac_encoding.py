@@ -0,0 +1,73 @@
+"""녹음 형식 벤치마크: FLAC 스트리밍 인코딩의 오디오 1분당 CPU 시간과 절약되는 바이트
+
+사용법:
+    python -m benchmarks.flac_encoding                      # 합성 음성 유사 신호
+    python -m benchmarks.flac_encoding --wav sample.wav     # 16kHz 16비트 모노 WAV 파일
+"""
+import argparse
+import time
+import wave
+
+import numpy as np
+
+from services.flac_encoder import StreamingFlacEncoder
+from services.audio_service import WAV_HEADER_SIZE
+
+SAMPLE_RATE = 16000
+CHUNK_BYTES = 3200   # 클라이언트가 보내는 100ms 청크 크기
+
+def synthetic_speech(seconds: float, seed: int = 0) -> np.ndarray:
+    """발화 구간(배음 + 진폭 변조)과 무음 구간이 번갈아 나오는 음성 유사 신호"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    pitch = 140 + 30 * np.sin(2 * np.pi * 0.3 * t)
+    phase = 2 * np.pi * np.cumsum(pitch) / SAMPLE_RATE
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 8))
+    envelope = np.clip(np.sin(2 * np.pi * 0.25 * t), 0, None) ** 0.5
+    signal = 4000 * voiced * envelope + rng.normal(0, 60, len(t))
+    return np.clip(signal, -32768, 32767).astype(np.int16)
+
+def load_wav(path: str) -> np.ndarray:
+    with wave.open(path, "rb") as f:
+        if f.getnchannels() != 1 or f.getsampwidth() != 2 or f.getframerate() != SAMPLE_RATE:
+            raise SystemExit("16kHz 16비트 모노 WAV만 지원합니다.")
+        return np.frombuffer(f.readframes(f.getnframes()), dtype="<i2")
+
+def run(samples: np.ndarray, block_size: int) -> dict:
+    pcm = samples.tobytes()
+    encoder = StreamingFlacEncoder(SAMPLE_RATE, block_size)
+    output = len(encoder.header())
+
+    # 실제 녹음과 같이 100ms 청크 단위로 넣으며 CPU 시간 측정
+    started = time.process_time()
+    for offset in range(0, len(pcm), CHUNK_BYTES):
+        output += len(encoder.encode(pcm[offset:offset + CHUNK_BYTES]))
+    output += len(encoder.flush())
+    cpu_seconds = time.process_time() - started
+
+    minutes = len(samples) / SAMPLE_RATE / 60
+    wav_bytes = WAV_HEADER_SIZE + len(pcm)
+    return {
+        "block_size": block_size,
+        "audio_minutes": round(minutes, 2),
+        "cpu_ms_per_audio_minute": round(cpu_seconds * 1000 / minutes, 1),
+        "realtime_factor": round(cpu_seconds / (minutes * 60), 4),
+        "wav_bytes_per_minute": int(wav_bytes / minutes),
+        "flac_bytes_per_minute": int(output / minutes),
+        "compression_ratio": round(output / wav_bytes, 3),
+        "bytes_saved_per_minute": int((wav_bytes - output) / minutes),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--wav", help="입력 WAV 파일 (없으면 합성 신호 사용)")
+    parser.add_argument("--minutes", type=float, default=5.0, help="합성 신호 길이(분)")
+    parser.add_argument("--block-sizes", default="1152,4096,8192", help="비교할 FLAC 블록 크기 목록")
+    args = parser.parse_args()
+
+    samples = load_wav(args.wav) if args.wav else synthetic_speech(args.minutes * 60)
+    for block_size in (int(size) for size in args.block_sizes.split(",")):
+        print(run(samples, block_size))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""메시지 단위 핫 패스 마이크로 벤치마크와 JSON 기준값 비교
+
+오디오 청크/이벤트마다 실행되는 코드의 호출당 시간(ns)을 재고, 청크 단위 항목은 오디오 1초당 CPU 시간(us)도 계산합니다.
+외부 서비스는 benchmarks.fakes로 대체하므로 오프라인에서 실행됩니다.
+
+사용법:
+    python -m benchmarks.hot_paths run --save benchmarks/baselines/hot_paths.json   # 기준값 저장
+    python -m benchmarks.hot_paths compare benchmarks/baselines/hot_paths.json       # 현재 코드와 비교
+    python -m benchmarks.hot_paths compare base.json --current new.json --threshold 0.05
+    python -m benchmarks.hot_paths run --filter audio
+
+compare는 기준값보다 threshold(기본 10%) 이상 느려진 항목을 REGRESSION으로 표시하고 종료 코드 1을 반환합니다.
+기준값은 측정한 머신에서만 의미가 있으므로 같은 머신에서 비교하세요 (다르면 경고).
+"""
+import os
+import sys
+import json
+import time
+import base64
+import asyncio
+import platform
+import argparse
+import datetime
+import statistics
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+TARGET_SECONDS = 0.2   # 반복 한 번의 목표 측정 시간
+MODEL_CHUNK_BYTES = 1920   # Gemini 오디오 파트 (24kHz, 40ms)
+MIC_CHUNK_BYTES = 1280     # 마이크 프레임 (16kHz, 40ms)
+
+@dataclass
+class Case:
+    name: str
+    setup: Callable[[], Callable]   # 측정할 함수(동기) 또는 코루틴 함수(async)를 반환
+    chunks_per_second: Optional[float] = None   # 청크 단위 항목이면 오디오 1초당 호출 수
+    is_async: bool = False
+
+class NullWebSocket:
+    """전송 비용 없이 받기만 하는 WebSocket"""
+
+    async def send_text(self, data: str):
+        pass
+
+    async def send_bytes(self, data: bytes):
+        pass
+
+def _pcm(size: int, seed: int = 0) -> bytes:
+    rng = np.random.default_rng(seed)
+    return (rng.normal(0, 3000, size // 2)).astype("<i2").tobytes()
+
+def _session_manager_for_bench(protocol: str = "json"):
+    """가짜 GCS로 녹음기를 만든 SessionManager (Gemini 세션 없음)"""
+    from benchmarks import fakes
+    from services.audio_service import audio_service
+    from managers.session_manager import SessionManager
+
+    installed = fakes.install(fakes.FakeProfile(gcs_write_latency=0))
+    audio_service.recording_mode = "stream"
+    audio_service.start(installed.storage_client)
+    return SessionManager(NullWebSocket(), live=None, user_id="bench-user", protocol=protocol)
+
+# --- 항목 ---
+
+def case_to_payload_audio():
+    from managers.websocket_manager import PayloadManager
+    from settings import ResponseType
+    encoded = base64.b64encode(_pcm(MODEL_CHUNK_BYTES)).decode("utf-8")
+    return lambda: PayloadManager.to_payload(ResponseType.AUDIO, encoded)
+
+def case_audio_base64_json():
+    """json 프로토콜의 오디오 전송 인코딩 (base64 + JSON, 예전 _handle_audio_response가 하던 일)"""
+    from managers.websocket_manager import PayloadManager
+    from settings import ResponseType
+    pcm = _pcm(MODEL_CHUNK_BYTES)
+    return lambda: PayloadManager.to_payload(ResponseType.AUDIO, base64.b64encode(pcm).decode("utf-8"))
+
+def case_audio_binary_frame():
+    from managers.websocket_manager import PayloadManager, BinaryFrameType
+    pcm = _pcm(MODEL_CHUNK_BYTES)
+    return lambda: PayloadManager.to_binary_frame(BinaryFrameType.AUDIO_PCM16, 1, 24000, pcm)
+
+def _case_handle_audio_response(protocol: str):
+    """_handle_audio_response부터 송신 writer의 인코딩/전송까지 모델 오디오 파트 하나의 전체 경로"""
+    from google.genai import types
+    model_turn = types.Content(role="model", parts=[types.Part(
+        inline_data=types.Blob(data=_pcm(MODEL_CHUNK_BYTES), mime_type="audio/pcm;rate=24000")
+    )])
+
+    async def run(iterations: int):
+        session_manager = _session_manager_for_bench(protocol)
+        writer = asyncio.create_task(session_manager.outbound.run())
+        for _ in range(iterations):
+            await session_manager._handle_audio_response(model_turn)
+            await asyncio.sleep(0)
+        writer.cancel()
+        session_manager.audio_recorder.discard()
+    return run
+
+def case_handle_audio_response_json():
+    return _case_handle_audio_response("json")
+
+def case_handle_audio_response_binary():
+    return _case_handle_audio_response("binary")
+
+def case_handle_transcriptions():
+    from google.genai import types
+    server_content = types.LiveServerContent(
+        input_transcription=types.Transcription(text="오늘 공원에 산책을 다녀왔어"),
+        output_transcription=types.Transcription(text="우와 할머니 "),
+    )
+
+    async def run(iterations: int):
+        session_manager = _session_manager_for_bench()
+        inputs, outputs = [], []
+        for _ in range(iterations):
+            await session_manager._handle_transcriptions(server_content, inputs, outputs)
+            session_manager.outbound._items.clear()
+        session_manager.audio_recorder.discard()
+    return run
+
+def case_add_transcription():
+    from settings import ResponseType
+    session_manager = _session_manager_for_bench()
+    session_manager.audio_recorder.discard()
+    pieces = ["오늘 ", "공원에 ", "산책을 ", "다녀왔어"]
+
+    def run():
+        session_manager.add_transcription(ResponseType.INPUT_TRANSCRIPT, pieces)
+        if len(session_manager.transcript.pending) > 10000:
+            session_manager.transcript.pending.clear()
+    return run
+
+def case_wav_header():
+    session_manager = _session_manager_for_bench()
+    recorder = session_manager.audio_recorder
+    recorder.discard()
+    return lambda: recorder._create_wav_header(16000, 1, 16, 115200000)
+
+def case_conversation_log_dump_1h():
+    """한 시간 통화 (5초마다 한 턴씩 주고받음)의 ConversationLog.model_dump"""
+    from models.models import ConversationLog, ConversationTurn, SpeakerEnum, TurnLatency
+    started = datetime.datetime(2025, 1, 1, 10, 0, 0)
+    turns = 3600 // 5
+    conversation = []
+    for index in range(turns):
+        conversation.append(ConversationTurn(speaker=SpeakerEnum.PATIENT, content=f"할머니 발화 {index} " * 4))
+        conversation.append(ConversationTurn(speaker=SpeakerEnum.AI, content=f"진아 응답 {index} " * 8))
+    latencies = [
+        TurnLatency(turn_index=i, started_at=started + datetime.timedelta(seconds=5 * i), ttfa_ms=450, first_audio_ms=900,
+                    tool_calls=1 if i % 3 == 0 else 0, tool_ms=120 if i % 3 == 0 else 0, duration_ms=4000)
+        for i in range(turns)
+    ]
+    log = ConversationLog(user_id="bench-user", start_time=started, end_time=started + datetime.timedelta(hours=1),
+                          conversation=conversation, turn_latencies=latencies)
+    return log.model_dump
+
+def case_jwt_verify():
+    import jwt
+    from auth.jwt_auth import jwt_auth
+    token = jwt.encode({"id": "bench-user", "sub": "AccessToken", "role": "USER"}, jwt_auth.secret_key, algorithm=jwt_auth.algorithm)
+    return lambda: jwt_auth.verify_token_and_get_user_id(token)
+
+def case_ingest_passthrough():
+    from services.audio_ingest import AudioIngest, InputAudioFormat
+    ingest = AudioIngest(InputAudioFormat(sample_rate=16000), target_rate=16000, frame_ms=40)
+    chunk = _pcm(MIC_CHUNK_BYTES)
+    return lambda: ingest.process(chunk)
+
+def case_ingest_resample_48k_f32():
+    from services.audio_ingest import AudioIngest, InputAudioFormat
+    ingest = AudioIngest(InputAudioFormat(sample_rate=48000, sample_format="f32le"), target_rate=16000, frame_ms=40)
+    samples = np.frombuffer(_pcm(MIC_CHUNK_BYTES * 3), dtype="<i2").astype("<f4") / 32768.0
+    chunk = samples.tobytes()
+    return lambda: ingest.process(chunk)
+
+def case_vad_process():
+    from services.voice_activity import VoiceActivityDetector
+    vad = VoiceActivityDetector(16000)
+    chunk = _pcm(MIC_CHUNK_BYTES)
+    return lambda: vad.process(chunk)
+
+CASES: List[Case] = [
+    Case("payload.to_payload_audio", case_to_payload_audio, chunks_per_second=25),
+    Case("audio.base64_json", case_audio_base64_json, chunks_per_second=25),
+    Case("audio.binary_frame", case_audio_binary_frame, chunks_per_second=25),
+    Case("session.handle_audio_response_json", case_handle_audio_response_json, chunks_per_second=25, is_async=True),
+    Case("session.handle_audio_response_binary", case_handle_audio_response_binary, chunks_per_second=25, is_async=True),
+    Case("session.handle_transcriptions", case_handle_transcriptions, is_async=True),
+    Case("session.add_transcription", case_add_transcription),
+    Case("recorder.wav_header", case_wav_header),
+    Case("log.model_dump_1h", case_conversation_log_dump_1h),
+    Case("auth.jwt_verify", case_jwt_verify),
+    Case("ingest.passthrough", case_ingest_passthrough, chunks_per_second=25),
+    Case("ingest.resample_48k_f32", case_ingest_resample_48k_f32, chunks_per_second=25),
+    Case("vad.process", case_vad_process, chunks_per_second=25),
+]
+
+# --- 측정 ---
+
+_CALIBRATION_DATA = {"type": "calibration", "data": list(range(32))}
+
+def _calibration():
+    """머신 속도 기준 작업 (파이썬 루프, JSON, 바이트 처리 혼합)"""
+    total = sum(range(500))
+    encoded = json.dumps(_CALIBRATION_DATA)
+    return total, base64.b64encode(encoded.encode())[:64]
+
+def _time_sync(func: Callable, iterations: int) -> float:
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter_ns() - started) / iterations
+
+def _time_async(run: Callable, iterations: int) -> float:
+    loop = asyncio.new_event_loop()
+    try:
+        started = time.perf_counter_ns()
+        loop.run_until_complete(run(iterations))
+        return (time.perf_counter_ns() - started) / iterations
+    finally:
+        loop.close()
+
+def measure(case: Case, repeat: int) -> Dict[str, Any]:
+    target = case.setup()
+    timer = _time_async if case.is_async else _time_sync
+
+    # 반복 한 번이 TARGET_SECONDS 정도가 되도록 호출 횟수를 정함
+    iterations = 1
+    while True:
+        per_call = timer(target, iterations)
+        if per_call * iterations >= TARGET_SECONDS * 1e9 / 10 or iterations >= 1 << 20:
+            break
+        iterations *= 4
+    iterations = max(1, int(TARGET_SECONDS * 1e9 / max(per_call, 1)))
+
+    # 같은 시점의 머신 속도를 함께 재서 비교 시 CPU 클럭/다른 부하 영향을 보정
+    samples, calibration = [], []
+    for _ in range(repeat):
+        calibration.append(_time_sync(_calibration, 20000))
+        samples.append(timer(target, iterations))
+    result = {
+        "ns_per_call": round(statistics.median(samples), 1),
+        "ns_per_call_min": round(min(samples), 1),
+        "calibration_ns": round(min(calibration), 1),
+        "iterations": iterations,
+        "repeat": repeat,
+    }
+    if case.chunks_per_second:
+        result["us_per_audio_second"] = round(result["ns_per_call"] * case.chunks_per_second / 1000, 2)
+    return result
+
+def machine_info() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def run_suite(filter_text: Optional[str], repeat: int, quiet: bool = False) -> Dict[str, Any]:
+    results = {}
+    for case in CASES:
+        if filter_text and filter_text not in case.name:
+            continue
+        results[case.name] = measure(case, repeat)
+        if not quiet:
+            line = f"{case.name:40s} {results[case.name]['ns_per_call']:>14,.1f} ns/call"
+            if "us_per_audio_second" in results[case.name]:
+                line += f"  {results[case.name]['us_per_audio_second']:>10,.2f} us/audio-s"
+            print(line, file=sys.stderr)
+    return {
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "machine": machine_info(),
+        "results": results,
+    }
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float, partial: bool = False) -> bool:
+    """항목별 비교표 출력, 회귀가 있으면 True
+
+    잡음에 덜 민감하도록 반복 중 가장 빠른 값(ns_per_call_min)끼리 비교하고,
+    양쪽에 calibration_ns가 있으면 머신 속도 차이만큼 보정합니다.
+    """
+    if baseline.get("machine") != current.get("machine"):
+        print("경고: 기준값과 다른 머신/파이썬에서 측정한 결과입니다.", file=sys.stderr)
+
+    regressed = False
+    print(f"{'case':40s} {'baseline min ns':>16s} {'current min ns':>16s} {'change':>9s}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if base is None:
+            print(f"{name:40s} {'-':>16s} {result['ns_per_call_min']:>16,.1f} {'new':>9s}")
+            continue
+        ratio = result["ns_per_call_min"] / base["ns_per_call_min"] if base["ns_per_call_min"] else 1.0
+        if result.get("calibration_ns") and base.get("calibration_ns"):
+            ratio /= result["calibration_ns"] / base["calibration_ns"]
+        mark = ""
+        if ratio > 1 + threshold:
+            mark, regressed = "  REGRESSION", True
+        elif ratio < 1 - threshold:
+            mark = "  improved"
+        print(f"{name:40s} {base['ns_per_call_min']:>16,.1f} {result['ns_per_call_min']:>16,.1f} {ratio - 1:>+8.1%}{mark}")
+    if not partial:
+        for name in sorted(baseline["results"].keys() - current["results"].keys()):
+            print(f"{name:40s} (현재 결과 없음)")
+    return regressed
+
+def main():
+    parser = argparse.ArgumentParser(description="메시지 단위 핫 패스 마이크로 벤치마크")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="벤치마크 실행")
+    run_parser.add_argument("--save", help="결과를 저장할 JSON 경로 (기준값)")
+    run_parser.add_argument("--filter", help="이름에 이 문자열이 들어간 항목만 실행")
+    run_parser.add_argument("--repeat", type=int, default=5)
+
+    compare_parser = subparsers.add_parser("compare", help="기준값과 비교 (회귀가 있으면 종료 코드 1)")
+    compare_parser.add_argument("baseline", help="기준값 JSON")
+    compare_parser.add_argument("--current", help="비교할 결과 JSON (없으면 지금 실행)")
+    compare_parser.add_argument("--filter", help="이름에 이 문자열이 들어간 항목만 실행")
+    compare_parser.add_argument("--repeat", type=int, default=5)
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="회귀로 볼 느려짐 비율")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.WARNING)   # 측정 중 세션 로그 출력 비용 제외
+
+    if args.command == "run":
+        report = run_suite(args.filter, args.repeat)
+        if args.save:
+            os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+            with open(args.save, "w") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"기준값 저장: {args.save}", file=sys.stderr)
+        else:
+            print(json.dumps(report, ensure_ascii=False, indent=2))
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = run_suite(args.filter, args.repeat, quiet=True)
+    sys.exit(1 if compare(baseline, current, args.threshold, partial=bool(args.filter)) else 0)
+
+if __name__ == "__main__":
+    main()
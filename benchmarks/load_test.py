@@ -0,0 +1,308 @@
+"""부하 테스트: 가짜 외부 서비스로 띄운 서버에 N개의 인증된 WebSocket 클라이언트가 실시간 PCM을 보냄
+
+서버는 별도 프로세스(benchmarks.fakes로 Gemini Live, Pinecone, GCS, MongoDB, 분석 서버를 교체한 main.app)에서
+실행하고, 이 프로세스는 클라이언트만 돌립니다. 서버 프로세스의 CPU 시간, RSS, 이벤트 루프 지연은
+테스트 전용 /bench/stats 엔드포인트로 읽습니다.
+
+측정 항목:
+- 코어당 세션 수: 세션 수 / (서버 CPU 시간 / 경과 시간)
+- 이벤트 루프 지연: 10ms 주기 타이머가 늦게 깨어난 시간의 분포
+- TTFA: 클라이언트가 발화 마지막 청크를 보낸 뒤 첫 AI 오디오를 받기까지 (가짜 모델 지연 포함)
+- 세션당 메모리: (세션이 모두 열린 동안의 RSS - 시작 전 RSS) / 세션 수
+
+사용법:
+    python -m benchmarks.load_test --clients 50 --duration 60
+    python -m benchmarks.load_test --clients 200 --ramp 20 --protocol binary --json
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import resource
+import socket
+import subprocess
+import urllib.request
+from dataclasses import asdict, fields
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.fakes import FakeProfile
+
+BENCH_JWT_SECRET = "load-test-secret-not-for-production-use"
+CLIENT_SAMPLE_RATE = 16000
+LAG_INTERVAL = 0.01
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 1) if values else None
+
+# --- 서버 프로세스 ---
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class LoopLagMonitor:
+    """LAG_INTERVAL마다 깨어나며 예정보다 늦어진 시간(ms)을 기록"""
+
+    def __init__(self):
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + LAG_INTERVAL
+            await asyncio.sleep(LAG_INTERVAL)
+            self.samples.append(max(0.0, loop.time() - expected) * 1000)
+
+    def snapshot(self, reset: bool = False) -> Dict[str, Optional[float]]:
+        samples = self.samples
+        if reset:
+            self.samples = []
+        return {
+            "p50_ms": percentile(samples, 50),
+            "p99_ms": percentile(samples, 99),
+            "max_ms": round(max(samples), 1) if samples else None,
+        }
+
+def serve(port: int, profile: FakeProfile, log_level: str):
+    import logging
+    import uvicorn
+    from benchmarks import fakes as fake_services
+
+    installed = fake_services.install(profile)
+    import main
+    logging.getLogger().setLevel(log_level.upper())
+
+    lag_monitor = LoopLagMonitor()
+    original_startup = main.client_registry.startup
+
+    async def startup():
+        await original_startup()
+        lag_monitor.start()
+    main.client_registry.startup = startup
+
+    @main.app.get("/bench/stats")
+    async def bench_stats(reset: bool = False):
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        return {
+            "cpu_seconds": usage.ru_utime + usage.ru_stime,
+            "rss_bytes": _rss_bytes(),
+            "active_connections": len(main.connection_manager.active_connections),
+            "loop_lag": lag_monitor.snapshot(reset),
+            "fakes": installed.stats(),
+        }
+
+    uvicorn.run(main.app, host="127.0.0.1", port=port, log_level=log_level, ws_max_size=16 * 1024 * 1024)
+
+# --- 클라이언트 ---
+
+def _speech_pcm(seconds: float) -> bytes:
+    """발화 구간으로 쓸 배음 신호 (모든 클라이언트가 공유)"""
+    t = np.arange(int(seconds * CLIENT_SAMPLE_RATE)) / CLIENT_SAMPLE_RATE
+    signal = sum(np.sin(2 * np.pi * 150 * k * t) / k for k in range(1, 6))
+    return (5000 * signal).astype("<i2").tobytes()
+
+class ClientResult:
+    def __init__(self):
+        self.ttfa_ms: List[float] = []
+        self.turns = 0
+        self.audio_frames = 0
+        self.error: Optional[str] = None
+
+async def run_client(index: int, url: str, args, speech: bytes, deadline: float) -> ClientResult:
+    import jwt
+    import websockets
+
+    result = ClientResult()
+    token = jwt.encode({"id": f"bench-user-{index}", "sub": "AccessToken", "role": "USER"}, BENCH_JWT_SECRET, algorithm="HS256")
+    query = f"token={token}&sample_rate={CLIENT_SAMPLE_RATE}"
+    if args.protocol == "binary":
+        query += "&protocol=binary"
+
+    chunk_bytes = CLIENT_SAMPLE_RATE * args.chunk_ms // 1000 * 2
+    chunk_seconds = args.chunk_ms / 1000
+    silence = bytes(chunk_bytes)
+    speech_end: Optional[float] = None
+    turn_done = asyncio.Event()
+
+    try:
+        async with websockets.connect(f"{url}?{query}", max_size=None) as websocket:
+            async def reader():
+                nonlocal speech_end
+                async for message in websocket:
+                    if isinstance(message, bytes):
+                        is_audio = True
+                    else:
+                        payload = json.loads(message)
+                        is_audio = payload.get("type") == "audio"
+                        if payload.get("type") == "turn_complete":
+                            result.turns += 1
+                            turn_done.set()
+                    if is_audio:
+                        result.audio_frames += 1
+                        if speech_end is not None:
+                            result.ttfa_ms.append((time.monotonic() - speech_end) * 1000)
+                            speech_end = None
+
+            reader_task = asyncio.create_task(reader())
+            loop = asyncio.get_running_loop()
+            next_send = loop.time()
+
+            async def send_paced(data: bytes):
+                # 절대 시각 기준으로 보내 누적 지연이 생기지 않게 함
+                nonlocal next_send
+                await asyncio.sleep(max(0.0, next_send - loop.time()))
+                await websocket.send(data)
+                next_send += chunk_seconds
+
+            while time.monotonic() < deadline:
+                turn_done.clear()
+                for offset in range(0, len(speech), chunk_bytes):
+                    await send_paced(speech[offset:offset + chunk_bytes])
+                speech_end = time.monotonic()
+                # 응답을 듣는 동안에는 무음을 보냄
+                while not turn_done.is_set() and time.monotonic() < deadline:
+                    await send_paced(silence)
+                for _ in range(int(args.pause / chunk_seconds)):
+                    await send_paced(silence)
+
+            reader_task.cancel()
+    except Exception as e:
+        result.error = f"{type(e).__name__}: {e}"
+    return result
+
+def _get_stats(base_url: str, reset: bool = False) -> Dict:
+    with urllib.request.urlopen(f"{base_url}/bench/stats?reset={'true' if reset else 'false'}", timeout=10) as response:
+        return json.loads(response.read())
+
+async def drive(args, base_url: str) -> Dict:
+    speech = _speech_pcm(args.utterance_seconds)
+    ws_url = base_url.replace("http://", "ws://") + "/ws/realtime"
+
+    baseline = await asyncio.to_thread(_get_stats, base_url, True)
+    started = time.monotonic()
+    deadline = started + args.ramp + args.duration
+
+    tasks = []
+    for index in range(args.clients):
+        tasks.append(asyncio.create_task(run_client(index, ws_url, args, speech, deadline)))
+        if args.ramp:
+            await asyncio.sleep(args.ramp / args.clients)
+
+    # 모든 세션이 열린 구간의 중간에서 메모리와 루프 지연 측정
+    await asyncio.sleep(max(0.0, started + args.ramp + args.duration / 2 - time.monotonic()))
+    steady = await asyncio.to_thread(_get_stats, base_url, False)
+    results: List[ClientResult] = await asyncio.gather(*tasks)
+    wall = time.monotonic() - started
+    final = await asyncio.to_thread(_get_stats, base_url, False)
+
+    ttfa = [value for r in results for value in r.ttfa_ms]
+    cpu_seconds = final["cpu_seconds"] - baseline["cpu_seconds"]
+    cores_used = cpu_seconds / wall if wall else 0.0
+    errors = [r.error for r in results if r.error]
+    return {
+        "clients": args.clients,
+        "protocol": args.protocol,
+        "wall_seconds": round(wall, 1),
+        "turns": sum(r.turns for r in results),
+        "audio_frames": sum(r.audio_frames for r in results),
+        "errors": len(errors),
+        "first_errors": errors[:3],
+        "server_cpu_cores_used": round(cores_used, 3),
+        "sessions_per_core": round(args.clients / cores_used, 1) if cores_used else None,
+        "loop_lag": final["loop_lag"],
+        "ttfa_ms": {
+            "p50": percentile(ttfa, 50),
+            "p95": percentile(ttfa, 95),
+            "p99": percentile(ttfa, 99),
+            "fake_model_delay": round(args.first_audio_delay * 1000, 1),
+        },
+        "active_connections_at_steady_state": steady["active_connections"],
+        "memory_per_session_kb": round((steady["rss_bytes"] - baseline["rss_bytes"]) / args.clients / 1024, 1),
+        "server_rss_mb": round(steady["rss_bytes"] / 2 ** 20, 1),
+        "fakes": final["fakes"],
+    }
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _wait_for_server(base_url: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit("벤치마크 서버가 시작 중에 종료되었습니다.")
+        try:
+            urllib.request.urlopen(f"{base_url}/health", timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise SystemExit("벤치마크 서버가 시작되지 않았습니다.")
+
+def _profile_from_args(args) -> FakeProfile:
+    return FakeProfile(**{f.name: getattr(args, f.name) for f in fields(FakeProfile) if hasattr(args, f.name)})
+
+def main():
+    parser = argparse.ArgumentParser(description="가짜 외부 서비스로 실시간 세션 부하 테스트")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30.0, help="모든 클라이언트가 연결된 뒤 측정 시간(초)")
+    parser.add_argument("--ramp", type=float, default=5.0, help="클라이언트를 나눠 연결하는 시간(초)")
+    parser.add_argument("--protocol", choices=("json", "binary"), default="json")
+    parser.add_argument("--chunk-ms", type=int, default=100, help="클라이언트 마이크 청크 길이")
+    parser.add_argument("--pause", type=float, default=1.0, help="응답 후 다음 발화까지 무음(초)")
+    parser.add_argument("--server-log-level", default="warning")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로만 출력")
+    defaults = FakeProfile()
+    parser.add_argument("--utterance", dest="utterance_seconds", type=float, default=defaults.utterance_seconds)
+    parser.add_argument("--first-audio-delay", type=float, default=defaults.first_audio_delay)
+    parser.add_argument("--reply-seconds", type=float, default=defaults.reply_seconds)
+    parser.add_argument("--tool-every", type=int, default=defaults.tool_every)
+    parser.add_argument("--go-away-after-turns", type=int, default=defaults.go_away_after_turns,
+                        help="가짜 Gemini가 한 연결에서 N턴 후 go_away를 보냄 (세션 재개 확인용)")
+    parser.add_argument("--go-away-time-left", type=float, default=defaults.go_away_time_left)
+    parser.add_argument("--embed-latency", type=float, default=defaults.embed_latency)
+    parser.add_argument("--query-latency", type=float, default=defaults.query_latency)
+    parser.add_argument("--mongo-latency", type=float, default=defaults.mongo_latency)
+    parser.add_argument("--analysis-latency", type=float, default=defaults.analysis_latency)
+    args = parser.parse_args()
+    profile = _profile_from_args(args)
+
+    if args.serve:
+        serve(args.port, profile, args.server_log_level)
+        return
+
+    port = args.port or _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = dict(os.environ, JWT_SECRET_KEY=BENCH_JWT_SECRET)
+    # 서버는 드라이버와 같은 인자로 실행 (가짜 서비스 설정 공유)
+    server_args = [a for a in sys.argv[1:] if a != "--json"]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.load_test", "--serve", "--port", str(port), *server_args], env=env
+    )
+    try:
+        _wait_for_server(base_url, process)
+        report = asyncio.run(drive(args, base_url))
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False))
+        return
+    print(json.dumps({"profile": asdict(profile), **report}, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""세션 캡처 재생: 캡처한 마이크 입력과 Live API 응답을 실제 세션 처리 경로(main.handle_realtime_session)로 다시 흘려보냄
+
+클라이언트 WebSocket과 Gemini Live 세션만 캡처 파일을 읽는 가짜로 바꾸고, 나머지 외부 서비스는
+benchmarks.fakes로 대체합니다. 두 스트림의 레코드는 캡처된 순서 그대로 하나씩 내보내므로
+빠른 재생에서도 순서가 보존되어 결과가 결정적입니다.
+
+- --speed 1.0: 실제 속도 (캡처 시각에 맞춰 내보냄), 2.0이면 두 배 속도
+- --speed 0: 가능한 한 빠르게 (처리량 측정)
+
+출력의 digest는 클라이언트로 나간 오디오 외 메시지(전사, 턴 완료, 중단 등)의 순서와 내용 해시로,
+코드 변경 전후 같은 캡처를 재생해 동작이 바뀌었는지 확인하는 데 씁니다.
+
+사용법:
+    python -m benchmarks.replay captures/20250101_120000_<session_id>.vcap
+    python -m benchmarks.replay capture.vcap --speed 0 --concurrency 20 --json
+"""
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import logging
+import argparse
+import resource
+import contextvars
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from fastapi import WebSocketDisconnect
+
+from benchmarks.fakes import FakeProfile
+from services.session_capture import CaptureRecord, CaptureRecordType, read_capture
+
+CLIENT_RECORDS = (CaptureRecordType.CLIENT_AUDIO, CaptureRecordType.CLIENT_END)
+
+class ReplayClock:
+    """두 소비자(클라이언트, Live 세션)에게 캡처 레코드를 원래 순서대로 하나씩 넘김"""
+
+    def __init__(self, records: List[CaptureRecord], speed: float):
+        self.records = records
+        self.speed = speed
+        self._cursor = 0
+        self._changed = asyncio.Condition()
+        self._started = asyncio.get_running_loop().time()
+
+    def _is_client(self, record: CaptureRecord) -> bool:
+        return record.kind in CLIENT_RECORDS
+
+    async def take(self, client: bool) -> Optional[CaptureRecord]:
+        """다음 레코드가 이 소비자 차례가 될 때까지 기다렸다가 반환 (끝이면 None)"""
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self._cursor >= len(self.records) or self._is_client(self.records[self._cursor]) == client
+            )
+            if self._cursor >= len(self.records):
+                return None
+            record = self.records[self._cursor]
+
+        if self.speed:
+            loop = asyncio.get_running_loop()
+            await asyncio.sleep(max(0.0, self._started + record.timestamp / self.speed - loop.time()))
+
+        async with self._changed:
+            self._cursor += 1
+            self._changed.notify_all()
+        return record
+
+class ReplayWebSocket:
+    """캡처된 마이크 메시지를 내보내고 서버가 보낸 메시지를 모으는 클라이언트 WebSocket"""
+
+    def __init__(self, clock: ReplayClock, query: str):
+        self.clock = clock
+        self.url = SimpleNamespace(query=query)
+        self.client = ("replay", 0)
+        self.headers: Dict[str, str] = {}
+        self.client_state = SimpleNamespace(value=1)
+        self.bytes_in = 0
+        self.audio_bytes_out = 0
+        self.messages_out = 0
+        self._digest = hashlib.sha256()
+
+    async def accept(self):
+        pass
+
+    async def receive_bytes(self) -> bytes:
+        record = await self.clock.take(client=True)
+        if record is None or record.kind == CaptureRecordType.CLIENT_END:
+            raise WebSocketDisconnect(code=1000, reason="replay finished")
+        self.bytes_in += len(record.payload)
+        return record.payload
+
+    async def send_bytes(self, data: bytes):
+        self.audio_bytes_out += len(data) - 8  # 바이너리 프레임 헤더 제외
+
+    async def send_text(self, data: str):
+        payload = json.loads(data)
+        if payload.get("type") == "audio":
+            self.audio_bytes_out += len(base64.b64decode(payload["data"]))
+            return
+        self.messages_out += 1
+        self._digest.update(data.encode())
+
+    async def close(self, code: int = 1000, reason: str = ""):
+        self.client_state.value = 3
+
+    @property
+    def digest(self) -> str:
+        return self._digest.hexdigest()[:16]
+
+class ReplayLiveSession:
+    """캡처된 Live API 응답 이벤트를 내보내는 Gemini Live 세션"""
+
+    def __init__(self, clock: ReplayClock):
+        self.clock = clock
+        self.audio_bytes_in = 0
+        self.tool_responses = 0
+
+    async def send_realtime_input(self, media=None, audio_stream_end: Optional[bool] = None, **kwargs):
+        if media is not None:
+            self.audio_bytes_in += len(media["data"] if isinstance(media, dict) else media.data)
+
+    async def send_tool_response(self, function_responses=None, **kwargs):
+        self.tool_responses += 1
+
+    async def receive(self):
+        while True:
+            record = await self.clock.take(client=False)
+            if record is None:
+                # 캡처가 끝나면 클라이언트 종료로 세션이 닫힐 때까지 대기
+                await asyncio.Event().wait()
+            message = record.live_event()
+            yield message
+            if message.server_content and message.server_content.turn_complete:
+                return
+
+class Replay:
+    def __init__(self, clock: ReplayClock, websocket: ReplayWebSocket):
+        self.websocket = websocket
+        self.session = ReplayLiveSession(clock)
+
+_current_replay: contextvars.ContextVar[Replay] = contextvars.ContextVar("current_replay")
+
+class ReplayLive:
+    """client.aio.live: 현재 태스크의 Replay에 연결된 세션을 돌려줌"""
+
+    @asynccontextmanager
+    async def connect(self, model: str = None, config: Any = None):
+        yield _current_replay.get().session
+
+async def replay_once(index: int, metadata: Dict[str, Any], records: List[CaptureRecord], speed: float) -> Dict[str, Any]:
+    import jwt
+    import main
+    from auth.jwt_auth import jwt_auth
+
+    user_id = f"{metadata.get('user_id', 'replay')}-replay-{index}"
+    token = jwt.encode({"id": user_id, "sub": "AccessToken"}, jwt_auth.secret_key, algorithm=jwt_auth.algorithm)
+    input_format = metadata.get("input_format", {})
+    query = (
+        f"token={token}&protocol={metadata.get('protocol', 'json')}"
+        f"&sample_rate={input_format.get('sample_rate', 16000)}"
+        f"&format={input_format.get('sample_format', 's16le')}&channels={input_format.get('channels', 1)}"
+    )
+
+    clock = ReplayClock(records, speed)
+    replay = Replay(clock, ReplayWebSocket(clock, query))
+    _current_replay.set(replay)
+    started = time.monotonic()
+    await main.handle_realtime_session(replay.websocket)
+    return {
+        "wall_seconds": time.monotonic() - started,
+        "user_id": user_id,
+        "client_bytes_in": replay.websocket.bytes_in,
+        "audio_bytes_to_gemini": replay.session.audio_bytes_in,
+        "tool_responses": replay.session.tool_responses,
+        "audio_bytes_to_client": replay.websocket.audio_bytes_out,
+        "messages_to_client": replay.websocket.messages_out,
+        "digest": replay.websocket.digest,
+    }
+
+async def run(args) -> Dict[str, Any]:
+    from benchmarks import fakes as fake_services
+    import managers.session_manager as session_manager_module
+    from services.client_registry import client_registry
+
+    metadata, records = read_capture(args.capture)
+    installed = fake_services.install(FakeProfile(
+        embed_latency=args.service_latency, query_latency=args.service_latency,
+        mongo_latency=args.service_latency, analysis_latency=args.service_latency,
+    ))
+    session_manager_module.CAPTURE_ENABLED = False   # 재생 중인 세션은 다시 캡처하지 않음
+    if not args.speed:
+        # 최대 속도에서는 실시간 따라잡기 정책이 입력을 버리므로, 결정적인 결과를 위해 배압으로 바꿈
+        session_manager_module.AUDIO_QUEUE_POLICY = "block"
+    await client_registry.startup()
+    client_registry.genai_client = SimpleNamespace(aio=SimpleNamespace(live=ReplayLive()))
+
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_started = usage.ru_utime + usage.ru_stime
+    started = time.monotonic()
+    results = await asyncio.gather(*(replay_once(i, metadata, records, args.speed) for i in range(args.concurrency)))
+    wall = time.monotonic() - started
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_seconds = usage.ru_utime + usage.ru_stime - cpu_started
+    await client_registry.shutdown()
+
+    captured_seconds = records[-1].timestamp if records else 0.0
+    turn_latencies = [t for doc in installed.transcripts.documents.values() for t in doc.get("turn_latencies", [])]
+    ttfa = sorted(t["ttfa_ms"] for t in turn_latencies if t.get("ttfa_ms") is not None)
+    digests = sorted({r["digest"] for r in results})
+    return {
+        "capture": args.capture,
+        "session_id": metadata.get("session_id"),
+        "captured_seconds": round(captured_seconds, 2),
+        "records": len(records),
+        "live_events": sum(1 for r in records if r.kind == CaptureRecordType.LIVE_EVENT),
+        "speed": args.speed or "max",
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall, 3),
+        "realtime_factor": round(captured_seconds * args.concurrency / wall, 1) if wall else None,
+        "cpu_seconds": round(cpu_seconds, 3),
+        "cpu_ms_per_captured_second": round(cpu_seconds * 1000 / (captured_seconds * args.concurrency), 2) if captured_seconds else None,
+        "turns": len(turn_latencies),
+        "ttfa_p50_ms": ttfa[len(ttfa) // 2] if ttfa else None,
+        "session": {k: v for k, v in results[0].items() if k not in ("user_id", "wall_seconds")},
+        "deterministic": len(digests) == 1,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="세션 캡처를 실제 세션 처리 경로로 재생")
+    parser.add_argument("capture", help=".vcap 캡처 파일")
+    parser.add_argument("--speed", type=float, default=1.0, help="재생 속도 배수 (0이면 최대 속도)")
+    parser.add_argument("--concurrency", type=int, default=1, help="동시에 재생할 세션 수")
+    parser.add_argument("--service-latency", type=float, default=0.0, help="가짜 Pinecone/Mongo/분석 서버 지연(초)")
+    parser.add_argument("--log-level", default="warning")
+    parser.add_argument("--json", action="store_true", help="결과를 한 줄 JSON으로 출력")
+    args = parser.parse_args()
+
+    # main을 import하기 전에 로깅을 설정 (이후 main의 basicConfig는 아무것도 하지 않음)
+    logging.basicConfig(level=args.log_level.upper())
+    report = asyncio.run(run(args))
+    print(json.dumps(report, ensure_ascii=False, indent=None if args.json else 2))
+
+if __name__ == "__main__":
+    main()
@@ -10,19 +10,57 @@ MONGO_CONNECTION_STRING = os.getenv("MONGO_CONNECTION_STRING", "mongodb://localh
 DB_NAME = os.getenv("DB_NAME", "db")
 
 class Database:
+    """MongoDB 연결
+
+    Motor 클라이언트는 import 시점이 아니라 client_registry.startup()에서 connect()로 만들므로
+    애플리케이션 이벤트 루프에 묶이고, import만 하는 도구나 테스트는 연결을 만들지 않습니다.
+    컬렉션은 사용할 때마다 아래 속성으로 가져옵니다.
+    """
+
     def __init__(self, uri: str, database_name: str):
-        # 비동기 클라이언트 생성
-        self.client = motor.motor_asyncio.AsyncIOMotorClient(uri)
-        # 데이터베이스 가져오기
-        self.db = self.client[database_name]
-    
+        self.uri = uri
+        self.database_name = database_name
+        self.client = None
+        self.db = None
+
+    def connect(self):
+        """비동기 클라이언트 생성 (이미 있으면 그대로 사용)"""
+        if self.client is None:
+            self.client = motor.motor_asyncio.AsyncIOMotorClient(self.uri)
+            # 데이터베이스 가져오기
+            self.db = self.client[self.database_name]
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+        self.client = None
+        self.db = None
+
     def get_collection(self, collection_name: str):
         """지정된 이름의 컬렉션을 반환합니다."""
+        if self.db is None:
+            raise RuntimeError("MongoDB 클라이언트가 아직 없습니다. client_registry.startup()이 먼저 실행되어야 합니다.")
         return self.db[collection_name]
 
-# 데이터베이스 인스턴스 생성 (애플리케이션 전역에서 사용)
-db = Database(MONGO_CONNECTION_STRING, DB_NAME)
+    @property
+    def transcripts(self):
+        """대화 기록을 저장할 컬렉션"""
+        return self.get_collection("transcripts")
+
+    @property
+    def recording_jobs(self):
+        """녹음 마무리 작업 큐 (재시작 후에도 이어서 처리)"""
+        return self.get_collection("recording_jobs")
+
+    @property
+    def analysis_outbox(self):
+        """분석 서버 전송 아웃박스 (재시작 후에도 이어서 전송)"""
+        return self.get_collection("analysis_outbox")
+
+    @property
+    def memory_dead_letters(self):
+        """업서트하지 못한 기억 보관 컬렉션 (재처리용)"""
+        return self.get_collection("memory_dead_letters")
 
-# 대화 기록을 저장할 컬렉션
-# 이 conversation_collection 객체를 다른 파일에서 import하여 사용합니다.
-transcripts_collection = db.get_collection("transcripts")
\ No newline at end of file
+# 데이터베이스 인스턴스 (애플리케이션 전역에서 사용, 연결은 client_registry.startup()에서)
+db = Database(MONGO_CONNECTION_STRING, DB_NAME)
\ No newline at end of file
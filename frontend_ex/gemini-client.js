@@ -1,8 +1,15 @@
+// 바이너리 프레임 헤더 (서버 managers/websocket_manager.py의 BINARY_HEADER와 동일)
+// 프레임 종류(u8), 플래그(u8), 순번(u16), 샘플레이트(u32) - 리틀엔디언 8바이트
+const BINARY_HEADER_SIZE = 8;
+const FRAME_TYPE_AUDIO_PCM16 = 1;
+
 // --- IMPORTANT : 1. Gemini API 통신 클래스 (⭐) ---
 class GeminiAPI {
-    constructor(endpoint, token = null) {
+    constructor(endpoint, token = null, protocol = 'binary') {
         this.endpoint = endpoint;
         this.token = token;
+        this.protocol = protocol; // 'binary': 오디오를 raw PCM 바이너리 프레임으로 수신, 'json': base64 JSON (구버전 서버 호환)
+        this.inputSampleRate = null; // 마이크 실제 샘플레이트 (서버가 16kHz로 변환)
         this.ws = null;
         this.reconnectAttempts = 0;
         this.maxReconnectAttempts = 5;
@@ -13,7 +20,7 @@ class GeminiAPI {
         this.onOpen = () => {}; // 서버와 연결
         this.onClose = () => {}; // 서버와 연결 해제
         this.onError = () => {}; // 서버 에러 발생 시
-        this.onAudio = () => {}; // 오디오 청크 수신 시
+        this.onAudio = () => {}; // 오디오 청크 수신 시 (binary: Int16Array, json: base64 문자열)
         this.onInputTranscript = () => {}; // 발화 텍스트 수신 시 (청크 단위)
         this.onOutputTranscript = () => {}; // 응답 텍스트 수신 시 (청크 단위)
         this.onTurnComplete = () => {}; // 모델 응답 끝났을 시
@@ -22,9 +29,15 @@ class GeminiAPI {
 
     connect() {
         this.isManualDisconnect = false;
-        // JWT 토큰을 URL 쿼리 매개변수로 추가
-        const wsUrl = this.token ? `${this.endpoint}?token=${this.token}` : this.endpoint;
+        // JWT 토큰과 프로토콜을 URL 쿼리 매개변수로 추가
+        const params = new URLSearchParams();
+        if (this.token) params.set('token', this.token);
+        if (this.protocol === 'binary') params.set('protocol', 'binary');
+        if (this.inputSampleRate) params.set('sample_rate', String(this.inputSampleRate));
+        const query = params.toString();
+        const wsUrl = query ? `${this.endpoint}?${query}` : this.endpoint;
         this.ws = new WebSocket(wsUrl);
+        this.ws.binaryType = 'arraybuffer';
         this._setupWebSocketHandlers();
     }
 
@@ -62,6 +75,10 @@ class GeminiAPI {
         };
 
         this.ws.onmessage = (event) => {
+            if (event.data instanceof ArrayBuffer) {
+                this._handleBinaryFrame(event.data);
+                return;
+            }
             try {
                 const payload = JSON.parse(event.data);
                 this._handleServerMessage(payload);
@@ -87,8 +104,25 @@ class GeminiAPI {
         };
     }
 
+    _handleBinaryFrame(buffer) {
+        if (buffer.byteLength < BINARY_HEADER_SIZE) {
+            console.warn("잘못된 바이너리 프레임 크기:", buffer.byteLength);
+            return;
+        }
+        const frameType = new DataView(buffer).getUint8(0);
+        if (frameType === FRAME_TYPE_AUDIO_PCM16) {
+            // 헤더 뒤 PCM을 복사 없이 Int16Array로 사용 (헤더가 8바이트라서 정렬됨)
+            this.onAudio(new Int16Array(buffer, BINARY_HEADER_SIZE, (buffer.byteLength - BINARY_HEADER_SIZE) >> 1));
+        } else {
+            console.warn("알 수 없는 바이너리 프레임 유형:", frameType);
+        }
+    }
+
     _handleServerMessage(payload) {
         switch (payload.type) {
+            case 'protocol':
+                console.log("서버 프로토콜:", payload.data);
+                break;
             case 'input_transcript':
                 this.onInputTranscript(payload.data);
                 break;
@@ -132,16 +166,9 @@ class StreamingAudioPlayer {
         }
     }
 
-    receiveAudio(base64Audio) {
+    receiveAudio(audio) {
         this._ensureAudioContext();
-        const binaryString = window.atob(base64Audio);
-        const len = binaryString.length;
-        const bytes = new Uint8Array(len);
-        for (let i = 0; i < len; i++) {
-            bytes[i] = binaryString.charCodeAt(i);
-        }
-
-        const int16Array = new Int16Array(bytes.buffer);
+        const int16Array = typeof audio === 'string' ? this._decodeBase64(audio) : audio;
         const float32Array = new Float32Array(int16Array.length);
         for (let i = 0; i < int16Array.length; i++) {
             float32Array[i] = int16Array[i] / 32768.0;
@@ -155,6 +182,17 @@ class StreamingAudioPlayer {
         }
     }
 
+    _decodeBase64(base64Audio) {
+        // json 프로토콜 호환용
+        const binaryString = window.atob(base64Audio);
+        const len = binaryString.length;
+        const bytes = new Uint8Array(len);
+        for (let i = 0; i < len; i++) {
+            bytes[i] = binaryString.charCodeAt(i);
+        }
+        return new Int16Array(bytes.buffer);
+    }
+
     scheduleNextChunk() {
         if (this.audioQueue.length === 0) {
             this.isPlaying = false;
@@ -253,7 +291,11 @@ class Microphone {
         this.mediaStream = await navigator.mediaDevices.getUserMedia({ audio: true });
         const source = this.audioContext.createMediaStreamSource(this.mediaStream);
 
-        this.processor = this.audioContext.createScriptProcessor(4096, 1, 1);
+        // 브라우저가 요청한 샘플레이트를 무시할 수 있으므로 실제 값을 서버에 알림 (서버가 16kHz로 변환)
+        this.actualSampleRate = this.audioContext.sampleRate;
+
+        // 작은 버퍼로 지연을 줄임 (서버가 INGEST_FRAME_MS 단위로 다시 자름)
+        this.processor = this.audioContext.createScriptProcessor(1024, 1, 1);
         this.processor.onaudioprocess = (e) => {
             const inputData = e.inputBuffer.getChannelData(0);
             const int16Array = new Int16Array(inputData.length);
@@ -348,8 +390,9 @@ connectBtn.addEventListener('click', async () => {
     });
 
     try {
-        geminiApi.connect();
         await microphone.start();
+        geminiApi.inputSampleRate = microphone.actualSampleRate;
+        geminiApi.connect();
     } catch (error) {
         console.error("연결 또는 마이크 시작 중 오류:", error);
         updateStatus(`❌ 오류: ${error.message}`, '#f8d7da');
@@ -389,7 +432,7 @@ function setupApiCallbacks() {
         stopAll();
     };
     
-    geminiApi.onAudio = (base64) => audioPlayer.receiveAudio(base64);
+    geminiApi.onAudio = (audio) => audioPlayer.receiveAudio(audio);
     geminiApi.onInputTranscript = (text) => appendTranscript(text, '사용자', 'user-transcript');
     geminiApi.onOutputTranscript = (text) => appendTranscript(text, 'AI', 'ai-transcript');
     
@@ -1,8 +1,9 @@
+import time
 import asyncio
 import logging
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Response
 from fastapi.middleware.cors import CORSMiddleware
-from google import genai
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -10,21 +11,19 @@ logger = logging.getLogger(__name__)
 
 # 설정 및 유틸리티 import
 from settings import (
-    PROJECT_ID,
-    LOCATION,
     MODEL,
-    GEMINI_API_KEY,
     PORT,
+    SEND_SAMPLE_RATE,
+    GEMINI_RECONNECT_MAX_ATTEMPTS,
     get_live_api_config,
 )
-from managers.websocket_manager import ConnectionManager
+from managers.websocket_manager import ConnectionManager, WireProtocol
 from managers.session_manager import SessionManager
+from managers.live_connection import LiveConnection
 from auth.websocket_auth import websocket_auth
-
-# --- 클라이언트 초기화 ---
-# client = genai.Client(vertexai=True, project=PROJECT_ID, location=LOCATION)
-# Google AI Studio API Key를 사용하려면:
-client = genai.Client(vertexai=False, api_key=GEMINI_API_KEY)
+from services.client_registry import client_registry
+from services.audio_ingest import InputAudioFormat
+from services import metrics
 
 # --- 전역 변수 ---
 connection_manager = ConnectionManager()
@@ -35,18 +34,32 @@ async def handle_realtime_session(websocket: WebSocket):
     user_id = await websocket_auth.authenticate_websocket(websocket)
 
     await connection_manager.connect(websocket)
-    logger.info(f"인증된 클라이언트 연결됨: {websocket.client}, 사용자 ID: {user_id}")
+    protocol = WireProtocol.negotiate(websocket)
+    input_format = InputAudioFormat.from_query(websocket.url.query, SEND_SAMPLE_RATE)
+    logger.info(f"인증된 클라이언트 연결됨: {websocket.client}, 사용자 ID: {user_id}, 프로토콜: {protocol}, 입력: {input_format}")
     session_manager = None
+    started_at = time.monotonic()
     
     try:
-        async with client.aio.live.connect(model=MODEL, config=get_live_api_config()) as session:
-            session_manager = SessionManager(websocket, session, user_id)
+        # go_away나 연결 끊김 시 최신 재개 핸들로 Gemini 연결만 교체 (클라이언트 WebSocket, 대화 기록, 녹음은 유지)
+        live = LiveConnection(
+            client_registry.genai_client, MODEL,
+            lambda handle: get_live_api_config(session_handle=handle),
+            max_attempts=GEMINI_RECONNECT_MAX_ATTEMPTS
+        )
+        async with live:
+            session_manager = SessionManager(websocket, live, user_id, protocol=protocol, input_format=input_format)
+            session_manager.announce_protocol()
+            metrics.session_started(session_manager)
 
             async with asyncio.TaskGroup() as task_group:
                 # 병렬 태스크 생성
+                task_group.create_task(session_manager.load_memory_working_set())
                 task_group.create_task(session_manager.receive_client_message())
                 task_group.create_task(session_manager.forward_to_gemini())
                 task_group.create_task(session_manager.process_gemini_response())
+                task_group.create_task(session_manager.outbound.run())
+                task_group.create_task(session_manager.transcript.run())
 
     except ExceptionGroup as eg:
         ws_disconnects, other_errors = eg.split(WebSocketDisconnect)
@@ -69,6 +82,7 @@ async def handle_realtime_session(websocket: WebSocket):
         logger.info("=== 세션 종료 처리 시작 ===")
         if session_manager:
             logger.info(f"세션 매니저 발견: {session_manager.session_id}")
+            metrics.session_finished(session_manager, time.monotonic() - started_at)
             logger.info("save_session 호출 시작...")
             await session_manager.save_session()
             logger.info("save_session 호출 완료")
@@ -80,11 +94,22 @@ async def handle_realtime_session(websocket: WebSocket):
         logger.info("=== 세션 종료 처리 완료 ===")
     logger.info("세션 종료 됨")
 
+# --- 애플리케이션 수명 주기 ---
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """공유 클라이언트를 시작 시 생성/예열하고 종료 시 정리"""
+    await client_registry.startup()
+    try:
+        yield
+    finally:
+        await client_registry.shutdown()
+
 # --- FastAPI 애플리케이션 ---
 app = FastAPI(
     title="실시간 음성 채팅 API",
     description="Gemini Live API를 사용한 실시간 음성 채팅 서비스",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 origins = [
@@ -117,6 +142,12 @@ async def health_check():
         "timestamp": asyncio.get_event_loop().time()
     }
 
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus 지표 (사용자별 레이블 없음)"""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
 @app.websocket("/ws/realtime")
 async def realtime_websocket_endpoint(websocket: WebSocket):
     """실시간 음성 채팅 WebSocket 엔드포인트"""
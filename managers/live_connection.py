@@ -0,0 +1,145 @@
+import re
+import time
+import asyncio
+import logging
+from typing import Any, Callable, Optional
+
+from services.metrics import track_latency
+
+logger = logging.getLogger(__name__)
+
+_DURATION_PATTERN = re.compile(r"^\s*([0-9]*\.?[0-9]+)\s*s?\s*$")
+
+def parse_time_left(value) -> Optional[float]:
+    """go_away.time_left("50s", "1.5s" 또는 숫자)를 초로 변환 (알 수 없으면 None)"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if hasattr(value, "total_seconds"):
+        return value.total_seconds()
+    match = _DURATION_PATTERN.match(str(value))
+    return float(match.group(1)) if match else None
+
+class LiveConnection:
+    """Gemini Live 연결과 세션 재개 핸들을 관리
+
+    서버가 보내는 session_resumption_update의 최신 핸들을 보관하고, go_away를 받거나 연결이 끊기면
+    같은 핸들로 새 연결을 먼저 연 뒤 이전 연결을 닫습니다(make-before-break). 교체하는 동안 ready가
+    내려가며, 그사이 보낼 입력은 호출자가 보관했다가 ready가 다시 올라오면 보냅니다.
+    """
+
+    def __init__(self, client, model: str, config_factory: Callable[[Optional[str]], Any],
+                 max_attempts: int = 3, retry_base_delay: float = 0.5):
+        self.client = client
+        self.model = model
+        self.config_factory = config_factory  # 핸들(없으면 None)을 받아 LiveConnectConfig 생성
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base_delay = retry_base_delay
+
+        self.session = None
+        self.handle: Optional[str] = None
+        self.generation = 0  # 연결을 교체할 때마다 증가
+        self.ready = asyncio.Event()
+        self._context = None
+        self._lock = asyncio.Lock()
+        self._scheduled: Optional[asyncio.Task] = None
+
+        # 지표
+        self.reconnects = 0
+        self.failed_reconnects = 0
+        self.last_switch_ms: Optional[float] = None
+        self.max_switch_ms = 0.0
+
+    async def _open(self, handle: Optional[str]):
+        context = self.client.aio.live.connect(model=self.model, config=self.config_factory(handle))
+        session = await context.__aenter__()
+        return context, session
+
+    async def _close(self, context):
+        try:
+            await context.__aexit__(None, None, None)
+        except Exception as e:
+            logger.debug(f"이전 Gemini 연결 닫기 중 오류 (무시): {e}")
+
+    async def __aenter__(self) -> "LiveConnection":
+        self._context, self.session = await self._open(None)
+        self.ready.set()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        if self._scheduled and not self._scheduled.done():
+            self._scheduled.cancel()
+        self.ready.clear()
+        context, self._context = self._context, None
+        if context:
+            await self._close(context)
+        return False
+
+    def update_handle(self, update):
+        """session_resumption_update에서 재개 가능한 최신 핸들을 보관"""
+        if update.resumable and update.new_handle:
+            self.handle = update.new_handle
+
+    def schedule_reconnect(self, idle: asyncio.Event, time_left: Optional[float], margin: float):
+        """go_away 수신 시 예약: 응답 중이면 idle이 될 때까지 기다리되 종료 margin초 전에는 전환"""
+        if self._scheduled and not self._scheduled.done():
+            return
+        self._scheduled = asyncio.create_task(self._reconnect_when_idle(idle, time_left, margin))
+
+    async def _reconnect_when_idle(self, idle: asyncio.Event, time_left: Optional[float], margin: float):
+        wait = max(0.0, time_left - margin) if time_left is not None else 0.0
+        if not idle.is_set():
+            try:
+                await asyncio.wait_for(idle.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                logger.info(f"응답이 끝나지 않았지만 종료 {margin:.0f}초 전이므로 Gemini 연결을 전환합니다.")
+        await self.reconnect("go_away")
+
+    async def reconnect(self, reason: str) -> bool:
+        """최신 핸들로 새 연결을 열어 교체 (다른 곳에서 이미 교체했으면 True, 실패하면 False)"""
+        generation = self.generation
+        async with self._lock:
+            if self.generation != generation:
+                return True
+            if not self.handle:
+                logger.warning(f"재개 핸들이 없어 Gemini 연결을 다시 열 수 없습니다. (사유: {reason})")
+                return False
+
+            self.ready.clear()
+            started_at = time.perf_counter()
+            for attempt in range(1, self.max_attempts + 1):
+                try:
+                    with track_latency("gemini", "resume"):
+                        context, session = await self._open(self.handle)
+                    break
+                except Exception as e:
+                    logger.warning(f"Gemini 세션 재개 실패 ({attempt}/{self.max_attempts}): {e}")
+                    if attempt < self.max_attempts:
+                        await asyncio.sleep(self.retry_base_delay * 2 ** (attempt - 1))
+            else:
+                # 이전 연결이 아직 살아 있을 수 있으므로 그대로 계속 사용
+                self.failed_reconnects += 1
+                self.ready.set()
+                return False
+
+            previous, self._context, self.session = self._context, context, session
+            self.generation += 1
+            self.reconnects += 1
+            self.last_switch_ms = (time.perf_counter() - started_at) * 1000
+            self.max_switch_ms = max(self.max_switch_ms, self.last_switch_ms)
+            self.ready.set()
+
+        logger.info(f"Gemini 세션 재개 완료 (사유: {reason}, {self.last_switch_ms:.0f}ms, {self.reconnects}번째)")
+        if previous:
+            await self._close(previous)
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "reconnects": self.reconnects,
+            "failed_reconnects": self.failed_reconnects,
+            "last_switch_ms": round(self.last_switch_ms, 1) if self.last_switch_ms is not None else None,
+            "max_switch_ms": round(self.max_switch_ms, 1),
+            "resumable": self.handle is not None,
+        }
@@ -1,46 +1,146 @@
 import asyncio
+import dataclasses
 import datetime
-import base64
+import random
 import traceback
 import logging
+import time
 import uuid
-from typing import List, Dict, Any
+from collections import deque
+from typing import List, Dict, Any, Optional, Deque
 from fastapi import WebSocket, WebSocketDisconnect
-import requests
 
 logger = logging.getLogger(__name__)
 
 from models.models import ConversationLog, ConversationTurn, SpeakerEnum
-from settings import ResponseType, SEND_SAMPLE_RATE, MEMORY_RELEVANCE_THRESHOLD, MAX_MEMORY_RESULTS, ANALYZE_SERVER
-from managers.websocket_manager import PayloadManager
-from services.memory_service import memory_service
+from settings import (
+    ResponseType, SEND_SAMPLE_RATE, MEMORY_RELEVANCE_THRESHOLD, MAX_MEMORY_RESULTS,
+    MEMORY_WORKING_SET_ENABLED, MEMORY_WORKING_SET_MAX_SIZE,
+    RECEIVE_SAMPLE_RATE, AUDIO_COALESCE_WINDOW_MS, AUDIO_COALESCE_MAX_BYTES,
+    OUTBOUND_QUEUE_MAX_ITEMS, OUTBOUND_SLOW_CONSUMER_SECONDS,
+    INGEST_FRAME_MS, AUDIO_QUEUE_MAX_MS, AUDIO_QUEUE_POLICY, AUDIO_QUEUE_LIVE_MS,
+    VAD_ENABLED, VAD_MODE, VAD_ENERGY_THRESHOLD_DB, VAD_HANGOVER_MS, VAD_THROTTLE_INTERVAL_MS, VAD_STREAM_END_MS,
+    CAPTURE_ENABLED, CAPTURE_SAMPLE_RATE, CAPTURE_DIR, MODEL,
+    GEMINI_RECONNECT_MARGIN_SECONDS, GEMINI_RESUME_BUFFER_MS,
+    TRANSCRIPT_FLUSH_MAX_TURNS, TRANSCRIPT_FLUSH_INTERVAL_SECONDS,
+)
+from managers.websocket_manager import PayloadManager, WireProtocol, OutboundWriter, BINARY_PROTOCOL_VERSION
+from managers.live_connection import LiveConnection, parse_time_left
+from services.memory_service import memory_service, MemorySearchResult
+from services.memory_working_set import MemoryWorkingSet
 from services.audio_service import audio_service
+from services.recording_jobs import recording_job_queue
+from services.analysis_outbox import analysis_outbox
+from services.voice_activity import VoiceActivityDetector
+from services.audio_ingest import AudioIngest, InputAudioFormat, AudioInputQueue
+from services.metrics import observe_tool_call, count_audio
+from services.turn_latency import TurnLatencyTracker
+from services.transcript_writer import TranscriptWriter
+from services.session_capture import SessionCaptureWriter
 
+from google.genai.errors import APIError
 from google.genai.types import FunctionResponse
 
 from pymongo.errors import PyMongoError
-from database import transcripts_collection
+from database import db
 
 class SessionManager:
     """개별 세션을 관리하는 클래스"""
     
-    def __init__(self, websocket: WebSocket, session, user_id: str = "guest_user"):
+    def __init__(self, websocket: WebSocket, live: Optional[LiveConnection], user_id: str = "guest_user",
+                 protocol: str = WireProtocol.JSON, input_format: Optional[InputAudioFormat] = None):
         self.websocket = websocket
-        self.session = session
-        self.audio_queue = asyncio.Queue()
+        self.live = live  # Gemini Live 연결 (go_away/연결 끊김 시 같은 대화로 교체됨)
+        
+        # Gemini 연결 전환 중 보낼 입력 오디오 보관 (넘치면 오래된 것부터 버림)
+        self.resume_buffer: Deque[bytes] = deque()
+        self.resume_buffer_bytes = 0
+        self.resume_buffer_max_bytes = SEND_SAMPLE_RATE * 2 * GEMINI_RESUME_BUFFER_MS // 1000
+        self.resume_buffer_dropped = 0
+        self.responding_idle = asyncio.Event()  # 모델이 응답 중이 아닐 때 set (연결 전환 시점 판단)
+        self.responding_idle.set()
+        # Gemini로 보낼 오디오 큐 (가득 차면 AUDIO_QUEUE_POLICY에 따라 처리해 지연이 쌓이지 않게 함)
+        self.audio_queue = AudioInputQueue(
+            max_chunks=max(1, AUDIO_QUEUE_MAX_MS // INGEST_FRAME_MS),
+            policy=AUDIO_QUEUE_POLICY,
+            live_chunks=max(1, AUDIO_QUEUE_LIVE_MS // INGEST_FRAME_MS)
+        )
+        
+        # 마이크 입력 단계 (선언된 형식을 16kHz 모노 PCM으로 변환하고 INGEST_FRAME_MS 단위로 다시 자름)
+        self.ingest = AudioIngest(
+            input_format or InputAudioFormat(sample_rate=SEND_SAMPLE_RATE),
+            target_rate=SEND_SAMPLE_RATE,
+            frame_ms=INGEST_FRAME_MS
+        )
+        
+        # 클라이언트 송신 큐 (전용 writer 태스크가 전송, binary면 오디오를 바이너리 프레임으로 전송)
+        self.protocol = protocol
+        self.outbound = OutboundWriter(
+            websocket, protocol, RECEIVE_SAMPLE_RATE,
+            max_queue_size=OUTBOUND_QUEUE_MAX_ITEMS,
+            coalesce_window_ms=AUDIO_COALESCE_WINDOW_MS,
+            coalesce_max_bytes=AUDIO_COALESCE_MAX_BYTES,
+            slow_consumer_seconds=OUTBOUND_SLOW_CONSUMER_SECONDS
+        )
         
         # 세션 정보
         self.session_id: str = str(uuid.uuid4())
         self.user_id: str = user_id  # JWT에서 추출된 사용자 ID
         self.start_time: datetime.datetime = datetime.datetime.now()
         self.end_time: datetime.datetime = None
-        self.conversation: List[ConversationTurn] = []  # 타입 수정
+        self.turn_latency = TurnLatencyTracker()  # 턴별 응답 지연 타임라인
+        
+        # 대화 기록 (세션 시작 시 문서를 만들고 완료된 턴을 나눠서 추가, 메모리에는 미기록 턴만 남음)
+        self.transcript = TranscriptWriter(
+            db.transcripts,
+            ConversationLog(session_id=self.session_id, user_id=user_id, start_time=self.start_time, conversation=[]),
+            self.turn_latency.turns,
+            max_pending_turns=TRANSCRIPT_FLUSH_MAX_TURNS,
+            flush_interval=TRANSCRIPT_FLUSH_INTERVAL_SECONDS
+        )
+        
+        # 사용자 기억 작업 집합 (세션 시작 시 로드, 로컬 검색용)
+        self.memory_working_set = MemoryWorkingSet(user_id, max_size=MEMORY_WORKING_SET_MAX_SIZE)
         
         # 스트리밍 녹음기 생성
         self.audio_recorder = audio_service.create_streaming_recorder(user_id, self.session_id)
         
-        # 레거시 지원용 (기존 코드와 호환성)
-        self.input_audio_chunks: List = []
+        # 음성 구간 검출 (Gemini로 보내는 오디오에만 적용, 녹음기는 전체 오디오를 받음)
+        self.vad = None
+        if VAD_ENABLED:
+            self.vad = VoiceActivityDetector(
+                SEND_SAMPLE_RATE,
+                mode=VAD_MODE,
+                energy_threshold_db=VAD_ENERGY_THRESHOLD_DB,
+                hangover_ms=VAD_HANGOVER_MS,
+                throttle_interval_ms=VAD_THROTTLE_INTERVAL_MS,
+                stream_end_ms=VAD_STREAM_END_MS
+            )
+        
+        # 재현/재생용 세션 캡처 (원본 마이크 입력과 Live API 응답 이벤트)
+        self.capture: Optional[SessionCaptureWriter] = None
+        if CAPTURE_ENABLED and random.random() < CAPTURE_SAMPLE_RATE:
+            self.capture = SessionCaptureWriter.create(CAPTURE_DIR, self.session_id, {
+                "session_id": self.session_id,
+                "user_id": user_id,
+                "model": MODEL,
+                "protocol": protocol,
+                "input_format": dataclasses.asdict(self.ingest.input_format),
+                "started_at": self.start_time.isoformat(),
+            })
+
+    @property
+    def session(self):
+        """현재 Gemini Live 세션"""
+        return self.live.session if self.live else None
+
+    def announce_protocol(self):
+        """binary 프로토콜을 수락했음을 클라이언트에 알림 (json 클라이언트에는 보내지 않음)"""
+        if self.protocol == WireProtocol.BINARY:
+            self.outbound.send_text(PayloadManager.to_payload(
+                ResponseType.PROTOCOL,
+                {"name": WireProtocol.BINARY, "version": BINARY_PROTOCOL_VERSION, "sample_rate": RECEIVE_SAMPLE_RATE}
+            ))
 
     async def add_audio(self, message):
         """오디오 메시지를 큐에 추가"""
@@ -50,9 +150,6 @@ class SessionManager:
             success = await self.audio_recorder.append_audio_chunk(message)
             if not success:
                 logger.error(f"오디오 청크 추가 실패: {len(message)} bytes")
-            
-            # 레거시 지원 (기존 코드와 호환성)
-            self.input_audio_chunks.append(message)
         else:
             logger.info("오디오 스트림 종료 신호 수신")
     
@@ -66,7 +163,7 @@ class SessionManager:
 
         content_text = ''.join(content) if isinstance(content, list) else content
         if content_text.strip():  # 빈 내용은 저장하지 않음
-            self.conversation.append(ConversationTurn(speaker=speaker, content=content_text))
+            self.transcript.add(ConversationTurn(speaker=speaker, content=content_text))
 
     async def save_session(self):
         """세션 정보를 DB에 저장"""
@@ -75,60 +172,52 @@ class SessionManager:
             # 세션 종료 시간 기록
             self.end_time = datetime.datetime.now()
             
-            # 대화가 없으면 저장하지 않음
-            if len(self.conversation) <= 0:
-                logger.info("대화가 없습니다.")
-                return
-            
-            # 스트리밍 녹음 완료 및 WAV 파일 생성
-            audio_url = None
-            if self.audio_recorder:
+            self.outbound.close()
+            logger.info(f"클라이언트 송신 큐 지표: {self.outbound.stats()}")
+            logger.info(f"입력 오디오 지표: {self.ingest.stats()}")
+            logger.info(f"오디오 큐 지표: {self.audio_queue.stats()}")
+            self.turn_latency.close()
+            if self.capture:
                 try:
-                    audio_url = await self.audio_recorder.finalize_recording()
-                    if audio_url:
-                        logger.info(f"스트리밍 음성 파일 업로드 완료: {audio_url}")
-                    else:
-                        logger.warning("음성 파일 업로드 실패 - 녹음된 데이터가 없거나 업로드 중 오류 발생")
+                    await self.capture.close()
                 except Exception as e:
-                    logger.error(f"녹음 완료 처리 중 오류: {e}")
-                finally:
-                    # 리소스 정리
-                    self.audio_recorder.cleanup()
-                    self.audio_recorder = None
+                    logger.error(f"세션 캡처 마무리 중 오류: {e}")
+            logger.info(f"턴 지연 지표: {self.turn_latency.stats()}")
+            if self.live:
+                logger.info(f"Gemini 연결 지표: {self.live.stats()} (전환 중 버린 오디오 {self.resume_buffer_dropped}개)")
+            if self.vad:
+                logger.info(f"VAD 지표: {self.vad.stats()}")
             
-            log = ConversationLog(
-                session_id=self.session_id,
-                user_id=self.user_id,
-                start_time=self.start_time,
-                end_time=self.end_time,
-                conversation=self.conversation,
-                audio_recording_url=audio_url  # 음성 파일 URL 추가
-            )
-
-            # Pydantic 모델을 딕셔너리로 변환하여 MongoDB에 저장 (UUID를 문자열로 변환)
-            log_dict = log.model_dump()
-            if 'session_id' in log_dict:
-                log_dict['session_id'] = str(log_dict['session_id'])
-
-            result = await transcripts_collection.insert_one(log_dict)
-                
-            logger.info(f"세션 저장 성공: {self.session_id}, DB ID: {result.inserted_id}")
-            if audio_url:
-                logger.info(f"음성 파일: {audio_url}")
+            # 버퍼에 남은 기억 업서트
+            try:
+                await memory_service.flush_pending_memories(self.user_id)
+            except Exception as e:
+                logger.error(f"기억 버퍼 플러시 중 오류: {e}")
             
-            # 분석 서버로 전송 (ObjectId와 datetime을 문자열로 변환)
-            log_dict_for_api = log_dict.copy()
-            log_dict_for_api['_id'] = str(result.inserted_id)
+            # 대화가 없으면 세션 시작 시 만든 문서를 지움
+            if self.transcript.turn_count <= 0:
+                logger.info("대화가 없습니다.")
+                if self.audio_recorder:
+                    self.audio_recorder.discard()
+                    self.audio_recorder = None
+                await self.transcript.discard()
+                return
             
-            # datetime 객체를 ISO 문자열로 변환
-            if 'start_time' in log_dict_for_api and isinstance(log_dict_for_api['start_time'], datetime.datetime):
-                log_dict_for_api['start_time'] = log_dict_for_api['start_time'].isoformat()
-            if 'end_time' in log_dict_for_api and isinstance(log_dict_for_api['end_time'], datetime.datetime):
-                log_dict_for_api['end_time'] = log_dict_for_api['end_time'].isoformat()
+            # 남은 턴과 종료 시각 기록 (음성 파일 URL은 백그라운드 녹음 마무리 작업이 완료된 뒤 문서에 반영됨)
+            recorder, self.audio_recorder = self.audio_recorder, None
+            try:
+                await self.transcript.close(self.end_time)
+            finally:
+                # 녹음 마무리(스트림 닫기, WAV 생성)는 백그라운드 작업 큐로 넘기고 바로 진행.
+                # 분석 서버 전송은 음성 파일 URL이 문서에 반영된 뒤 녹음 작업 큐가 대기열에 추가함
+                if recorder:
+                    recording_job_queue.finalize_in_background(recorder, self.session_id)
                 
-            response = requests.post(ANALYZE_SERVER, json=log_dict_for_api)
-            logger.info(f"HTTP 상태 코드: {response.status_code}")
-            logger.info(f"HTTP 응답: {response.json()}")
+            logger.info(f"세션 저장 성공: {self.session_id}, 대화 기록 지표: {self.transcript.stats()}")
+            
+            # 녹음이 없으면 바로 분석 서버 전송 대기열에 추가 (전송은 백그라운드에서)
+            if not recorder:
+                await analysis_outbox.enqueue_transcript(db.transcripts, self.session_id)
 
         except PyMongoError as e:
             logger.error(f"MongoDB 저장 중 오류 발생: {e}")
@@ -141,6 +230,32 @@ class SessionManager:
                 self.audio_recorder.cleanup()
                 self.audio_recorder = None
 
+    async def load_memory_working_set(self):
+        """세션 시작 시 사용자 기억 작업 집합을 불러옴 (실패 시 Pinecone 검색 사용)"""
+        if not MEMORY_WORKING_SET_ENABLED:
+            return
+        try:
+            await self.memory_working_set.load()
+        except Exception as e:
+            logger.error(f"기억 작업 집합 로드 중 오류: {e}")
+
+    async def _search_memories(self, query: str, top_k: int) -> List[MemorySearchResult]:
+        """기억 검색 (작업 집합이 준비되어 있으면 로컬에서, 아니면 Pinecone에서 검색)"""
+        if self.memory_working_set.ready:
+            query_embedding = await memory_service.get_embedding_async(query)
+            if query_embedding:
+                return self.memory_working_set.search(query_embedding, top_k)
+        return await memory_service.retrieve_memories_async(query, top_k, self.user_id)
+
+    async def _save_memory(self, content: str, metadata: Dict[str, Any]) -> str:
+        """기억 저장 후 작업 집합에도 반영"""
+        memory_id = await memory_service.add_memory_async(self.user_id, content, metadata)
+        if memory_id and (self.memory_working_set.ready or self.memory_working_set.loading):
+            # 저장 시 계산된 임베딩은 캐시에 있으므로 추가 API 호출 없음
+            embedding = await memory_service.get_embedding_async(content)
+            self.memory_working_set.add(embedding, metadata, memory_id)
+        return memory_id
+
     async def handle_function_call(self, function_name: str, args: Dict[str, Any]) -> str:
         """함수 호출을 처리"""
         try:
@@ -162,7 +277,7 @@ class SessionManager:
         if not query:
             return "검색어가 제공되지 않았습니다."
             
-        memories = memory_service.retrieve_memories(query, top_k=5, user_id=self.user_id)
+        memories = await self._search_memories(query, top_k=5)
         logger.debug(f"Retrieved {len(memories)} memories")
                 
         
@@ -216,7 +331,7 @@ class SessionManager:
             "session_id": self.session_id
         }
         
-        memory_id = memory_service.add_memory(self.user_id, content, metadata)
+        memory_id = await self._save_memory(content, metadata)
         
         if memory_id:
             return f"새로운 기억이 저장되었습니다: '{content}' (카테고리: {category})"
@@ -229,7 +344,11 @@ class SessionManager:
             while True:
                 # FastAPI WebSocket 방식으로 수정
                 message = await self.websocket.receive_bytes()
-                await self.add_audio(message)
+                count_audio("client_in", message)
+                if self.capture:
+                    await self.capture.client_audio(message)
+                for frame in self.ingest.process(message):
+                    await self.add_audio(frame)
         except WebSocketDisconnect as e:
             logger.info("오디오 수신 중 WebSocket 연결이 종료되었습니다.")
             raise  # WebSocketDisconnect를 상위로 전파
@@ -239,7 +358,11 @@ class SessionManager:
             raise  # 다른 예외도 상위로 전파
 
         finally:
+            for frame in self.ingest.flush():
+                await self.add_audio(frame)
             await self.add_audio(None)  # 스트림 종료 신호
+            if self.capture:
+                await self.capture.client_end()
 
     async def forward_to_gemini(self):
         """오디오 데이터를 Gemini로 전달"""
@@ -250,39 +373,88 @@ class SessionManager:
                 break
                 
             try:
-                await self.session.send_realtime_input(
-                    media={
-                        "data": data,
-                        "mime_type": f"audio/pcm;rate={SEND_SAMPLE_RATE}",
-                    }
-                )
+                if self.vad is None:
+                    await self._send_audio_to_gemini(data)
+                else:
+                    # 무음 구간은 줄여서 보내고, 긴 무음이 시작되면 오디오 스트림 종료를 알림
+                    result = self.vad.process(data)
+                    if not result.send:
+                        count_audio("vad_suppressed", data)
+                    for chunk in result.send:
+                        await self._send_audio_to_gemini(chunk)
+                    if result.end_stream and self._gemini_ready():
+                        await self.session.send_realtime_input(audio_stream_end=True)
 
             except Exception as e:
                 logger.error(f"Gemini로 데이터 전송 중 오류: {e}")
-            
-            finally:
-                self.audio_queue.task_done()
     
+    def _gemini_ready(self) -> bool:
+        return self.live is None or self.live.ready.is_set()
+
+    async def _send_audio_to_gemini(self, data: bytes):
+        """Gemini로 오디오 전송 (연결 전환 중이면 보관했다가 전환 후 먼저 보냄)"""
+        if not self._gemini_ready():
+            self._buffer_for_resume(data)
+            return
+        while self.resume_buffer:
+            chunk = self.resume_buffer.popleft()
+            self.resume_buffer_bytes -= len(chunk)
+            await self._send_media(chunk)
+        try:
+            await self._send_media(data)
+        except Exception:
+            # 전송 도중 연결 전환이 시작됐으면 새 연결로 보냄
+            if self._gemini_ready():
+                raise
+            self._buffer_for_resume(data)
+
+    def _buffer_for_resume(self, data: bytes):
+        self.resume_buffer.append(data)
+        self.resume_buffer_bytes += len(data)
+        while self.resume_buffer_bytes > self.resume_buffer_max_bytes and len(self.resume_buffer) > 1:
+            self.resume_buffer_bytes -= len(self.resume_buffer.popleft())
+            self.resume_buffer_dropped += 1
+
+    async def _send_media(self, data: bytes):
+        count_audio("to_gemini", data)
+        await self.session.send_realtime_input(
+            media={
+                "data": data,
+                "mime_type": f"audio/pcm;rate={SEND_SAMPLE_RATE}",
+            }
+        )
+
     async def process_gemini_response(self):
         """Gemini 응답 처리"""
+        # 연결이 전환되어도 진행 중인 턴의 전사는 이어서 모음
+        input_transcriptions = []
+        output_transcriptions = []
         while True:
-            input_transcriptions = []
-            output_transcriptions = []
-
+            session = self.session
             try:
-                async for response in self.session.receive():
-                    # 세션 재개 처리
+                async for response in session.receive():
+                    if self.capture:
+                        await self.capture.live_event(response)
+                    
+                    # 세션 재개 처리 (최신 핸들 보관)
                     if response.session_resumption_update:
-                        update = response.session_resumption_update
-                        if update.resumable and update.new_handle:
-                            logger.info(f"새 세션 핸들: {update.new_handle}")
+                        if self.live:
+                            self.live.update_handle(response.session_resumption_update)
+                        logger.debug(f"새 세션 핸들: {response.session_resumption_update.new_handle}")
                     
-                    # 연결 종료 예정 알림
+                    # 연결 종료 예정 알림 (응답이 끝나면, 늦어도 종료 직전에 새 연결로 전환)
                     if response.go_away is not None:
                         logger.info(f"연결 종료 예정: {response.go_away.time_left}")
+                        if self.live:
+                            self.live.schedule_reconnect(
+                                self.responding_idle,
+                                parse_time_left(response.go_away.time_left),
+                                GEMINI_RECONNECT_MARGIN_SECONDS
+                            )
 
                     # 도구 호출 처리 (server_content보다 먼저 처리)
                     if response.tool_call:
+                        self.responding_idle.clear()
                         await self._handle_tool_calls(response.tool_call)
                         continue
 
@@ -292,14 +464,19 @@ class SessionManager:
 
                     # 중단 처리
                     if server_content.interrupted:
-                        logger.info("응답이 중단되었습니다.")
-                        await self.websocket.send_text(
+                        # 아직 보내지 않은 오디오는 즉시 버려 바로 말을 멈추게 함
+                        self.turn_latency.interrupted()
+                        self.responding_idle.set()
+                        purged = self.outbound.purge_audio()
+                        logger.info(f"응답이 중단되었습니다. (미전송 오디오 {purged}개 제거)")
+                        self.outbound.send_text(
                             PayloadManager.to_payload(ResponseType.INTERRUPT, "")
                         )
                         continue
                     
                     # 오디오 응답 처리
                     if server_content.model_turn:
+                        self.responding_idle.clear()
                         await self._handle_audio_response(server_content.model_turn)
 
                     # 전사 처리
@@ -309,7 +486,9 @@ class SessionManager:
                     
                     # 턴 완료 처리
                     if server_content.turn_complete:
-                        await self.websocket.send_text(
+                        self.turn_latency.turn_complete()
+                        self.responding_idle.set()
+                        self.outbound.send_text(
                             PayloadManager.to_payload(ResponseType.TURN_COMPLETE, True)
                         )
                         logger.info("Gemini 응답 완료")
@@ -323,113 +502,131 @@ class SessionManager:
                             self.add_transcription(ResponseType.OUTPUT_TRANSCRIPT, output_transcriptions)
                             output_transcriptions.clear()
             
+            except APIError as e:
+                if self.session is not session:
+                    continue  # 전환으로 닫힌 이전 연결
+                logger.warning(f"Gemini 연결 끊김: {e}")
+                if self.live and await self.live.reconnect("disconnect"):
+                    continue
+                raise
+
             except Exception as e:
+                if self.session is not session:
+                    continue
                 logger.error(f"Gemini 응답 처리 중 오류: {e}")
                 traceback.print_exc()
 
     async def _handle_tool_calls(self, tool_call):
-        """도구 호출 처리"""
+        """도구 호출 처리 (하나의 tool_call 안의 함수 호출들을 동시에 실행)"""
         logger.info(f"[TOOL CALL] Processing {len(tool_call.function_calls)} function calls")
+        started_at = time.perf_counter()
         
-        function_responses = []
-        for fc in tool_call.function_calls:
-            function_name = fc.name
-            function_args = fc.args if hasattr(fc, 'args') else {}
-            
-            logger.info(f"[FUNCTION CALL] {function_name}({function_args})")
-            
-            try:
-                if function_name == "search_memories":
-                    query = function_args.get("query", "")
-                    top_k = function_args.get("top_k", 3)
-                    
-                    logger.debug(f"search_memories called with query: '{query}', top_k: {top_k}")
+        # 각 호출은 개별적으로 오류를 격리하며, gather는 입력 순서대로 결과를 반환
+        function_responses = await asyncio.gather(
+            *(self._execute_function_call(fc) for fc in tool_call.function_calls)
+        )
+        
+        # Send all function responses
+        if function_responses:
+            await self.session.send_tool_response(function_responses=list(function_responses))
+        
+        elapsed = time.perf_counter() - started_at
+        self.turn_latency.tool_calls(len(function_responses), elapsed)
+        logger.info(f"[TOOL CALL] {len(function_responses)} function calls completed in {elapsed * 1000:.1f}ms")
+
+    async def _execute_function_call(self, fc) -> FunctionResponse:
+        """단일 함수 호출 실행 (오류는 해당 호출의 응답으로만 반환)"""
+        function_name = fc.name
+        function_args = fc.args if hasattr(fc, 'args') else {}
+        started_at = time.perf_counter()
+        
+        logger.info(f"[FUNCTION CALL] {function_name}({function_args})")
+        
+        try:
+            if function_name == "search_memories":
+                query = function_args.get("query", "")
+                top_k = function_args.get("top_k", 3)
+                
+                logger.debug(f"search_memories called with query: '{query}', top_k: {top_k}")
+                
+                if not query:
+                    result = "검색어가 제공되지 않았습니다."
+                else:
+                    memories = await self._search_memories(query, top_k)
+                    logger.debug(f"Retrieved {len(memories)} memories")
                     
-                    if not query:
-                        result = "검색어가 제공되지 않았습니다."
-                    else:
-                        memories = memory_service.retrieve_memories(query, top_k, self.user_id)
-                        logger.debug(f"Retrieved {len(memories)} memories")
-                        
-                        if memories:
-                            memory_text = []
-                            for memory in memories:
-                                content = memory.metadata.get('content', '')
-                                score = memory.score
-                                logger.debug(f"Memory: score={score}, content={content[:50] if content else 'No content'}")
-                                
-                                if score > 0.001:
-                                    date = memory.metadata.get('date', '')
-                                    memory_info = f"- {content}"
-                                    if date:
-                                        memory_info += f" (날짜: {date})"
-                                    memory_text.append(memory_info)
+                    if memories:
+                        memory_text = []
+                        for memory in memories:
+                            content = memory.metadata.get('content', '')
+                            score = memory.score
+                            logger.debug(f"Memory: score={score}, content={content[:50] if content else 'No content'}")
                             
-                            if memory_text:
-                                result = "검색된 기억:\n" + "\n".join(memory_text)
-                            else:
-                                result = "관련된 기억을 찾을 수 없습니다."
+                            if score > 0.001:
+                                date = memory.metadata.get('date', '')
+                                memory_info = f"- {content}"
+                                if date:
+                                    memory_info += f" (날짜: {date})"
+                                memory_text.append(memory_info)
+                        
+                        if memory_text:
+                            result = "검색된 기억:\n" + "\n".join(memory_text)
                         else:
                             result = "관련된 기억을 찾을 수 없습니다."
-                
-                elif function_name == "save_new_memory":
-                    content = function_args.get("content", "")
-                    
-                    if not content:
-                        result = "저장할 내용이 제공되지 않았습니다."
                     else:
-                        metadata = {
-                            "user_id": self.user_id,
-                            "date": datetime.datetime.now().strftime("%Y-%m-%d")
-                        }
-                        
-                        memory_id = memory_service.add_memory(self.user_id, content, metadata)
-                        
-                        if memory_id:
-                            result = f"기억이 저장되었습니다: {content}"
-                        else:
-                            result = "기억 저장 중 오류가 발생했습니다."
+                        result = "관련된 기억을 찾을 수 없습니다."
+            
+            elif function_name == "save_new_memory":
+                content = function_args.get("content", "")
                 
+                if not content:
+                    result = "저장할 내용이 제공되지 않았습니다."
                 else:
-                    result = f"알 수 없는 함수: {function_name}"
-                
-                logger.info(f"[FUNCTION RESULT] {result}")
-                
-                # FunctionResponse 생성
-                function_response = FunctionResponse(
-                    id=fc.id,
-                    name=fc.name,
-                    response={"result": result}
-                )
-                function_responses.append(function_response)
-                
-            except Exception as e:
-                logger.error(f"[FUNCTION ERROR] {function_name}: {e}")
-                traceback.print_exc()
-                error_response = FunctionResponse(
-                    id=fc.id,
-                    name=fc.name,
-                    response={"error": str(e)}
-                )
-                function_responses.append(error_response)
-        
-        # Send all function responses
-        if function_responses:
-            await self.session.send_tool_response(function_responses=function_responses)
-    
+                    metadata = {
+                        "user_id": self.user_id,
+                        "date": datetime.datetime.now().strftime("%Y-%m-%d")
+                    }
+                    
+                    memory_id = await self._save_memory(content, metadata)
+                    
+                    if memory_id:
+                        result = f"기억이 저장되었습니다: {content}"
+                    else:
+                        result = "기억 저장 중 오류가 발생했습니다."
+            
+            else:
+                result = f"알 수 없는 함수: {function_name}"
+            
+            elapsed = time.perf_counter() - started_at
+            observe_tool_call(function_name, elapsed)
+            logger.info(f"[FUNCTION RESULT] {function_name} ({elapsed * 1000:.1f}ms) {result}")
+            
+            # FunctionResponse 생성
+            return FunctionResponse(
+                id=fc.id,
+                name=fc.name,
+                response={"result": result}
+            )
+            
+        except Exception as e:
+            observe_tool_call(function_name, time.perf_counter() - started_at, outcome="error")
+            logger.error(f"[FUNCTION ERROR] {function_name}: {e}")
+            traceback.print_exc()
+            return FunctionResponse(
+                id=fc.id,
+                name=fc.name,
+                response={"error": str(e)}
+            )
 
     async def _handle_audio_response(self, model_turn):
         """오디오 응답 처리"""
         for part in model_turn.parts:
-            if part.inline_data:
-                encoded_audio = base64.b64encode(part.inline_data.data).decode('utf-8')
-                try:
-                    await self.websocket.send_text(
-                        PayloadManager.to_payload(ResponseType.AUDIO, encoded_audio)
-                    )
-                except Exception as e:
-                    logger.error(f"오디오 전송 중 오류: {e}")
-        
+            if not part.inline_data:
+                continue
+            count_audio("from_gemini", part.inline_data.data)
+            self.turn_latency.model_audio()
+            # 송신 큐에 넣고 바로 반환 (인코딩과 전송은 writer 태스크에서)
+            self.outbound.send_audio(part.inline_data.data)
 
     async def _handle_transcriptions(self, server_content, input_transcriptions, output_transcriptions):
         """전사 내용 처리"""
@@ -437,8 +634,9 @@ class SessionManager:
             # 입력 전사
             if hasattr(server_content, 'input_transcription') and server_content.input_transcription:
                 if server_content.input_transcription.text:
+                    self.turn_latency.input_transcript()
                     input_transcriptions.append(server_content.input_transcription.text)
-                    await self.websocket.send_text(
+                    self.outbound.send_text(
                         PayloadManager.to_payload(
                             ResponseType.INPUT_TRANSCRIPT, 
                             server_content.input_transcription.text
@@ -449,7 +647,7 @@ class SessionManager:
             if hasattr(server_content, 'output_transcription') and server_content.output_transcription:
                 if server_content.output_transcription.text:
                     output_transcriptions.append(server_content.output_transcription.text)
-                    await self.websocket.send_text(
+                    self.outbound.send_text(
                         PayloadManager.to_payload(
                             ResponseType.OUTPUT_TRANSCRIPT, 
                             server_content.output_transcription.text
@@ -1,8 +1,17 @@
 from fastapi import WebSocket
-from typing import List, Set
+from collections import deque
+from typing import List, Any, Deque, Tuple
+from urllib.parse import parse_qs
+import asyncio
+import base64
 import json
+import time
+import struct
 import logging
 
+from settings import ResponseType
+from services.metrics import WS_SEND_SECONDS, AUDIO_DROPPED, count_audio
+
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
@@ -33,6 +42,30 @@ class ConnectionManager:
             except Exception as e:
                 logger.error(f"브로드캐스트 중 오류 발생: {e}")
 
+class WireProtocol:
+    """클라이언트와 협상한 전송 프로토콜
+
+    - json: 모든 메시지를 JSON 텍스트로 전송 (오디오는 base64, 기존 클라이언트용 기본값)
+    - binary: 오디오는 헤더가 붙은 raw PCM 바이너리 프레임, 전사/제어 이벤트는 JSON 텍스트
+    """
+    JSON = "json"
+    BINARY = "binary"
+
+    @staticmethod
+    def negotiate(websocket: WebSocket) -> str:
+        """쿼리 파라미터(?protocol=binary)로 요청한 프로토콜 (없거나 모르는 값이면 json)"""
+        requested = parse_qs(websocket.url.query).get("protocol", [WireProtocol.JSON])[0]
+        return WireProtocol.BINARY if requested == WireProtocol.BINARY else WireProtocol.JSON
+
+class BinaryFrameType:
+    """바이너리 프레임 종류"""
+    AUDIO_PCM16 = 1  # 16비트 리틀엔디언 모노 PCM
+
+# 바이너리 프레임 헤더: 프레임 종류(u8), 플래그(u8), 순번(u16, 순환), 샘플레이트(u32) - 리틀엔디언 8바이트
+# 헤더가 8바이트라서 페이로드가 2바이트 정렬되어 클라이언트가 복사 없이 Int16Array로 볼 수 있음
+BINARY_HEADER = struct.Struct("<BBHI")
+BINARY_PROTOCOL_VERSION = 1
+
 class PayloadManager:
     """페이로드 관련 유틸리티를 관리하는 클래스"""
     
@@ -48,4 +81,188 @@ class PayloadManager:
     @staticmethod
     def from_payload(payload: str) -> dict:
         """JSON 페이로드를 파싱"""
-        return json.loads(payload)
\ No newline at end of file
+        return json.loads(payload)
+
+    @staticmethod
+    def to_binary_frame(frame_type: int, sequence: int, sample_rate: int, data: bytes) -> bytes:
+        """헤더를 붙인 바이너리 프레임 생성"""
+        return BINARY_HEADER.pack(frame_type, 0, sequence & 0xFFFF, sample_rate) + data
+
+class OutboundWriter:
+    """세션별 클라이언트 송신 큐와 전용 writer 태스크
+
+    Gemini 수신 루프는 send_text()/send_audio()로 큐에 넣기만 하고 바로 돌아가며, 전송은 run() 태스크가 담당합니다.
+    - 큐에 연속으로 쌓인 오디오는 한 메시지로 합쳐 전송 (binary: 헤더 + PCM 프레임, json: base64 JSON)
+    - 큐가 가득 차면 가장 오래된 오디오를 버림 (전사/제어 이벤트는 버리지 않음)
+    - 응답 중단 시 purge_audio()로 아직 보내지 않은 오디오를 즉시 제거
+    - 가장 오래된 항목이 slow_consumer_seconds 이상 밀리면 느린 클라이언트로 표시하고 경고
+    """
+
+    AUDIO = "audio"
+    TEXT = "text"
+
+    def __init__(self, websocket: WebSocket, protocol: str, sample_rate: int, max_queue_size: int = 256,
+                 coalesce_window_ms: float = 0.0, coalesce_max_bytes: int = 48000, slow_consumer_seconds: float = 2.0):
+        self.websocket = websocket
+        self.protocol = protocol
+        self.sample_rate = sample_rate
+        self.max_queue_size = max_queue_size
+        self.coalesce_window = coalesce_window_ms / 1000
+        self.coalesce_max_bytes = coalesce_max_bytes
+        self.slow_consumer_seconds = slow_consumer_seconds
+
+        self._items: Deque[Tuple[str, Any, float]] = deque()  # (종류, 데이터, 큐에 넣은 시각)
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self._sequence = 0
+        self.slow_consumer = False
+
+        # 지표
+        self.audio_parts_in = 0
+        self.audio_messages_out = 0
+        self.text_messages_out = 0
+        self.bytes_out = 0
+        self.dropped_audio = 0
+        self.purged_audio = 0
+        self.slow_consumer_events = 0
+        self.max_queue_depth = 0
+        self.max_lag = 0.0
+        self.max_send_ms = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._items)
+
+    @property
+    def lag(self) -> float:
+        """가장 오래된 미전송 항목이 기다린 시간(초)"""
+        return time.monotonic() - self._items[0][2] if self._items else 0.0
+
+    def send_text(self, payload: str):
+        """전사/제어 이벤트 JSON 텍스트를 큐에 추가"""
+        self._enqueue(self.TEXT, payload)
+
+    def send_audio(self, pcm: bytes):
+        """모델 오디오 PCM을 큐에 추가"""
+        self.audio_parts_in += 1
+        self._enqueue(self.AUDIO, pcm)
+
+    def _enqueue(self, kind: str, data: Any):
+        if self._closed:
+            return
+        if len(self._items) >= self.max_queue_size and not self._drop_oldest_audio() and kind == self.AUDIO:
+            # 큐가 텍스트로만 가득 찬 경우 새 오디오를 버림
+            self.dropped_audio += 1
+            AUDIO_DROPPED.labels("outbound").inc()
+            return
+        self._items.append((kind, data, time.monotonic()))
+        self.max_queue_depth = max(self.max_queue_depth, len(self._items))
+        self._wakeup.set()
+
+    def _drop_oldest_audio(self) -> bool:
+        for index, (kind, _, _) in enumerate(self._items):
+            if kind == self.AUDIO:
+                del self._items[index]
+                self.dropped_audio += 1
+                AUDIO_DROPPED.labels("outbound").inc()
+                return True
+        return False
+
+    def purge_audio(self) -> int:
+        """아직 전송하지 않은 오디오를 모두 제거 (전사/제어 이벤트는 유지)"""
+        kept = deque(item for item in self._items if item[0] != self.AUDIO)
+        purged = len(self._items) - len(kept)
+        self._items = kept
+        self.purged_audio += purged
+        return purged
+
+    async def run(self):
+        """큐를 비우며 클라이언트로 전송 (전송 실패 시 종료)"""
+        try:
+            while True:
+                if not self._items:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                kind, data, enqueued_at = self._items[0]
+                if kind == self.AUDIO and self.coalesce_window > 0:
+                    # 첫 오디오가 들어온 뒤 창 시간만큼 기다려 뒤따르는 파트와 합침
+                    remaining = enqueued_at + self.coalesce_window - time.monotonic()
+                    if remaining > 0:
+                        await asyncio.sleep(remaining)
+                        continue
+
+                self._check_slow_consumer(time.monotonic() - enqueued_at)
+                self._items.popleft()
+                started_at = time.perf_counter()
+                if kind == self.TEXT:
+                    await self.websocket.send_text(data)
+                    self.text_messages_out += 1
+                    self.bytes_out += len(data)
+                else:
+                    audio = self._coalesce_audio(data)
+                    await self._send_audio(audio)
+                    count_audio("to_client", audio)
+                elapsed = time.perf_counter() - started_at
+                WS_SEND_SECONDS.labels(kind).observe(elapsed)
+                self.max_send_ms = max(self.max_send_ms, elapsed * 1000)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"클라이언트 송신 중단: {e}")
+        finally:
+            self.close()
+
+    def _coalesce_audio(self, first: bytes) -> bytes:
+        """큐 앞쪽에 연속으로 쌓인 오디오를 최대 coalesce_max_bytes까지 합침"""
+        if not self._items or self._items[0][0] != self.AUDIO:
+            return first
+        merged = bytearray(first)
+        while self._items and self._items[0][0] == self.AUDIO:
+            next_data = self._items[0][1]
+            if len(merged) + len(next_data) > self.coalesce_max_bytes:
+                break
+            merged.extend(next_data)
+            self._items.popleft()
+        return bytes(merged)
+
+    async def _send_audio(self, pcm: bytes):
+        if self.protocol == WireProtocol.BINARY:
+            frame = PayloadManager.to_binary_frame(BinaryFrameType.AUDIO_PCM16, self._sequence, self.sample_rate, pcm)
+            self._sequence = (self._sequence + 1) & 0xFFFF
+            await self.websocket.send_bytes(frame)
+        else:
+            frame = PayloadManager.to_payload(ResponseType.AUDIO, base64.b64encode(pcm).decode("utf-8"))
+            await self.websocket.send_text(frame)
+        self.audio_messages_out += 1
+        self.bytes_out += len(frame)
+
+    def _check_slow_consumer(self, lag: float):
+        self.max_lag = max(self.max_lag, lag)
+        if not self.slow_consumer and lag > self.slow_consumer_seconds:
+            self.slow_consumer = True
+            self.slow_consumer_events += 1
+            logger.warning(f"느린 클라이언트 감지: 송신 지연 {lag:.2f}초, 대기 {len(self._items)}개")
+        elif self.slow_consumer and lag < self.slow_consumer_seconds / 2:
+            self.slow_consumer = False
+            logger.info(f"클라이언트 송신 지연 회복: {lag:.2f}초")
+
+    def close(self):
+        """더 이상 전송하지 않음 (남은 항목 버림)"""
+        self._closed = True
+        self._items.clear()
+
+    def stats(self) -> dict:
+        return {
+            "audio_parts_in": self.audio_parts_in,
+            "audio_messages_out": self.audio_messages_out,
+            "text_messages_out": self.text_messages_out,
+            "bytes_out": self.bytes_out,
+            "dropped_audio": self.dropped_audio,
+            "purged_audio": self.purged_audio,
+            "slow_consumer_events": self.slow_consumer_events,
+            "max_queue_depth": self.max_queue_depth,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "max_send_ms": round(self.max_send_ms, 1),
+        }
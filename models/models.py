@@ -17,6 +17,18 @@ class ConversationTurn(BaseModel):
     speaker: SpeakerEnum = Field(..., description="화자 (patient 또는 ai)")
     content: str = Field(..., description="대화 내용")
 
+# 턴별 응답 지연 요약 (시간은 모두 밀리초)
+class TurnLatency(BaseModel):
+    """하나의 대화 턴의 지연 요약"""
+    turn_index: int = Field(..., description="세션 내 턴 순번 (0부터)")
+    started_at: datetime = Field(..., description="턴 시작 시각 (첫 이벤트 기준)")
+    ttfa_ms: Optional[int] = Field(None, description="사용자 발화 끝(마지막 입력 전사)부터 첫 AI 오디오까지")
+    first_audio_ms: Optional[int] = Field(None, description="턴 시작부터 첫 AI 오디오까지")
+    tool_calls: int = Field(0, description="턴 안에서 처리한 함수 호출 수")
+    tool_ms: int = Field(0, description="도구 호출 처리에 걸린 시간 합계")
+    duration_ms: Optional[int] = Field(None, description="턴 시작부터 턴 완료(또는 중단)까지")
+    interrupted: bool = Field(False, description="사용자가 끼어들어 응답이 중단되었는지 여부")
+
 # 전체 대화 기록을 나타내는 메인 모델
 class ConversationLog(BaseModel):
     """
@@ -25,6 +37,8 @@ class ConversationLog(BaseModel):
     session_id: uuid.UUID = Field(default_factory=uuid.uuid4, description="세션의 고유 식별자 (UUID)")
     user_id: str = Field(..., description="사용자의 고유 식별자 (UUID)")
     start_time: datetime = Field(..., description="대화 시작 시간 (ISO 8601 형식)")
-    end_time: datetime = Field(..., description="대화 종료 시간 (ISO 8601 형식)")
+    end_time: Optional[datetime] = Field(None, description="대화 종료 시간 (ISO 8601 형식, 통화 중에는 없음)")
     conversation: List[ConversationTurn] = Field(..., description="전체 대화 내용 리스트")
-    audio_recording_url: Optional[str] = Field(None, description="음성 녹음 파일 URL (GCS)")
\ No newline at end of file
+    audio_recording_url: Optional[str] = Field(None, description="음성 녹음 파일 URL (GCS)")
+    audio_codec: Optional[str] = Field(None, description="음성 녹음 코덱 (pcm_s16le 또는 flac)")
+    turn_latencies: List[TurnLatency] = Field(default_factory=list, description="턴별 응답 지연 요약")
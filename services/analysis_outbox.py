@@ -0,0 +1,281 @@
+import uuid
+import random
+import asyncio
+import datetime
+import logging
+from typing import Optional, Dict, Any, List
+
+import httpx
+from pymongo import ReturnDocument
+
+from services.metrics import track_latency, ANALYSIS_OUTBOX_JOBS, ANALYSIS_OUTBOX_RESULTS, ANALYSIS_DELIVERY_SECONDS
+from settings import (
+    INSTANCE_ID, ANALYZE_SERVER, ANALYZE_BATCH_SERVER,
+    ANALYSIS_OUTBOX_BATCH_SIZE, ANALYSIS_OUTBOX_MAX_ATTEMPTS,
+    ANALYSIS_OUTBOX_RETRY_BASE_DELAY, ANALYSIS_OUTBOX_RETRY_MAX_DELAY, ANALYSIS_OUTBOX_POLL_INTERVAL,
+    ANALYSIS_OUTBOX_LEASE_SECONDS,
+    ANALYSIS_HTTP_TIMEOUT, ANALYSIS_HTTP_MAX_CONNECTIONS,
+)
+
+logger = logging.getLogger(__name__)
+
+# 다시 보내도 결과가 같을 4xx는 재시도하지 않음 (요청 시간 초과와 과부하는 재시도)
+RETRYABLE_CLIENT_ERRORS = (408, 425, 429)
+
+def _isoformat(value: Any) -> Any:
+    return value.isoformat() if isinstance(value, datetime.datetime) else value
+
+def analysis_payload(document: Dict[str, Any]) -> Dict[str, Any]:
+    """대화 기록 문서를 분석 서버 요청 본문으로 변환 (ObjectId와 datetime을 문자열로)"""
+    payload = document.copy()
+    payload['_id'] = str(document['_id'])
+    for key in ('start_time', 'end_time'):
+        if key in payload:
+            payload[key] = _isoformat(payload[key])
+    # 턴 기록의 started_at은 없거나 None일 수 있음 (세션 종료 시 진행 중이던 턴 등)
+    payload['turn_latencies'] = [
+        {**turn, 'started_at': _isoformat(turn.get('started_at'))} for turn in document.get('turn_latencies', [])
+    ]
+    return payload
+
+class OutboxStatus:
+    PENDING = "pending"
+    SENDING = "sending"
+    DELIVERED = "delivered"
+    DEAD = "dead"
+
+class DeliveryError(Exception):
+    def __init__(self, message: str, retryable: bool = True):
+        super().__init__(message)
+        self.retryable = retryable
+
+class AnalysisOutbox:
+    """분석 서버로 보낼 대화 기록을 MongoDB에 저장해 두고 백그라운드에서 전송하는 아웃박스
+
+    세션 종료 시에는 저장만 하고 바로 반환하므로 분석 서버 응답이 이벤트 루프를 막지 않습니다.
+    워커는 공유 비동기 HTTP 클라이언트(연결 풀, 타임아웃)로 전송하며, batch_url이 있으면 여러 세션을
+    한 요청으로 묶어 보냅니다. 실패하면 지수 백오프로 재시도하고, max_attempts를 넘거나 재시도해도
+    소용없는 응답(4xx)을 받으면 dead 상태로 남겨 수동으로 확인할 수 있게 합니다.
+
+    작업을 꺼낸 프로세스는 owner와 claimed_at을 기록하며, lease_seconds가 지나도록 끝나지 않은 작업만
+    다시 대기열로 돌아갑니다. 그래도 같은 세션이 두 번 전송될 수 있으므로 요청마다 아웃박스 _id를
+    멱등 키(Idempotency-Key 헤더, 배치는 idempotency_keys)로 보내 분석 서버가 중복을 거를 수 있게 합니다.
+    """
+
+    def __init__(self, url: str, owner: str, batch_url: str = "", batch_size: int = 20,
+                 max_attempts: int = 8, retry_base_delay: float = 5.0, retry_max_delay: float = 600.0,
+                 poll_interval: float = 10.0, lease_seconds: float = 120.0, timeout: float = 10.0,
+                 max_connections: int = 10):
+        self.collection = None  # start()에서 받음
+        self.owner = owner
+        self.url = url
+        self.batch_url = batch_url
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.timeout = timeout
+        self.max_connections = max_connections
+
+        self.client: Optional[httpx.AsyncClient] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    async def start(self, collection):
+        """아웃박스 컬렉션을 받아 HTTP 클라이언트와 워커 시작 (점유가 만료된 sending 작업은 다시 대기 상태로)"""
+        if self._worker is not None:
+            return
+        self.collection = collection
+        if self.client is None:
+            self.client = httpx.AsyncClient(
+                timeout=httpx.Timeout(self.timeout),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections)
+            )
+        await self._requeue_expired()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """워커 중단과 HTTP 클라이언트 정리 (남은 작업은 다음 시작 시 전송)"""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self.client:
+            await self.client.aclose()
+            self.client = None
+
+    async def enqueue(self, session_id: str, payload: Dict[str, Any]):
+        """전송할 대화 기록을 저장하고 워커를 깨움"""
+        now = datetime.datetime.now()
+        await self.collection.insert_one({
+            "_id": str(uuid.uuid4()),
+            "session_id": session_id,
+            "payload": payload,
+            "status": OutboxStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+            "last_error": None,
+        })
+        self._wakeup.set()
+
+    async def enqueue_transcript(self, transcripts, session_id: str) -> bool:
+        """저장된 대화 기록 문서를 읽어 전송 대기열에 추가 (녹음 결과가 문서에 반영된 뒤 호출)"""
+        with track_latency("mongo", "find"):
+            document = await transcripts.find_one({"session_id": session_id})
+        if document is None:
+            logger.error(f"저장된 대화 기록을 찾을 수 없어 분석 서버로 보내지 않습니다: {session_id}")
+            return False
+        await self.enqueue(session_id, analysis_payload(document))
+        logger.info(f"분석 서버 전송 대기열에 추가: {session_id}")
+        return True
+
+    async def _requeue_expired(self):
+        """점유가 만료된 전송(점유한 프로세스가 죽은 작업)을 다시 대기 상태로"""
+        expired_before = datetime.datetime.now() - datetime.timedelta(seconds=self.lease_seconds)
+        result = await self.collection.update_many(
+            {"status": OutboxStatus.SENDING,
+             "$or": [{"claimed_at": {"$lte": expired_before}}, {"claimed_at": None}]},
+            {"$set": {"status": OutboxStatus.PENDING}, "$unset": {"owner": "", "claimed_at": ""}}
+        )
+        if result.modified_count:
+            logger.info(f"점유가 만료된 분석 서버 전송 {result.modified_count}개를 다시 대기열에 추가")
+
+    async def _run(self):
+        while True:
+            try:
+                await self._requeue_expired()
+                while await self._run_next():
+                    pass
+                await self._refresh_depth()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"분석 서버 아웃박스 오류: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _claim(self) -> Optional[Dict[str, Any]]:
+        now = datetime.datetime.now()
+        return await self.collection.find_one_and_update(
+            {"status": OutboxStatus.PENDING, "next_attempt_at": {"$lte": now}},
+            {"$set": {"status": OutboxStatus.SENDING, "owner": self.owner, "claimed_at": now}, "$inc": {"attempts": 1}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _run_next(self) -> bool:
+        """전송 시각이 된 작업을 최대 batch_size개 가져와 전송. 처리한 작업이 있으면 True."""
+        limit = self.batch_size if self.batch_url else self.max_connections
+        jobs: List[Dict[str, Any]] = []
+        while len(jobs) < limit:
+            job = await self._claim()
+            if job is None:
+                break
+            jobs.append(job)
+        if not jobs:
+            return False
+
+        if self.batch_url and len(jobs) > 1:
+            try:
+                await self._post_batch(jobs)
+                errors = [None] * len(jobs)
+            except Exception as e:
+                errors = [e] * len(jobs)
+        else:
+            errors = await asyncio.gather(*(self._post_one(job) for job in jobs), return_exceptions=True)
+
+        for job, error in zip(jobs, errors):
+            if error is None:
+                await self._mark_delivered(job)
+            else:
+                await self._mark_failed(job, error)
+        return True
+
+    async def _post_one(self, job: Dict[str, Any]):
+        with track_latency("analysis", "post"):
+            response = await self.client.post(self.url, json=job["payload"], headers={"Idempotency-Key": job["_id"]})
+        self._check_response(response)
+        logger.info(f"분석 서버 전송 완료: {job['session_id']} (HTTP {response.status_code})")
+
+    async def _post_batch(self, jobs: List[Dict[str, Any]]):
+        # 배치 엔드포인트는 2xx 응답이면 전체를 받은 것으로 봄
+        with track_latency("analysis", "post_batch"):
+            response = await self.client.post(self.batch_url, json={
+                "sessions": [job["payload"] for job in jobs],
+                "idempotency_keys": [job["_id"] for job in jobs],
+            })
+        self._check_response(response)
+        logger.info(f"분석 서버 배치 전송 완료: {len(jobs)}개 세션 (HTTP {response.status_code})")
+
+    def _check_response(self, response: httpx.Response):
+        if response.is_success:
+            return
+        retryable = response.status_code >= 500 or response.status_code in RETRYABLE_CLIENT_ERRORS
+        raise DeliveryError(f"HTTP {response.status_code}: {response.text[:200]}", retryable=retryable)
+
+    async def _mark_delivered(self, job: Dict[str, Any]):
+        now = datetime.datetime.now()
+        # 전송한 본문은 더 필요 없으므로 지워 컬렉션이 커지지 않게 함
+        await self._release(job, {"status": OutboxStatus.DELIVERED, "delivered_at": now, "last_error": None},
+                            unset=("payload",))
+        ANALYSIS_OUTBOX_RESULTS.labels("delivered").inc()
+        ANALYSIS_DELIVERY_SECONDS.observe((now - job["created_at"]).total_seconds())
+
+    async def _mark_failed(self, job: Dict[str, Any], error: BaseException):
+        attempts = job["attempts"]
+        retryable = getattr(error, "retryable", True)
+        if not retryable or attempts >= self.max_attempts:
+            logger.error(f"분석 서버 전송 실패, 재시도 중단 ({attempts}회): {job['session_id']} - {error}")
+            update = {"status": OutboxStatus.DEAD, "last_error": str(error)}
+            ANALYSIS_OUTBOX_RESULTS.labels("dead").inc()
+        else:
+            # 분석 서버 복구 시 한꺼번에 몰리지 않도록 지연에 약간의 무작위 값을 더함
+            delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** (attempts - 1)))
+            delay *= random.uniform(1.0, 1.2)
+            logger.warning(f"분석 서버 전송 실패 ({attempts}/{self.max_attempts}), {delay:.0f}초 후 재시도: {error}")
+            update = {
+                "status": OutboxStatus.PENDING,
+                "last_error": str(error),
+                "next_attempt_at": datetime.datetime.now() + datetime.timedelta(seconds=delay),
+            }
+            ANALYSIS_OUTBOX_RESULTS.labels("retry").inc()
+        await self._release(job, update)
+
+    async def _release(self, job: Dict[str, Any], fields: Dict[str, Any], unset=()):
+        """점유를 풀고 결과 상태 기록 (점유가 만료돼 다른 프로세스가 가져갔으면 건드리지 않음)"""
+        result = await self.collection.update_one(
+            {"_id": job["_id"], "owner": self.owner, "claimed_at": job["claimed_at"]},
+            {"$set": fields, "$unset": {key: "" for key in ("owner", "claimed_at", *unset)}}
+        )
+        if not result.matched_count:
+            logger.warning(f"점유가 만료된 뒤 끝난 분석 서버 전송: {job['_id']} (다른 인스턴스가 다시 보낼 수 있음)")
+
+    async def _refresh_depth(self):
+        """대기/실패 작업 수 지표 갱신"""
+        for status in (OutboxStatus.PENDING, OutboxStatus.DEAD):
+            ANALYSIS_OUTBOX_JOBS.labels(status).set(await self.collection.count_documents({"status": status}))
+
+# 전역 분석 서버 아웃박스
+analysis_outbox = AnalysisOutbox(
+    ANALYZE_SERVER,
+    owner=INSTANCE_ID,
+    batch_url=ANALYZE_BATCH_SERVER,
+    batch_size=ANALYSIS_OUTBOX_BATCH_SIZE,
+    max_attempts=ANALYSIS_OUTBOX_MAX_ATTEMPTS,
+    retry_base_delay=ANALYSIS_OUTBOX_RETRY_BASE_DELAY,
+    retry_max_delay=ANALYSIS_OUTBOX_RETRY_MAX_DELAY,
+    poll_interval=ANALYSIS_OUTBOX_POLL_INTERVAL,
+    lease_seconds=ANALYSIS_OUTBOX_LEASE_SECONDS,
+    timeout=ANALYSIS_HTTP_TIMEOUT,
+    max_connections=ANALYSIS_HTTP_MAX_CONNECTIONS
+)
@@ -0,0 +1,285 @@
+import time
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass
+from typing import List, Optional, Deque, Tuple
+from urllib.parse import parse_qs
+
+import numpy as np
+
+from services.metrics import AUDIO_DROPPED
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_FORMATS = ("s16le", "f32le")
+MIN_SAMPLE_RATE = 8000
+MAX_SAMPLE_RATE = 96000
+
+@dataclass
+class InputAudioFormat:
+    """클라이언트가 선언한 마이크 오디오 형식"""
+    sample_rate: int = 16000
+    sample_format: str = "s16le"   # s16le: 16비트 정수 | f32le: 32비트 실수 (-1.0 ~ 1.0)
+    channels: int = 1              # 2채널이면 인터리브된 스테레오를 모노로 섞음
+
+    @classmethod
+    def from_query(cls, query: str, default_sample_rate: int = 16000) -> "InputAudioFormat":
+        """쿼리 파라미터(?sample_rate=48000&format=f32le&channels=1)에서 형식을 읽음 (잘못된 값은 기본값)"""
+        params = parse_qs(query)
+        audio_format = cls(sample_rate=default_sample_rate)
+        try:
+            sample_rate = int(params.get("sample_rate", [default_sample_rate])[0])
+            if MIN_SAMPLE_RATE <= sample_rate <= MAX_SAMPLE_RATE:
+                audio_format.sample_rate = sample_rate
+            else:
+                logger.warning(f"지원하지 않는 입력 샘플레이트 {sample_rate}, {default_sample_rate} 사용")
+        except ValueError:
+            logger.warning(f"잘못된 입력 샘플레이트 {params.get('sample_rate')}, {default_sample_rate} 사용")
+
+        sample_format = params.get("format", ["s16le"])[0]
+        if sample_format in SUPPORTED_FORMATS:
+            audio_format.sample_format = sample_format
+        else:
+            logger.warning(f"지원하지 않는 입력 형식 {sample_format}, s16le 사용")
+
+        channels = params.get("channels", ["1"])[0]
+        audio_format.channels = 2 if channels == "2" else 1
+        return audio_format
+
+    @property
+    def bytes_per_frame(self) -> int:
+        return (2 if self.sample_format == "s16le" else 4) * self.channels
+
+class StreamingResampler:
+    """청크 경계를 넘어 상태를 유지하는 벡터화 리샘플러
+
+    다운샘플링이면 먼저 Hann 창 windowed-sinc FIR로 출력 나이퀴스트 위를 걸러 에일리어싱을 막고,
+    분수 위치에서 선형 보간합니다. 모든 연산은 청크 단위 NumPy 배열 연산입니다.
+    """
+
+    def __init__(self, input_rate: int, output_rate: int, taps_per_ratio: int = 16):
+        self.input_rate = input_rate
+        self.output_rate = output_rate
+        self.step = input_rate / output_rate
+
+        self._filter = None
+        self._filter_state = None
+        if input_rate > output_rate:
+            ratio = int(np.ceil(self.step))
+            num_taps = taps_per_ratio * ratio + 1
+            cutoff = 0.5 / self.step    # 입력 샘플레이트 기준 정규화 차단 주파수
+            n = np.arange(num_taps) - (num_taps - 1) / 2
+            h = 2 * cutoff * np.sinc(2 * cutoff * n) * np.hanning(num_taps)
+            self._filter = (h / h.sum()).astype(np.float64)
+            self._filter_state = np.zeros(num_taps - 1)
+
+        self._carry = np.zeros(0)   # 다음 보간에 필요한 남은 입력 샘플
+        self._position = 0.0        # _carry 시작 기준 다음 출력 샘플의 입력 위치
+
+    def process(self, samples: np.ndarray) -> np.ndarray:
+        if self.input_rate == self.output_rate or samples.size == 0:
+            return samples
+
+        if self._filter is not None:
+            padded = np.concatenate([self._filter_state, samples])
+            self._filter_state = padded[-(len(self._filter) - 1):]
+            samples = np.convolve(padded, self._filter, mode="valid")
+
+        x = np.concatenate([self._carry, samples])
+        available = len(x) - 1 - self._position
+        if available <= 0:
+            self._carry = x
+            return np.zeros(0)
+
+        count = int(np.ceil(available / self.step))
+        positions = self._position + self.step * np.arange(count)
+        index = positions.astype(np.int64)
+        fraction = positions - index
+        output = x[index] * (1 - fraction) + x[index + 1] * fraction
+
+        # 다음 출력 위치가 이번 입력 끝을 넘을 수 있으므로 넘친 만큼은 다음 청크 기준 위치로 남김
+        next_position = self._position + self.step * count
+        consumed = min(int(next_position), len(x))
+        self._carry = x[consumed:]
+        self._position = next_position - consumed
+        return output
+
+class AudioIngest:
+    """클라이언트 마이크 오디오 입력 단계
+
+    선언된 형식을 디코딩(스테레오는 모노로)하고, 필요하면 목표 샘플레이트로 리샘플링한 뒤
+    frame_ms 길이의 16비트 PCM 프레임으로 다시 잘라 반환합니다. 입력이 이미 목표 형식이면 자르기만 합니다.
+    """
+
+    def __init__(self, input_format: InputAudioFormat, target_rate: int = 16000, frame_ms: int = 40):
+        self.input_format = input_format
+        self.target_rate = target_rate
+        self.frame_bytes = max(2, target_rate * frame_ms // 1000 * 2)
+        self.passthrough = (
+            input_format.sample_rate == target_rate
+            and input_format.sample_format == "s16le"
+            and input_format.channels == 1
+        )
+        self.resampler = StreamingResampler(input_format.sample_rate, target_rate)
+
+        self._partial_input = b""     # 샘플 경계에 맞지 않게 잘려 온 입력 바이트
+        self._buffer = bytearray()    # 아직 프레임을 채우지 못한 출력 PCM
+
+        # 지표
+        self.bytes_in = 0
+        self.frames_out = 0
+
+    def process(self, data: bytes) -> List[bytes]:
+        """입력 메시지를 받아 완성된 프레임 목록을 반환"""
+        self.bytes_in += len(data)
+        if self.passthrough:
+            self._buffer.extend(data)
+        else:
+            self._buffer.extend(self._convert(data))
+
+        usable = len(self._buffer) - len(self._buffer) % self.frame_bytes
+        frames = [bytes(self._buffer[offset:offset + self.frame_bytes]) for offset in range(0, usable, self.frame_bytes)]
+        del self._buffer[:usable]
+        self.frames_out += len(frames)
+        return frames
+
+    def flush(self) -> List[bytes]:
+        """남은 짧은 프레임 반환 (스트림 종료 시)"""
+        remainder = bytes(self._buffer[:len(self._buffer) - len(self._buffer) % 2])
+        self._buffer.clear()
+        if remainder:
+            self.frames_out += 1
+            return [remainder]
+        return []
+
+    def _convert(self, data: bytes) -> bytes:
+        data = self._partial_input + data
+        frame_size = self.input_format.bytes_per_frame
+        usable = len(data) - len(data) % frame_size
+        self._partial_input = data[usable:]
+
+        if self.input_format.sample_format == "s16le":
+            samples = np.frombuffer(data[:usable], dtype="<i2").astype(np.float64)
+        else:
+            samples = np.frombuffer(data[:usable], dtype="<f4").astype(np.float64) * 32768.0
+        if self.input_format.channels == 2:
+            samples = samples.reshape(-1, 2).mean(axis=1)
+
+        samples = self.resampler.process(samples)
+        return np.clip(np.round(samples), -32768, 32767).astype("<i2").tobytes()
+
+    def stats(self) -> dict:
+        return {
+            "input_sample_rate": self.input_format.sample_rate,
+            "input_format": self.input_format.sample_format,
+            "input_channels": self.input_format.channels,
+            "bytes_in": self.bytes_in,
+            "frames_out": self.frames_out,
+            "frame_bytes": self.frame_bytes,
+        }
+
+class AudioInputQueue:
+    """Gemini로 보낼 마이크 오디오의 bounded 큐 (실시간성 유지용)
+
+    가득 찼을 때의 정책:
+    - block: 자리가 날 때까지 수신 루프를 멈춤 (클라이언트 쪽으로 배압 전달)
+    - drop_oldest: 가장 오래된 청크 하나를 버림
+    - skip_to_live: 최신 live_chunks개만 남기고 모두 버려 바로 실시간으로 따라잡음 (기본값)
+    스트림 종료 신호(None)는 버리지 않습니다. 꺼낼 때마다 해당 청크가 큐에서 기다린 시간(지연)을 기록합니다.
+    """
+
+    POLICIES = ("block", "drop_oldest", "skip_to_live")
+
+    def __init__(self, max_chunks: int = 25, policy: str = "skip_to_live", live_chunks: int = 5):
+        if policy not in self.POLICIES:
+            logger.warning(f"알 수 없는 오디오 큐 정책 '{policy}', skip_to_live 사용")
+            policy = "skip_to_live"
+        self.max_chunks = max(1, max_chunks)
+        self.policy = policy
+        self.live_chunks = max(1, min(live_chunks, self.max_chunks))
+
+        self._items: Deque[Tuple[float, Optional[bytes]]] = deque()
+        self._audio_count = 0
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+
+        # 지표
+        self.enqueued_chunks = 0
+        self.dropped_chunks = 0
+        self.skips = 0
+        self.max_depth = 0
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._lag_total = 0.0
+        self._dequeued = 0
+
+    def qsize(self) -> int:
+        return len(self._items)
+
+    @property
+    def lag(self) -> float:
+        """가장 오래된 대기 청크가 기다린 시간(초)"""
+        return time.monotonic() - self._items[0][0] if self._items else 0.0
+
+    async def put(self, data: Optional[bytes]):
+        """청크 추가 (None은 스트림 종료 신호)"""
+        if data is not None:
+            while self._audio_count >= self.max_chunks:
+                if self.policy == "block":
+                    self._not_full.clear()
+                    await self._not_full.wait()
+                elif self.policy == "drop_oldest":
+                    self._drop(1)
+                else:
+                    lag = self.lag
+                    self._drop(self._audio_count - (self.live_chunks - 1))
+                    self.skips += 1
+                    logger.warning(f"오디오 큐가 {self.max_chunks}개를 넘어 실시간으로 건너뜀 (지연 {lag:.2f}초)")
+            self._audio_count += 1
+            self.enqueued_chunks += 1
+        self._items.append((time.monotonic(), data))
+        self.max_depth = max(self.max_depth, len(self._items))
+        self._not_empty.set()
+
+    def _drop(self, count: int):
+        """가장 오래된 오디오 청크를 count개 버림 (종료 신호는 유지)"""
+        kept = deque()
+        while self._items and count > 0:
+            item = self._items.popleft()
+            if item[1] is None:
+                kept.append(item)
+            else:
+                count -= 1
+                self._audio_count -= 1
+                self.dropped_chunks += 1
+                AUDIO_DROPPED.labels("audio_in").inc()
+        kept.extend(self._items)
+        self._items = kept
+
+    async def get(self) -> Optional[bytes]:
+        """가장 오래된 청크를 꺼냄 (비어 있으면 대기)"""
+        while not self._items:
+            self._not_empty.clear()
+            await self._not_empty.wait()
+        enqueued_at, data = self._items.popleft()
+        if data is not None:
+            self._audio_count -= 1
+            self._not_full.set()
+            self.last_lag = time.monotonic() - enqueued_at
+            self.max_lag = max(self.max_lag, self.last_lag)
+            self._lag_total += self.last_lag
+            self._dequeued += 1
+        return data
+
+    def stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "enqueued_chunks": self.enqueued_chunks,
+            "dropped_chunks": self.dropped_chunks,
+            "skips": self.skips,
+            "max_depth": self.max_depth,
+            "avg_lag_ms": round(self._lag_total / self._dequeued * 1000, 1) if self._dequeued else 0.0,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+        }
@@ -1,149 +1,736 @@
 import wave
 import io
 import os
+import time
+import asyncio
 import datetime
+import mmap
 import struct
 import logging
-from typing import List, Optional
+from typing import List, Optional, Callable, Dict, Any, Tuple
 from google.cloud import storage
-from settings import SEND_SAMPLE_RATE
+from settings import (
+    SEND_SAMPLE_RATE, RECORDING_QUEUE_MAX_CHUNKS, RECORDING_OVERFLOW_POLICY,
+    RECORDING_MODE, RECORDING_SPOOL_DIR, RECORDING_SPOOL_MMAP,
+    RECORDING_FORMAT, RECORDING_FLAC_BLOCK_SIZE,
+)
+from services.flac_encoder import StreamingFlacEncoder
+from services.metrics import track_latency, AUDIO_DROPPED
 
 logger = logging.getLogger(__name__)
 
+WAV_HEADER_SIZE = 44
+
+# 녹음 형식별 (파일 확장자, Content-Type, 대화 기록에 남길 코덱 이름)
+RECORDING_FORMATS = {
+    "wav": (".wav", "audio/wav", "pcm_s16le"),
+    "flac": (".flac", "audio/flac", "flac"),
+}
+
+def _resolve_format(recording_format: str) -> str:
+    if recording_format not in RECORDING_FORMATS:
+        logger.warning(f"알 수 없는 녹음 형식 '{recording_format}', wav 사용")
+        return "wav"
+    return recording_format
+
+def create_wav_header(sample_rate: int, num_channels: int, bits_per_sample: int, data_size: int) -> bytes:
+    """WAV 파일 헤더 생성"""
+    byte_rate = sample_rate * num_channels * bits_per_sample // 8
+    block_align = num_channels * bits_per_sample // 8
+    
+    header = struct.pack('<4sL4s4sLHHLLHH4sL',
+        b'RIFF',
+        36 + data_size,  # 파일 크기 - 8
+        b'WAVE',
+        b'fmt ',
+        16,  # fmt chunk size
+        1,   # PCM format
+        num_channels,
+        sample_rate,
+        byte_rate,
+        block_align,
+        bits_per_sample,
+        b'data',
+        data_size
+    )
+    return header
+
+def patch_wav_sizes(target, data_size: int):
+    """파일(또는 mmap)에 이미 기록된 WAV 헤더의 크기 필드를 제자리에서 수정"""
+    target.seek(4)
+    target.write(struct.pack('<L', 36 + data_size))
+    target.seek(40)
+    target.write(struct.pack('<L', data_size))
+
+def compose_with_header(bucket: storage.Bucket, data_blob_name: str, target_blob_name: str,
+                        make_header: Callable[[int], bytes], content_type: str) -> Optional[str]:
+    """GCS의 데이터 블롭 앞에 헤더를 붙여 최종 블롭을 만들고 임시 블롭을 삭제합니다.
+
+    make_header는 데이터 크기(bytes)를 받아 헤더를 만듭니다. GCS 오류는 그대로 발생시킵니다
+    (재시도는 호출자가 결정). 재시도해도 안전하도록 이미 최종 블롭이 만들어졌고 데이터 블롭이
+    지워졌으면 URL을 그대로 반환합니다.
+    """
+    target_url = f"gs://{bucket.name}/{target_blob_name}"
+    data_blob = bucket.blob(data_blob_name)
+    target_blob = bucket.blob(target_blob_name)
+    
+    # 데이터 파일 크기 확인
+    if not data_blob.exists():
+        if target_blob.exists():
+            logger.info(f"녹음 파일이 이미 생성되어 있습니다: {target_url}")
+            return target_url
+        logger.warning(f"녹음 데이터 파일이 없습니다: {data_blob_name}")
+        return None
+    
+    data_blob.reload()
+    data_size = data_blob.size if data_blob.size else 0
+    logger.info(f"녹음 데이터 파일 크기: {data_size} bytes")
+    
+    if data_size == 0:
+        logger.warning("녹음 데이터 파일이 비어있습니다.")
+        return None
+    
+    header_blob = bucket.blob(f"{data_blob_name}.header")
+    target_blob.content_type = content_type
+    with track_latency("gcs", "compose"):
+        # 헤더 생성 및 별도 블롭에 업로드
+        header_blob.upload_from_string(make_header(data_size))
+        
+        # GCS Compose를 사용하여 헤더 + 데이터 결합
+        target_blob.compose([header_blob, data_blob])
+    
+    # 임시 파일들 삭제
+    header_blob.delete()
+    data_blob.delete()
+    
+    logger.info(f"녹음 파일 생성 완료: {target_url}")
+    return target_url
+
+def compose_wav_from_pcm(bucket: storage.Bucket, pcm_blob_name: str, wav_blob_name: str) -> Optional[str]:
+    """GCS의 PCM 블롭 앞에 WAV 헤더를 붙여 WAV 블롭을 만듭니다."""
+    return compose_with_header(
+        bucket, pcm_blob_name, wav_blob_name,
+        lambda data_size: create_wav_header(SEND_SAMPLE_RATE, 1, 16, data_size),
+        "audio/wav"
+    )
+
+def compose_flac_from_frames(bucket: storage.Bucket, frames_blob_name: str, flac_blob_name: str,
+                             header: bytes) -> Optional[str]:
+    """GCS의 FLAC 프레임 블롭 앞에 최종 STREAMINFO 헤더를 붙여 FLAC 블롭을 만듭니다."""
+    return compose_with_header(bucket, frames_blob_name, flac_blob_name, lambda _: header, "audio/flac")
+
+class RecordingWriter:
+    """녹음 청크를 백그라운드 태스크에서 순서대로 기록하는 writer
+
+    청크는 bounded queue에 쌓이고, 전용 태스크가 모아서 스레드에서 블로킹 write를 수행합니다.
+    큐가 가득 찼을 때의 정책:
+    - drop_oldest: 가장 오래된 청크를 버리고 새 청크를 넣음 (기본값)
+    - drop_newest: 새 청크를 버림
+    - block: 자리가 날 때까지 기다림 (수신 루프가 지연될 수 있음)
+    """
+
+    OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+    def __init__(self, write: Callable[[bytes], None], max_queue_size: int = 256,
+                 overflow_policy: str = "drop_oldest", max_coalesce: int = 32):
+        if overflow_policy not in self.OVERFLOW_POLICIES:
+            logger.warning(f"알 수 없는 녹음 큐 정책 '{overflow_policy}', drop_oldest 사용")
+            overflow_policy = "drop_oldest"
+        self._write = write
+        self.overflow_policy = overflow_policy
+        self.max_coalesce = max_coalesce
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+        
+        # 지표
+        self.enqueued_chunks = 0
+        self.written_chunks = 0
+        self.written_bytes = 0
+        self.dropped_chunks = 0
+        self.failed_writes = 0
+        self.max_queue_depth = 0
+        self.last_upload_lag = 0.0
+        self.max_upload_lag = 0.0
+
+    def _ensure_started(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, chunk: bytes) -> bool:
+        """청크를 큐에 넣습니다. block 정책이 아니면 기다리지 않습니다."""
+        if self._closed:
+            return False
+        self._ensure_started()
+        item = (time.monotonic(), chunk)
+        
+        if self.overflow_policy == "block":
+            await self._queue.put(item)
+        else:
+            try:
+                self._queue.put_nowait(item)
+            except asyncio.QueueFull:
+                self.dropped_chunks += 1
+                AUDIO_DROPPED.labels("recording").inc()
+                if self.overflow_policy == "drop_newest":
+                    return False
+                self._queue.get_nowait()
+                self._queue.task_done()
+                self._queue.put_nowait(item)
+        
+        self.enqueued_chunks += 1
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return True
+
+    async def _run(self):
+        while True:
+            item = await self._queue.get()
+            batch = [item]
+            # 쌓인 청크를 모아서 한 번에 기록
+            while item is not None and len(batch) < self.max_coalesce and not self._queue.empty():
+                item = self._queue.get_nowait()
+                batch.append(item)
+            
+            done = batch[-1] is None
+            chunks = [entry for entry in batch if entry is not None]
+            if chunks:
+                data = b"".join(chunk for _, chunk in chunks)
+                try:
+                    await asyncio.to_thread(self._write, data)
+                    self.written_chunks += len(chunks)
+                    self.written_bytes += len(data)
+                except Exception as e:
+                    self.failed_writes += 1
+                    logger.error(f"녹음 청크 기록 실패: {e}")
+                self.last_upload_lag = time.monotonic() - chunks[0][0]
+                self.max_upload_lag = max(self.max_upload_lag, self.last_upload_lag)
+            
+            for _ in batch:
+                self._queue.task_done()
+            if done:
+                break
+
+    async def close(self):
+        """남은 청크를 모두 기록하고 writer 태스크를 종료합니다."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._task is None:
+            return
+        await self._queue.put(None)
+        await self._task
+
+    def cancel(self):
+        """writer 태스크를 즉시 중단 (남은 청크는 버림)"""
+        self._closed = True
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> Dict[str, Any]:
+        """세션별 녹음 큐 지표"""
+        return {
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self.max_queue_depth,
+            "enqueued_chunks": self.enqueued_chunks,
+            "written_chunks": self.written_chunks,
+            "written_bytes": self.written_bytes,
+            "dropped_chunks": self.dropped_chunks,
+            "failed_writes": self.failed_writes,
+            "last_upload_lag": self.last_upload_lag,
+            "max_upload_lag": self.max_upload_lag,
+        }
+
 class StreamingAudioRecorder:
-    """스트리밍 방식 오디오 녹음 및 GCS 업로드"""
+    """스트리밍 방식 오디오 녹음 및 GCS 업로드
+
+    wav 형식은 PCM을, flac 형식은 통화 중에 블록 단위로 인코딩한 FLAC 프레임을 임시 블롭에 올리고,
+    종료 시 compose로 최종 길이가 담긴 헤더(WAV 헤더 또는 STREAMINFO)를 앞에 붙입니다.
+    STREAMINFO의 총 샘플 수가 0이면 디코더가 파일을 읽지 못하므로 FLAC도 헤더를 마지막에 만듭니다.
+    """
     
-    def __init__(self, user_id: str, session_id: str):
+    def __init__(self, user_id: str, session_id: str, bucket: storage.Bucket, recording_format: str = "wav"):
         self.user_id = user_id
         self.session_id = session_id
-        self.gcs_client = storage.Client()
-        self.bucket_name = os.getenv("GCS_BUCKET_NAME", "voice-recordings")
+        self.bucket_name = bucket.name
+        self.recording_format = _resolve_format(recording_format)
+        _, _, self.codec = RECORDING_FORMATS[self.recording_format]
         
         # PCM 스트림 설정
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         self.pcm_blob_name = f"recordings/{user_id}/{session_id}_{timestamp}.pcm"
         self.wav_blob_name = f"recordings/{user_id}/{session_id}_{timestamp}.wav"
+        self.flac_blob_name = f"recordings/{user_id}/{session_id}_{timestamp}.flac"
+        self.frames_blob_name = f"{self.flac_blob_name}.frames"
+        self.encoder: Optional[StreamingFlacEncoder] = None
+        if self.recording_format == "flac":
+            self.encoder = StreamingFlacEncoder(SEND_SAMPLE_RATE, RECORDING_FLAC_BLOCK_SIZE)
+            stream_blob_name = self.frames_blob_name
+        else:
+            stream_blob_name = self.pcm_blob_name
         
-        # 업로드 준비
-        self.bucket = self.gcs_client.bucket(self.bucket_name)
-        self.pcm_blob = self.bucket.blob(self.pcm_blob_name)
+        # 업로드 준비 (공유 GCS 클라이언트의 버킷 핸들 사용)
+        self.bucket = bucket
+        self.pcm_blob = self.bucket.blob(stream_blob_name)
         
-        # PCM 스트림 업로드 시작 (resumable upload)
+        # 스트림 업로드 시작 (resumable upload)
         self.pcm_stream = self.pcm_blob.open("wb")
         self.total_frames = 0
         
+        # 업로드는 백그라운드 writer가 담당 (이벤트 루프를 막지 않음)
+        self.writer = RecordingWriter(
+            self._write_pcm,
+            max_queue_size=RECORDING_QUEUE_MAX_CHUNKS,
+            overflow_policy=RECORDING_OVERFLOW_POLICY
+        )
+        
     async def append_audio_chunk(self, audio_chunk: bytes) -> bool:
-        """오디오 청크를 실시간으로 GCS에 업로드"""
-        try:
-            if self.pcm_stream:
-                self.pcm_stream.write(audio_chunk)
-                self.total_frames += len(audio_chunk) // 2  # 16bit = 2bytes per sample
-                return True
-        except Exception as e:
-            logger.error(f"PCM 스트림 업로드 실패: {e}")
+        """오디오 청크를 녹음 큐에 추가 (GCS 업로드는 백그라운드에서 수행)"""
+        if not self.pcm_stream:
             return False
-        return False
+        return await self.writer.submit(audio_chunk)
+
+    def compose_job(self) -> Tuple[str, Dict[str, Any]]:
+        """스트림을 닫은 뒤 최종 파일을 만드는 작업의 (종류, 파라미터)"""
+        if self.encoder:
+            return "compose_flac", {
+                "frames_blob_name": self.frames_blob_name,
+                "flac_blob_name": self.flac_blob_name,
+                "header": self.encoder.header(final=True),
+                "codec": self.codec,
+            }
+        return "compose_wav", {
+            "pcm_blob_name": self.pcm_blob_name,
+            "wav_blob_name": self.wav_blob_name,
+            "codec": self.codec,
+        }
+
+    def _write_pcm(self, data: bytes):
+        """writer 스레드에서 호출: PCM 데이터(flac이면 인코딩한 프레임)를 GCS 스트림에 기록"""
+        if self.pcm_stream:
+            payload = self.encoder.encode(data) if self.encoder else data
+            with track_latency("gcs", "write"):
+                self.pcm_stream.write(payload)
+            self.total_frames += len(data) // 2  # 16bit = 2bytes per sample
+    
+    def _close_pcm_stream(self):
+        """남은 FLAC 샘플을 마지막 프레임으로 기록하고 스트림 닫기"""
+        if self.encoder:
+            self.pcm_stream.write(self.encoder.flush())
+            logger.info(
+                f"FLAC 인코딩: {self.total_frames * 2} -> {self.encoder.bytes_out} bytes "
+                f"({self.encoder.frame_number} frames)"
+            )
+        self.pcm_stream.close()
             
     def _create_wav_header(self, sample_rate: int, num_channels: int, bits_per_sample: int, data_size: int) -> bytes:
         """WAV 파일 헤더 생성"""
-        byte_rate = sample_rate * num_channels * bits_per_sample // 8
-        block_align = num_channels * bits_per_sample // 8
-        
-        header = struct.pack('<4sL4s4sLHHLLHH4sL',
-            b'RIFF',
-            36 + data_size,  # 파일 크기 - 8
-            b'WAVE',
-            b'fmt ',
-            16,  # fmt chunk size
-            1,   # PCM format
-            num_channels,
-            sample_rate,
-            byte_rate,
-            block_align,
-            bits_per_sample,
-            b'data',
-            data_size
-        )
-        return header
+        return create_wav_header(sample_rate, num_channels, bits_per_sample, data_size)
     
+    async def close_stream(self) -> bool:
+        """큐에 남은 청크를 기록하고 PCM 스트림을 닫습니다. 녹음된 데이터가 있으면 True."""
+        # 큐에 남은 청크를 모두 기록
+        await self.writer.close()
+        logger.info(f"녹음 큐 지표: {self.writer.stats()}")
+        
+        # PCM 스트림 닫기 (마지막 resumable 청크 업로드)
+        if self.pcm_stream:
+            try:
+                with track_latency("gcs", "finalize"):
+                    await asyncio.to_thread(self._close_pcm_stream)
+                logger.info(f"PCM 스트림 닫기 완료. 총 프레임: {self.total_frames}")
+            except Exception as e:
+                logger.error(f"PCM 스트림 닫기 중 오류: {e}")
+            finally:
+                self.pcm_stream = None
+        
+        if self.total_frames == 0:
+            logger.warning("녹음된 오디오가 없습니다. (total_frames = 0)")
+            # 빈 임시 블롭은 남기지 않음 (샘플이 없는 녹음 파일은 만들지 않음)
+            try:
+                await asyncio.to_thread(self.pcm_blob.delete)
+            except Exception as e:
+                logger.debug(f"빈 녹음 블롭 삭제 실패: {e}")
+            return False
+        return True
+
     async def finalize_recording(self) -> Optional[str]:
-        """세션 종료시 PCM을 WAV로 변환하여 최종 파일 생성"""
+        """세션 종료시 헤더를 붙여 최종 녹음 파일 생성"""
+        try:
+            if not await self.close_stream():
+                return None
+            kind, params = self.compose_job()
+            if kind == "compose_flac":
+                return await asyncio.to_thread(
+                    compose_flac_from_frames, self.bucket, self.frames_blob_name, self.flac_blob_name, params["header"]
+                )
+            return await asyncio.to_thread(
+                compose_wav_from_pcm, self.bucket, self.pcm_blob_name, self.wav_blob_name
+            )
+        except Exception as e:
+            logger.error(f"녹음 파일 생성 실패: {e}")
+            return None
+    
+    def discard(self):
+        """녹음을 저장하지 않고 버림 (닫지 않은 resumable 업로드는 GCS에서 만료됨)"""
+        self.writer.cancel()
+        self.pcm_stream = None
+
+    def cleanup(self):
+        """리소스 정리"""
+        self.writer.cancel()
         try:
-            # PCM 스트림 닫기
             if self.pcm_stream:
-                try:
-                    self.pcm_stream.close()
-                    logger.info(f"PCM 스트림 닫기 완료. 총 프레임: {self.total_frames}")
-                except Exception as e:
-                    logger.error(f"PCM 스트림 닫기 중 오류: {e}")
-                finally:
-                    self.pcm_stream = None
+                self.pcm_stream.close()
+                self.pcm_stream = None
+        except:
+            pass
+
+class SpoolAudioRecorder:
+    """로컬 디스크 스풀 방식 오디오 녹음
+
+    통화 중에는 로컬 WAV 파일(선택적으로 메모리 맵)에 PCM을 이어 쓰고, 종료 시 헤더를 제자리에서
+    수정한 뒤 업로더가 한 번의 요청으로 GCS에 올립니다. 세션 RAM 사용량은 통화 길이와 무관합니다.
+    flac 형식이면 FLAC 프레임을 이어 쓰고 프레임을 쓸 때마다 STREAMINFO를 현재 길이로 덮어씁니다 (메모리 맵 미사용).
+    스풀 경로는 GCS 블롭 경로와 같은 구조라서 재시작 후에도 업로드 대상을 알 수 있습니다.
+    """
+
+    PART_SUFFIX = ".part"
+
+    def __init__(self, user_id: str, session_id: str, bucket_name: str, spool_dir: str,
+                 uploader: "RecordingUploader", use_mmap: bool = False, mmap_grow_bytes: int = 1 << 20,
+                 recording_format: str = "wav"):
+        self.user_id = user_id
+        self.session_id = session_id
+        self.bucket_name = bucket_name
+        self.uploader = uploader
+        self.recording_format = _resolve_format(recording_format)
+        extension, _, self.codec = RECORDING_FORMATS[self.recording_format]
+        
+        self.encoder: Optional[StreamingFlacEncoder] = None
+        if self.recording_format == "flac":
+            self.encoder = StreamingFlacEncoder(SEND_SAMPLE_RATE, RECORDING_FLAC_BLOCK_SIZE)
+            if use_mmap:
+                logger.warning("flac 녹음은 메모리 맵 스풀을 지원하지 않아 일반 파일로 기록합니다.")
+                use_mmap = False
+        self.use_mmap = use_mmap
+        self.mmap_grow_bytes = mmap_grow_bytes
+        
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.wav_blob_name = f"recordings/{user_id}/{session_id}_{timestamp}{extension}"
+        self.wav_path = os.path.join(spool_dir, self.wav_blob_name)
+        self.part_path = self.wav_path + self.PART_SUFFIX
+        os.makedirs(os.path.dirname(self.part_path), exist_ok=True)
+        
+        # 크기 0으로 표시된 헤더를 먼저 기록 (종료 시 제자리에서 수정)
+        self.file = open(self.part_path, "w+b")
+        if self.encoder:
+            self.file.write(self.encoder.header())
+        else:
+            self.file.write(create_wav_header(SEND_SAMPLE_RATE, 1, 16, 0))
+        self.data_size = 0
+        self.total_frames = 0
+        
+        self._mmap: Optional[mmap.mmap] = None
+        if use_mmap:
+            self.file.truncate(WAV_HEADER_SIZE + mmap_grow_bytes)
+            self._mmap = mmap.mmap(self.file.fileno(), 0)
+        
+        self.writer = RecordingWriter(
+            self._write_pcm,
+            max_queue_size=RECORDING_QUEUE_MAX_CHUNKS,
+            overflow_policy=RECORDING_OVERFLOW_POLICY
+        )
+
+    async def append_audio_chunk(self, audio_chunk: bytes) -> bool:
+        """오디오 청크를 녹음 큐에 추가 (디스크 기록은 백그라운드에서 수행)"""
+        if not self.file:
+            return False
+        return await self.writer.submit(audio_chunk)
+
+    def _write_pcm(self, data: bytes):
+        """writer 스레드에서 호출: PCM 데이터를 스풀 파일에 추가"""
+        if not self.file:
+            return
+        if self.encoder:
+            frames = self.encoder.encode(data)
+            if frames:
+                self.file.seek(0, os.SEEK_END)
+                self.file.write(frames)
+                # 헤더를 매번 갱신해 두면 비정상 종료 후에도 기록된 프레임까지 읽을 수 있음
+                self.file.seek(0)
+                self.file.write(self.encoder.header(final=True))
+            self.data_size += len(data)
+            self.total_frames += len(data) // 2
+            return
+        offset = WAV_HEADER_SIZE + self.data_size
+        if self._mmap is not None:
+            end = offset + len(data)
+            if end > len(self._mmap):
+                # 파일을 grow 단위로 늘리고 다시 매핑
+                new_size = end + self.mmap_grow_bytes
+                self._mmap.close()
+                self.file.truncate(new_size)
+                self._mmap = mmap.mmap(self.file.fileno(), 0)
+            self._mmap[offset:end] = data
+            self.data_size += len(data)
+            # 헤더를 매번 갱신해 두면 비정상 종료 후에도 실제 길이를 알 수 있음
+            patch_wav_sizes(self._mmap, self.data_size)
+        else:
+            self.file.seek(offset)
+            self.file.write(data)
+            self.data_size += len(data)
+        self.total_frames += len(data) // 2  # 16bit = 2bytes per sample
+
+    async def finalize_recording(self) -> Optional[str]:
+        """헤더를 수정하고 파일을 업로드 대기열에 넣습니다. 업로드 후의 GCS URL을 반환합니다."""
+        try:
+            await self.writer.close()
+            logger.info(f"녹음 큐 지표: {self.writer.stats()}")
+            await asyncio.to_thread(self._close_file)
             
             if self.total_frames == 0:
                 logger.warning("녹음된 오디오가 없습니다. (total_frames = 0)")
+                os.remove(self.part_path)
                 return None
             
-            # PCM 파일 크기 확인
-            try:
-                self.pcm_blob.reload()
-                data_size = self.pcm_blob.size if self.pcm_blob.size else 0
-                logger.info(f"PCM 파일 크기: {data_size} bytes")
-            except Exception as e:
-                logger.error(f"PCM 파일 정보 확인 중 오류: {e}")
-                return None
-            
-            if data_size == 0:
-                logger.warning("PCM 파일이 비어있습니다.")
-                return None
-            
-            # WAV 헤더 생성 및 별도 블롭에 업로드
-            wav_header = self._create_wav_header(
-                sample_rate=SEND_SAMPLE_RATE,
-                num_channels=1,
-                bits_per_sample=16,
-                data_size=data_size
-            )
-            
-            header_blob_name = f"{self.pcm_blob_name}.header"
-            header_blob = self.bucket.blob(header_blob_name)
-            header_blob.upload_from_string(wav_header)
-            
-            # GCS Compose를 사용하여 헤더 + PCM 데이터 결합
-            wav_blob = self.bucket.blob(self.wav_blob_name)
-            wav_blob.compose([header_blob, self.pcm_blob])
-            
-            # 임시 파일들 삭제
-            header_blob.delete()
-            self.pcm_blob.delete()
+            os.replace(self.part_path, self.wav_path)
+            self.uploader.enqueue(self.wav_path)
             
             wav_url = f"gs://{self.bucket_name}/{self.wav_blob_name}"
-            logger.info(f"WAV 파일 생성 완료: {wav_url}")
+            logger.info(f"{self.recording_format.upper()} 스풀 파일 업로드 대기: {wav_url}")
             return wav_url
-            
         except Exception as e:
-            logger.error(f"WAV 파일 생성 실패: {e}")
+            logger.error(f"{self.recording_format.upper()} 스풀 파일 마무리 실패: {e}")
             return None
-    
+
+    def _close_file(self):
+        """헤더 크기 필드를 수정하고 파일을 실제 길이로 자른 뒤 닫기"""
+        if not self.file:
+            return
+        if self.encoder:
+            # 남은 샘플을 마지막 프레임으로 기록하고 STREAMINFO를 최종 길이로 덮어쓰기
+            self.file.seek(0, os.SEEK_END)
+            self.file.write(self.encoder.flush())
+            self.file.seek(0)
+            self.file.write(self.encoder.header(final=True))
+            self.file.flush()
+            os.fsync(self.file.fileno())
+            self.file.close()
+            self.file = None
+            logger.info(f"FLAC 인코딩: {self.data_size} -> {self.encoder.bytes_out} bytes")
+            return
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+        self.file.truncate(WAV_HEADER_SIZE + self.data_size)
+        patch_wav_sizes(self.file, self.data_size)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        self.file = None
+
+    def discard(self):
+        """녹음을 저장하지 않고 스풀 파일 삭제"""
+        self.cleanup()
+        try:
+            os.remove(self.part_path)
+        except OSError:
+            pass
+
     def cleanup(self):
-        """리소스 정리"""
+        """리소스 정리 (스풀 파일은 남겨 두어 다음 시작 시 복구)"""
+        self.writer.cancel()
         try:
-            if self.pcm_stream:
-                self.pcm_stream.close()
-                self.pcm_stream = None
+            if self._mmap is not None:
+                self._mmap.close()
+                self._mmap = None
+            if self.file:
+                self.file.close()
+                self.file = None
         except:
             pass
 
+class RecordingUploader:
+    """완료된 스풀 WAV 파일을 백그라운드에서 GCS에 업로드
+
+    시작 시 스풀 디렉터리에 남아 있는 파일(업로드되지 않은 .wav/.flac, 비정상 종료된 .part)을 복구해 업로드합니다.
+    """
+
+    def __init__(self, spool_dir: str, max_attempts: int = 5, retry_delay: float = 5.0):
+        self.spool_dir = spool_dir
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.bucket: Optional[storage.Bucket] = None
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        
+        # 지표
+        self.uploaded_files = 0
+        self.uploaded_bytes = 0
+        self.failed_uploads = 0
+
+    async def start(self, bucket: storage.Bucket):
+        """업로드 태스크 시작 및 남은 스풀 파일 복구"""
+        self.bucket = bucket
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+        for path in await asyncio.to_thread(self._recover_orphans):
+            self.enqueue(path)
+
+    def enqueue(self, path: str):
+        """업로드할 녹음 파일 추가"""
+        self._queue.put_nowait((path, 0))
+
+    def _recover_orphans(self) -> List[str]:
+        """비정상 종료로 남은 스풀 파일을 업로드 가능한 WAV로 정리"""
+        recovered = []
+        if not os.path.isdir(self.spool_dir):
+            return recovered
+        for root, _, files in os.walk(self.spool_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                is_part = name.endswith(SpoolAudioRecorder.PART_SUFFIX)
+                final_path = path[:-len(SpoolAudioRecorder.PART_SUFFIX)] if is_part else path
+                extension = os.path.splitext(final_path)[1]
+                if self._content_type(final_path) is None:
+                    continue
+                if is_part:
+                    try:
+                        # FLAC은 기록할 때마다 STREAMINFO를 갱신하므로 헤더가 말하는 샘플까지 읽힘
+                        if extension == ".flac" and self._flac_total_samples(path) == 0:
+                            logger.info(f"샘플이 없는 스풀 파일 삭제: {path}")
+                            os.remove(path)
+                            continue
+                        if extension == ".wav":
+                            self._repair_part_file(path)
+                        os.replace(path, final_path)
+                        recovered.append(final_path)
+                    except Exception as e:
+                        logger.error(f"스풀 파일 복구 실패 {path}: {e}")
+                else:
+                    recovered.append(path)
+        if recovered:
+            logger.info(f"업로드되지 않은 스풀 파일 {len(recovered)}개 복구")
+        return recovered
+
+    @staticmethod
+    def _content_type(path: str) -> Optional[str]:
+        """확장자로 녹음 파일의 Content-Type 결정 (녹음 파일이 아니면 None)"""
+        extension = os.path.splitext(path)[1]
+        for ext, content_type, _ in RECORDING_FORMATS.values():
+            if ext == extension:
+                return content_type
+        return None
+
+    @staticmethod
+    def _flac_total_samples(path: str) -> int:
+        """STREAMINFO의 총 샘플 수 (하위 36비트)"""
+        with open(path, "rb") as f:
+            header = f.read(26)
+        if len(header) < 26 or header[:4] != b"fLaC":
+            return 0
+        return int.from_bytes(header[18:26], "big") & ((1 << 36) - 1)
+
+    @staticmethod
+    def _repair_part_file(path: str):
+        """헤더의 데이터 크기(mmap 모드) 또는 파일 크기로 실제 길이를 정해 헤더를 수정"""
+        with open(path, "r+b") as f:
+            file_size = os.fstat(f.fileno()).st_size
+            f.seek(40)
+            header_size = struct.unpack('<L', f.read(4))[0]
+            data_size = file_size - WAV_HEADER_SIZE
+            if 0 < header_size <= data_size:
+                data_size = header_size
+            data_size -= data_size % 2
+            f.truncate(WAV_HEADER_SIZE + data_size)
+            patch_wav_sizes(f, data_size)
+
+    async def _run(self):
+        while True:
+            path, attempts = await self._queue.get()
+            try:
+                await asyncio.to_thread(self._upload, path)
+            except Exception as e:
+                attempts += 1
+                self.failed_uploads += 1
+                if attempts < self.max_attempts:
+                    logger.warning(f"스풀 파일 업로드 실패 ({attempts}/{self.max_attempts}), 재시도 예정: {e}")
+                    asyncio.get_running_loop().call_later(
+                        self.retry_delay * attempts, self._queue.put_nowait, (path, attempts)
+                    )
+                else:
+                    logger.error(f"스풀 파일 업로드 포기, 다음 시작 시 재시도: {path}")
+            finally:
+                self._queue.task_done()
+
+    def _upload(self, path: str):
+        """녹음 파일을 한 번의 요청으로 업로드하고 로컬 파일 삭제"""
+        if not os.path.exists(path):
+            return
+        blob_name = os.path.relpath(path, self.spool_dir).replace(os.sep, "/")
+        size = os.path.getsize(path)
+        with track_latency("gcs", "upload"):
+            self.bucket.blob(blob_name).upload_from_filename(path, content_type=self._content_type(path))
+        os.remove(path)
+        self.uploaded_files += 1
+        self.uploaded_bytes += size
+        logger.info(f"스풀 파일 업로드 완료: gs://{self.bucket.name}/{blob_name}")
+
+    async def stop(self):
+        """업로드 태스크 중단 (남은 파일은 다음 시작 시 업로드)"""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
 class AudioService:
     """음성 녹음 서비스 (레거시 지원)"""
     
     def __init__(self):
-        # GCS 클라이언트 초기화
-        self.gcs_client = storage.Client()
         self.bucket_name = os.getenv("GCS_BUCKET_NAME", "voice-recordings")
+        
+        # GCS 클라이언트는 애플리케이션 시작 시 공유 클라이언트로 주입됨 (start)
+        self.gcs_client: Optional[storage.Client] = None
+        self.bucket: Optional[storage.Bucket] = None
+        
+        # 녹음 방식 (stream: GCS로 직접 스트리밍, spool: 로컬 디스크 스풀 후 업로드)
+        self.recording_mode = RECORDING_MODE
+        self.recording_format = _resolve_format(RECORDING_FORMAT)
+        self.uploader = RecordingUploader(RECORDING_SPOOL_DIR)
+    
+    def start(self, gcs_client: storage.Client):
+        """공유 GCS 클라이언트 설정"""
+        self.gcs_client = gcs_client
+        self.bucket = gcs_client.bucket(self.bucket_name)
     
-    def create_streaming_recorder(self, user_id: str, session_id: str) -> StreamingAudioRecorder:
-        """스트리밍 녹음기 생성"""
-        return StreamingAudioRecorder(user_id, session_id)
+    async def start_uploader(self):
+        """스풀 업로더 시작 (spool 모드일 때만, 남은 스풀 파일 복구 포함)"""
+        if self.recording_mode == "spool":
+            await self.uploader.start(self._get_bucket())
+    
+    async def stop_uploader(self):
+        """스풀 업로더 중단"""
+        await self.uploader.stop()
+    
+    def _get_bucket(self) -> storage.Bucket:
+        """버킷 핸들 반환 (시작 전이면 클라이언트를 한 번 생성)"""
+        if self.bucket is None:
+            self.start(storage.Client())
+        return self.bucket
+    
+    def create_streaming_recorder(self, user_id: str, session_id: str):
+        """녹음기 생성 (RECORDING_MODE에 따라 GCS 스트리밍 또는 로컬 스풀, RECORDING_FORMAT에 따라 wav/flac)"""
+        if self.recording_mode == "spool":
+            return SpoolAudioRecorder(
+                user_id, session_id, self.bucket_name, RECORDING_SPOOL_DIR,
+                self.uploader, use_mmap=RECORDING_SPOOL_MMAP, recording_format=self.recording_format
+            )
+        return StreamingAudioRecorder(user_id, session_id, self._get_bucket(), recording_format=self.recording_format)
         
     def create_wav_file(self, audio_chunks: List[bytes], sample_rate: int = SEND_SAMPLE_RATE) -> bytes:
         """레거시: 오디오 청크들을 WAV 파일로 변환"""
@@ -180,9 +767,8 @@ class AudioService:
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             blob_name = f"recordings/{user_id}/{session_id}_{timestamp}.wav"
             
-            # 버킷과 블롭 객체 생성
-            bucket = self.gcs_client.bucket(self.bucket_name)
-            blob = bucket.blob(blob_name)
+            # 블롭 객체 생성
+            blob = self._get_bucket().blob(blob_name)
             
             # 파일 업로드
             blob.upload_from_string(
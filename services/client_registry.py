@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import Optional
+
+from google import genai
+from google.cloud import storage
+
+from settings import GEMINI_API_KEY, MODEL
+from database import db
+from services.memory_service import memory_service
+from services.audio_service import audio_service
+from services.recording_jobs import recording_job_queue
+from services.analysis_outbox import analysis_outbox
+
+logger = logging.getLogger(__name__)
+
+class ClientRegistry:
+    """외부 서비스 클라이언트 레지스트리
+
+    애플리케이션 시작 시 Gemini, GCS, Pinecone, MongoDB, 분석 서버 HTTP 클라이언트를 한 번만 생성하고
+    연결을 미리 데워둔 뒤 모든 세션이 공유합니다. 종료 시 정리합니다.
+    """
+
+    def __init__(self):
+        self.genai_client: Optional[genai.Client] = None
+        self.gcs_client: Optional[storage.Client] = None
+        self.started = False
+
+    async def startup(self):
+        """클라이언트 생성 및 연결 예열"""
+        if self.started:
+            return
+
+        # --- Gemini ---
+        # client = genai.Client(vertexai=True, project=PROJECT_ID, location=LOCATION)
+        # Google AI Studio API Key를 사용하려면:
+        self.genai_client = genai.Client(vertexai=False, api_key=GEMINI_API_KEY)
+        try:
+            await self.genai_client.aio.models.get(model=MODEL)
+            logger.info("Gemini 클라이언트 예열 완료")
+        except Exception as e:
+            logger.warning(f"Gemini 클라이언트 예열 실패: {e}")
+
+        # --- Google Cloud Storage ---
+        try:
+            self.gcs_client = storage.Client()
+            audio_service.start(self.gcs_client)
+            await asyncio.to_thread(audio_service.bucket.reload)
+            logger.info(f"GCS 클라이언트 예열 완료: {audio_service.bucket_name}")
+        except Exception as e:
+            logger.warning(f"GCS 클라이언트 예열 실패: {e}")
+        
+        # 녹음 스풀 업로더 (남은 스풀 파일 복구)
+        try:
+            await audio_service.start_uploader()
+        except Exception as e:
+            logger.error(f"녹음 업로더 시작 실패: {e}")
+
+        # --- Pinecone (인덱스 확인/생성 및 인덱스 핸들 예열) ---
+        try:
+            await asyncio.to_thread(memory_service.setup_pinecone)
+            await asyncio.to_thread(memory_service.warm_up)
+            logger.info("벡터 저장소 예열 완료")
+        except Exception as e:
+            logger.warning(f"벡터 저장소 예열 실패: {e}")
+
+        # --- MongoDB (이벤트 루프가 돈 뒤 클라이언트 생성) ---
+        db.connect()
+        try:
+            await db.client.admin.command("ping")
+            logger.info("MongoDB 연결 예열 완료")
+        except Exception as e:
+            logger.warning(f"MongoDB 연결 예열 실패: {e}")
+        
+        # 분석 서버 전송 아웃박스 (저장된 미전송 기록 이어서 전송, 녹음 작업이 대기열에 넣으므로 먼저 시작)
+        try:
+            await analysis_outbox.start(db.analysis_outbox)
+        except Exception as e:
+            logger.error(f"분석 서버 아웃박스 시작 실패: {e}")
+        
+        # 녹음 마무리 작업 큐 (저장된 미완료 작업 이어서 처리)
+        try:
+            await recording_job_queue.start(db.recording_jobs)
+        except Exception as e:
+            logger.error(f"녹음 작업 큐 시작 실패: {e}")
+
+        self.started = True
+
+    async def shutdown(self):
+        """공유 클라이언트 정리"""
+        await recording_job_queue.stop()
+        await analysis_outbox.stop()
+        await audio_service.stop_uploader()
+        
+        try:
+            await memory_service.close()
+        except Exception as e:
+            logger.error(f"메모리 서비스 종료 중 오류: {e}")
+
+        if self.gcs_client:
+            try:
+                self.gcs_client.close()
+            except Exception as e:
+                logger.error(f"GCS 클라이언트 종료 중 오류: {e}")
+            self.gcs_client = None
+
+        try:
+            db.close()
+        except Exception as e:
+            logger.error(f"MongoDB 클라이언트 종료 중 오류: {e}")
+
+        if self.genai_client:
+            try:
+                await self.genai_client.aio.aclose()
+                self.genai_client.close()
+            except Exception as e:
+                logger.error(f"Gemini 클라이언트 종료 중 오류: {e}")
+            self.genai_client = None
+
+        self.started = False
+        logger.info("공유 클라이언트 정리 완료")
+
+# 전역 클라이언트 레지스트리
+client_registry = ClientRegistry()
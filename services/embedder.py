@@ -0,0 +1,100 @@
+import zlib
+import logging
+import unicodedata
+from abc import ABC, abstractmethod
+from typing import List
+
+import numpy as np
+
+from services.metrics import track_latency
+
+logger = logging.getLogger(__name__)
+
+class Embedder(ABC):
+    """텍스트 임베딩 백엔드 인터페이스
+
+    embed는 블로킹 호출이며 스레드 풀에서 실행됩니다. 입력 순서대로 벡터를 반환하고,
+    실패한 입력은 빈 리스트로 채웁니다.
+    """
+
+    # 임베딩 캐시 키에 쓰는 모델 이름 (백엔드가 바뀌면 캐시가 섞이지 않도록)
+    model: str
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트를 한 번에 임베딩합니다."""
+
+class PineconeEmbedder(Embedder):
+    """Pinecone inference API 백엔드"""
+
+    def __init__(self, pinecone, model: str):
+        self.pinecone = pinecone
+        self.model = model
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        # Pinecone inference API 사용
+        with track_latency("pinecone", "embed"):
+            result = self.pinecone.inference.embed(
+                model=self.model,
+                inputs=texts,
+                parameters={"input_type": "query", "truncate": "END"}
+            )
+
+        # EmbeddingsList 객체 처리
+        vectors = []
+        if hasattr(result, '__iter__'):
+            vectors = [self._extract_values(embedding) for embedding in result]
+
+        # 결과 개수가 맞지 않으면 부족한 부분은 빈 벡터로 채움
+        vectors.extend([] for _ in range(len(texts) - len(vectors)))
+        return vectors[:len(texts)]
+
+    @staticmethod
+    def _extract_values(embedding) -> List[float]:
+        """DenseEmbedding 객체에서 벡터 값을 추출합니다."""
+        if hasattr(embedding, 'to_dict'):
+            embedding_dict = embedding.to_dict()
+            if 'values' in embedding_dict:
+                return embedding_dict['values']
+            elif 'embedding' in embedding_dict:
+                return embedding_dict['embedding']
+
+        # 직접 속성 접근 시도
+        if hasattr(embedding, 'values'):
+            return embedding.values
+        elif hasattr(embedding, 'embedding'):
+            return embedding.embedding
+        return []
+
+class LocalEmbedder(Embedder):
+    """외부 API 없이 동작하는 문자 n-gram 해싱 임베딩 (단일 노드/개발용)
+
+    정규화한 텍스트의 문자 1~3-gram을 차원 수만큼의 버킷에 부호와 함께 해싱하고 L2 정규화합니다.
+    의미 유사도는 모델 임베딩보다 약하지만 같은 단어가 겹치는 기억은 잘 찾고, 같은 입력에는 항상
+    같은 벡터를 돌려주므로 로컬 벡터 저장소와 함께 Pinecone 없이 기억 기능을 쓸 수 있습니다.
+    """
+
+    def __init__(self, dimension: int, max_ngram: int = 3):
+        self.dimension = dimension
+        self.max_ngram = max_ngram
+        self.model = f"local-ngram-hash-{dimension}"
+
+    def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+    def _embed_one(self, text: str) -> List[float]:
+        normalized = " ".join(unicodedata.normalize("NFC", text).lower().split())
+        if not normalized:
+            return []
+
+        vector = np.zeros(self.dimension, dtype=np.float32)
+        for n in range(1, self.max_ngram + 1):
+            for i in range(len(normalized) - n + 1):
+                digest = zlib.crc32(normalized[i:i + n].encode("utf-8"))
+                # 하위 비트로 버킷, 최상위 비트로 부호를 정해 해시 충돌의 편향을 줄임
+                vector[digest % self.dimension] += -1.0 if digest & 0x80000000 else 1.0
+
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return []
+        return (vector / norm).tolist()
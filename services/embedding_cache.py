@@ -0,0 +1,177 @@
+import os
+import time
+import array
+import sqlite3
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import List, Optional, Tuple, Dict
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingCache:
+    """임베딩 2단계 캐시 (프로세스 내 LRU + 선택적 디스크 캐시)
+
+    키는 (임베딩 모델, 정규화된 텍스트) 입니다. get_memory/put_memory는 디스크를 건드리지 않으므로
+    이벤트 루프에서 호출할 수 있고, get_disk/put_disk는 블로킹이므로 스레드에서 호출해야 합니다.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl_seconds: float = 86400.0, disk_path: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.disk_path = disk_path
+
+        # 1단계: 프로세스 내 LRU (key -> (저장 시각, 벡터))
+        self._memory: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        self._lock = threading.Lock()       # LRU 보호 (짧게만 잡음)
+        self._disk_lock = threading.Lock()  # sqlite 연결 보호 (디스크 I/O 동안 잡음)
+
+        # 통계
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # 2단계: 디스크 캐시 (재시작 후에도 유지)
+        self._disk: Optional[sqlite3.Connection] = None
+        if disk_path:
+            try:
+                directory = os.path.dirname(disk_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._disk = sqlite3.connect(disk_path, check_same_thread=False)
+                self._disk.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "model TEXT NOT NULL, text TEXT NOT NULL, created_at REAL NOT NULL, "
+                    "vector BLOB NOT NULL, PRIMARY KEY (model, text))"
+                )
+                self._disk.commit()
+                logger.info(f"Embedding disk cache enabled: {disk_path}")
+            except Exception as e:
+                logger.error(f"Failed to open embedding disk cache: {e}")
+                self._disk = None
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """캐시 키용 텍스트 정규화 (유니코드 NFC, 공백 정리, 소문자)"""
+        text = unicodedata.normalize("NFC", text)
+        return " ".join(text.split()).lower()
+
+    def _is_expired(self, created_at: float) -> bool:
+        return self.ttl_seconds > 0 and time.time() - created_at > self.ttl_seconds
+
+    @property
+    def has_disk(self) -> bool:
+        return self._disk is not None
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """캐시된 임베딩을 반환합니다. 없으면 None. (디스크 캐시가 있으면 블로킹)"""
+        vector = self.get_memory(model, text)
+        if vector is None and self.has_disk:
+            vector = self.get_disk(model, text)
+        return vector
+
+    def get_memory(self, model: str, text: str) -> Optional[List[float]]:
+        """프로세스 내 LRU에서만 찾습니다. 디스크 캐시가 없으면 여기서 miss로 셉니다 (있으면 get_disk에서)."""
+        key = (model, self.normalize(text))
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._is_expired(entry[0]):
+                del self._memory[key]
+                entry = None
+            if entry is None:
+                if not self.has_disk:
+                    self.misses += 1
+                return None
+            vector = entry[1]
+            self._memory.move_to_end(key)
+            self.memory_hits += 1
+            return vector
+
+    def get_disk(self, model: str, text: str) -> Optional[List[float]]:
+        """디스크 캐시에서 찾아 있으면 LRU에 올립니다. 없으면 miss로 셉니다. (블로킹)"""
+        key = (model, self.normalize(text))
+        vector = self._get_from_disk(key)
+        with self._lock:
+            if vector is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._put_memory(key, vector)
+        return vector
+
+    def put(self, model: str, text: str, vector: List[float]) -> None:
+        """임베딩을 두 캐시 계층에 모두 저장합니다. (디스크 캐시가 있으면 블로킹)"""
+        self.put_memory(model, text, vector)
+        self.put_disk(model, text, vector)
+
+    def put_memory(self, model: str, text: str, vector: List[float]) -> None:
+        """프로세스 내 LRU에만 저장합니다."""
+        if not vector:
+            return
+        key = (model, self.normalize(text))
+        with self._lock:
+            self._put_memory(key, vector)
+
+    def put_disk(self, model: str, text: str, vector: List[float]) -> None:
+        """디스크 캐시에만 저장합니다. (블로킹)"""
+        if not vector:
+            return
+        self._put_disk((model, self.normalize(text)), vector)
+
+    def _put_memory(self, key: Tuple[str, str], vector: List[float]) -> None:
+        self._memory[key] = (time.time(), vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_size:
+            self._memory.popitem(last=False)
+
+    def _get_from_disk(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        if not self._disk:
+            return None
+        try:
+            with self._disk_lock:
+                row = self._disk.execute(
+                    "SELECT created_at, vector FROM embeddings WHERE model = ? AND text = ?", key
+                ).fetchone()
+                if row is None:
+                    return None
+                created_at, blob = row
+                if self._is_expired(created_at):
+                    self._disk.execute("DELETE FROM embeddings WHERE model = ? AND text = ?", key)
+                    self._disk.commit()
+                    return None
+            return array.array("f", blob).tolist()
+        except Exception as e:
+            logger.error(f"Embedding disk cache read failed: {e}")
+            return None
+
+    def _put_disk(self, key: Tuple[str, str], vector: List[float]) -> None:
+        if not self._disk:
+            return
+        try:
+            with self._disk_lock:
+                self._disk.execute(
+                    "INSERT OR REPLACE INTO embeddings (model, text, created_at, vector) VALUES (?, ?, ?, ?)",
+                    (key[0], key[1], time.time(), array.array("f", vector).tobytes())
+                )
+                self._disk.commit()
+        except Exception as e:
+            logger.error(f"Embedding disk cache write failed: {e}")
+
+    def stats(self) -> Dict[str, float]:
+        """캐시 적중/실패 통계"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0,
+            "size": len(self._memory),
+        }
+
+    def close(self) -> None:
+        """디스크 캐시 연결 종료"""
+        with self._disk_lock:
+            if self._disk:
+                self._disk.close()
+                self._disk = None
@@ -0,0 +1,229 @@
+import struct
+import logging
+from typing import List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# FLAC 프레임 헤더용 코드 테이블
+_BLOCK_SIZE_CODES = {192: 1, 576: 2, 1152: 3, 2304: 4, 4608: 5,
+                     256: 8, 512: 9, 1024: 10, 2048: 11, 4096: 12, 8192: 13, 16384: 14, 32768: 15}
+_SAMPLE_RATE_CODES = {88200: 1, 176400: 2, 192000: 3, 8000: 4, 16000: 5, 22050: 6,
+                      24000: 7, 32000: 8, 44100: 9, 48000: 10, 96000: 11}
+
+_MAX_FIXED_ORDER = 4
+_MAX_RICE_PARAMETER = 14    # 4비트 파라미터, 15는 escape 코드
+_MAX_PARTITION_ORDER = 8
+
+def _make_crc_table(poly: int, width: int) -> List[int]:
+    top = 1 << (width - 1)
+    mask = (1 << width) - 1
+    table = []
+    for byte in range(256):
+        crc = byte << (width - 8)
+        for _ in range(8):
+            crc = ((crc << 1) ^ poly) if crc & top else (crc << 1)
+        table.append(crc & mask)
+    return table
+
+_CRC8_TABLE = _make_crc_table(0x07, 8)
+_CRC16_TABLE = _make_crc_table(0x8005, 16)
+
+def _crc8(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = _CRC8_TABLE[crc ^ byte]
+    return crc
+
+def _crc16(data: bytes) -> int:
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFF) ^ _CRC16_TABLE[(crc >> 8) ^ byte]
+    return crc
+
+def _bits(value: int, width: int) -> np.ndarray:
+    """정수를 MSB부터 width개의 비트 배열로 변환 (음수는 2의 보수)"""
+    value &= (1 << width) - 1
+    return ((value >> np.arange(width - 1, -1, -1, dtype=np.int64)) & 1).astype(np.uint8)
+
+def _utf8_coded(number: int) -> bytes:
+    """FLAC 프레임 번호용 UTF-8 방식 가변 길이 정수"""
+    if number < 0x80:
+        return bytes([number])
+    payload = []
+    while True:
+        payload.insert(0, 0x80 | (number & 0x3F))
+        number >>= 6
+        length = len(payload) + 1
+        if number < (1 << (7 - length)):
+            lead = ((0xFF << (8 - length)) & 0xFF) | number
+            return bytes([lead] + payload)
+
+def _rice_bits(residual: np.ndarray, parameter: int) -> np.ndarray:
+    """잔차를 Rice 부호화한 비트 배열 (벡터화)"""
+    unsigned = (residual << 1) ^ (residual >> 63)   # zigzag 변환
+    quotient = unsigned >> parameter
+    lengths = quotient + 1 + parameter
+    bits = np.zeros(int(lengths.sum()), dtype=np.uint8)
+    stop_positions = np.cumsum(lengths) - lengths + quotient
+    bits[stop_positions] = 1
+    if parameter > 0:
+        shifts = np.arange(parameter - 1, -1, -1, dtype=np.int64)
+        positions = stop_positions[:, np.newaxis] + 1 + np.arange(parameter, dtype=np.int64)
+        bits[positions.ravel()] = ((unsigned[:, np.newaxis] >> shifts) & 1).ravel()
+    return bits
+
+def _fixed_residuals(samples: np.ndarray) -> List[np.ndarray]:
+    """고정 예측기 0~4차 잔차 (k차 잔차는 k차 차분)"""
+    residuals = [samples]
+    for _ in range(_MAX_FIXED_ORDER):
+        residuals.append(np.diff(residuals[-1]))
+    return residuals
+
+def _encode_residual(residual: np.ndarray, block_size: int, order: int) -> np.ndarray:
+    """분할 차수와 파티션별 Rice 파라미터를 비용 최소로 골라 잔차 부분을 부호화"""
+    unsigned = (residual << 1) ^ (residual >> 63)
+    parameters = np.arange(_MAX_RICE_PARAMETER + 1, dtype=np.int64)
+
+    # 가능한 가장 세밀한 분할에서 파티션별, 파라미터별 (u >> k) 합을 한 번에 계산
+    max_order = 0
+    while (max_order < _MAX_PARTITION_ORDER and block_size % (1 << (max_order + 1)) == 0
+           and (block_size >> (max_order + 1)) > order):
+        max_order += 1
+    fine_count = 1 << max_order
+    fine_size = block_size >> max_order
+    starts = np.arange(fine_count, dtype=np.int64) * fine_size - order
+    starts[0] = 0
+    shifted = unsigned[np.newaxis, :] >> parameters[:, np.newaxis]
+    fine_sums = np.add.reduceat(shifted, starts, axis=1)          # (파라미터, 파티션)
+    fine_lengths = np.full(fine_count, fine_size, dtype=np.int64)
+    fine_lengths[0] -= order
+
+    best = None
+    for partition_order in range(max_order, -1, -1):
+        group = 1 << (max_order - partition_order)
+        sums = fine_sums.reshape(len(parameters), -1, group).sum(axis=2)
+        lengths = fine_lengths.reshape(-1, group).sum(axis=1)
+        costs = sums + lengths[np.newaxis, :] * (parameters[:, np.newaxis] + 1)
+        chosen = np.argmin(costs, axis=0)
+        total = int(costs[chosen, np.arange(costs.shape[1])].sum()) + 4 * len(chosen)
+        if best is None or total < best[0]:
+            best = (total, partition_order, chosen, lengths)
+
+    _, partition_order, chosen, lengths = best
+    pieces = [_bits(0, 2), _bits(partition_order, 4)]   # 4비트 Rice 파라미터 방식
+    offset = 0
+    for parameter, length in zip(chosen, lengths):
+        pieces.append(_bits(int(parameter), 4))
+        pieces.append(_rice_bits(residual[offset:offset + length], int(parameter)))
+        offset += length
+    return np.concatenate(pieces)
+
+class StreamingFlacEncoder:
+    """16비트 모노 PCM을 FLAC 프레임으로 스트리밍 인코딩 (NumPy 벡터화)
+
+    고정 예측기(0~4차) + 분할 Rice 부호화만 사용하는 무손실 인코더입니다.
+    header()를 먼저 기록하고, encode()가 반환하는 완성된 프레임을 이어서 기록하면 됩니다.
+    STREAMINFO의 총 샘플 수는 스트리밍 중에는 0(알 수 없음)이며, 파일이면 종료 후 header()로 덮어쓸 수 있습니다.
+    """
+
+    def __init__(self, sample_rate: int = 16000, block_size: int = 4096):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self._pending = bytearray()
+
+        self.frame_number = 0
+        self.total_samples = 0
+        self.bytes_out = 0
+        self.min_frame_size: Optional[int] = None
+        self.max_frame_size = 0
+
+    def header(self, final: bool = False) -> bytes:
+        """'fLaC' 마커와 STREAMINFO 블록 (final이면 총 샘플 수와 프레임 크기 포함)"""
+        min_frame = (self.min_frame_size or 0) if final else 0
+        max_frame = self.max_frame_size if final else 0
+        total_samples = self.total_samples if final else 0
+        info = struct.pack(">HH", self.block_size, self.block_size)
+        info += min_frame.to_bytes(3, "big") + max_frame.to_bytes(3, "big")
+        info += ((self.sample_rate << 44) | (0 << 41) | (15 << 36) | total_samples).to_bytes(8, "big")
+        info += bytes(16)   # MD5 서명 (계산하지 않음)
+        return b"fLaC" + bytes([0x80, 0x00, 0x00, len(info)]) + info
+
+    def encode(self, pcm: bytes) -> bytes:
+        """PCM 바이트를 받아 완성된 블록만큼 FLAC 프레임을 반환 (나머지는 다음 호출까지 보관)"""
+        self._pending.extend(pcm)
+        block_bytes = self.block_size * 2
+        full = len(self._pending) // block_bytes * block_bytes
+        if full == 0:
+            return b""
+        samples = np.frombuffer(bytes(self._pending[:full]), dtype="<i2").astype(np.int64)
+        del self._pending[:full]
+        return b"".join(
+            self._encode_frame(samples[start:start + self.block_size])
+            for start in range(0, len(samples), self.block_size)
+        )
+
+    def flush(self) -> bytes:
+        """남은 샘플을 마지막(짧은) 프레임으로 인코딩"""
+        usable = len(self._pending) - len(self._pending) % 2
+        if usable == 0:
+            self._pending.clear()
+            return b""
+        samples = np.frombuffer(bytes(self._pending[:usable]), dtype="<i2").astype(np.int64)
+        self._pending.clear()
+        return self._encode_frame(samples)
+
+    def _encode_frame(self, samples: np.ndarray) -> bytes:
+        block_size = len(samples)
+        header = self._frame_header(block_size)
+        subframe = self._encode_subframe(samples)
+
+        padding = (-len(subframe)) % 8
+        if padding:
+            subframe = np.concatenate([subframe, np.zeros(padding, dtype=np.uint8)])
+        frame = header + np.packbits(subframe).tobytes()
+        frame += struct.pack(">H", _crc16(frame))
+
+        self.frame_number += 1
+        self.total_samples += block_size
+        self.bytes_out += len(frame)
+        self.min_frame_size = len(frame) if self.min_frame_size is None else min(self.min_frame_size, len(frame))
+        self.max_frame_size = max(self.max_frame_size, len(frame))
+        return frame
+
+    def _frame_header(self, block_size: int) -> bytes:
+        block_code = _BLOCK_SIZE_CODES.get(block_size)
+        extra = b""
+        if block_code is None:
+            if block_size <= 256:
+                block_code, extra = 6, bytes([block_size - 1])
+            else:
+                block_code, extra = 7, struct.pack(">H", block_size - 1)
+        rate_code = _SAMPLE_RATE_CODES.get(self.sample_rate, 0)
+
+        header = bytes([
+            0xFF, 0xF8,                         # sync + 고정 블록 크기
+            (block_code << 4) | rate_code,
+            (0 << 4) | (4 << 1),                # 모노, 16비트
+        ])
+        header += _utf8_coded(self.frame_number) + extra
+        return header + bytes([_crc8(header)])
+
+    def _encode_subframe(self, samples: np.ndarray) -> np.ndarray:
+        # 전부 같은 값이면(디지털 무음 등) CONSTANT 서브프레임
+        if np.all(samples == samples[0]):
+            return np.concatenate([_bits(0b00000000, 8), _bits(int(samples[0]), 16)])
+
+        block_size = len(samples)
+        if block_size < 16:
+            # 너무 짧은 블록은 VERBATIM
+            return np.concatenate([_bits(0b00000010, 8)] + [_bits(int(s), 16) for s in samples])
+
+        residuals = _fixed_residuals(samples)
+        order = min(range(_MAX_FIXED_ORDER + 1), key=lambda o: int(np.abs(residuals[o]).sum()))
+
+        pieces = [_bits(0b00010000 | (order << 1), 8)]
+        pieces.extend(_bits(int(s), 16) for s in samples[:order])
+        pieces.append(_encode_residual(residuals[order], block_size, order))
+        return np.concatenate(pieces)
@@ -1,18 +1,292 @@
-import json
-import time
 import uuid
+import asyncio
+import datetime
+import functools
 import logging
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from collections import Counter
+from typing import List, Dict, Any, Callable, Awaitable, Optional, Set, Tuple
 from dataclasses import dataclass
 import os
-from pinecone import Pinecone, ServerlessSpec
+import numpy as np
+from pinecone import Pinecone
+from database import db
+from services.embedder import Embedder, PineconeEmbedder, LocalEmbedder
+from services.embedding_cache import EmbeddingCache
+from services.metrics import track_latency, EMBEDDING_BATCH_SIZE, EMBEDDING_REQUESTS, EMBEDDING_BATCHES
+from services.vector_store import VectorStore, PineconeVectorStore, LocalVectorStore, MemorySearchResult
 
 logger = logging.getLogger(__name__)
 
-@dataclass
-class MemorySearchResult:
-    score: float
-    metadata: Dict
+class EmbeddingBatcher:
+    """동시에 들어온 임베딩 요청을 짧은 시간 창 동안 모아 한 번의 multi-input embed 호출로 처리"""
+
+    def __init__(self, embed_batch: Callable[[List[str]], Awaitable[List[List[float]]]],
+                 window_ms: float = 10.0, max_batch_size: int = 32):
+        self._embed_batch = embed_batch
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        
+        # 배치 크기 통계
+        self.total_requests = 0
+        self.total_batches = 0
+        self.total_inputs = 0
+        self.max_observed_batch_size = 0
+        self.batch_size_counts: Counter = Counter()
+
+    async def embed(self, text: str) -> List[float]:
+        """텍스트 하나를 임베딩합니다. 같은 창에 들어온 요청과 함께 전송됩니다."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.total_requests += 1
+        EMBEDDING_REQUESTS.inc()
+        
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self._flush)
+        
+        return await future
+
+    def _flush(self) -> None:
+        """대기 중인 요청을 하나의 배치로 전송"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        
+        task = asyncio.create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # 같은 배치 안의 중복 텍스트는 한 번만 임베딩
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        
+        self.total_batches += 1
+        self.total_inputs += len(texts)
+        self.max_observed_batch_size = max(self.max_observed_batch_size, len(texts))
+        self.batch_size_counts[len(texts)] += 1
+        EMBEDDING_BATCHES.inc()
+        EMBEDDING_BATCH_SIZE.observe(len(texts))
+        
+        try:
+            vectors = await self._embed_batch(texts)
+        except Exception as e:
+            logger.error(f"Embedding batch failed: {e}")
+            vectors = []
+        
+        vectors_by_text = dict(zip(texts, vectors))
+        for text, future in batch:
+            if not future.done():
+                future.set_result(vectors_by_text.get(text) or [])
+
+    def stats(self) -> Dict[str, Any]:
+        """배치 크기 통계"""
+        return {
+            "requests": self.total_requests,
+            "batches": self.total_batches,
+            "inputs": self.total_inputs,
+            "avg_batch_size": self.total_inputs / self.total_batches if self.total_batches else 0.0,
+            "max_batch_size": self.max_observed_batch_size,
+            "batch_size_counts": dict(self.batch_size_counts),
+        }
+
+@dataclass(eq=False)
+class PendingMemory:
+    """업서트 대기 중인 기억"""
+    memory_id: str
+    user_id: str
+    content: str
+    metadata: Dict[str, Any]
+    embedding_task: asyncio.Task
+    attempts: int = 0
+
+class MemoryWriteBuffer:
+    """기억 저장 write-behind 버퍼
+
+    저장 요청은 즉시 memory_id로 응답하고, 업서트는 크기/타이머/명시적 flush 시점에 배치로 수행합니다.
+    업서트가 끝나기 전의 기억도 search()로 같은 사용자에게 검색됩니다 (read-your-writes).
+    임베딩에 실패했거나 max_attempts번 업서트에 실패한 기억은 dead_letter로 넘겨 보존합니다.
+    """
+
+    def __init__(self, embed: Callable[[str], Awaitable[List[float]]],
+                 upsert: Callable[[List[Dict[str, Any]]], Awaitable[bool]],
+                 dead_letter: Optional[Callable[[List[Dict[str, Any]]], Awaitable[None]]] = None,
+                 max_batch_size: int = 20, flush_interval: float = 2.0, max_attempts: int = 3):
+        self._embed = embed
+        self._upsert = upsert
+        self._dead_letter = dead_letter
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+        
+        self._pending: List[PendingMemory] = []
+        self._in_flight: List[PendingMemory] = []
+        self._flush_lock = asyncio.Lock()
+        self._timer_task: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        
+        # 통계
+        self.total_saved = 0
+        self.total_flushes = 0
+        self.total_upserted = 0
+        self.total_dropped = 0
+        self.total_dead_lettered = 0
+
+    def add(self, user_id: str, content: str, metadata: Dict[str, Any]) -> str:
+        """기억을 버퍼에 추가하고 즉시 memory_id를 반환합니다. 임베딩은 백그라운드에서 시작됩니다."""
+        memory_id = str(uuid.uuid4())
+        metadata["user_id"] = user_id
+        metadata["content"] = content
+        
+        self._pending.append(PendingMemory(
+            memory_id=memory_id,
+            user_id=user_id,
+            content=content,
+            metadata=metadata,
+            embedding_task=asyncio.create_task(self._embed(content))
+        ))
+        self.total_saved += 1
+        
+        if self._timer_task is None or self._timer_task.done():
+            self._timer_task = asyncio.create_task(self._flush_periodically())
+        if len(self._pending) >= self.max_batch_size:
+            self._spawn(self.flush())
+        
+        return memory_id
+
+    def _spawn(self, coro) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            if self._pending:
+                await self.flush()
+
+    async def flush(self, user_id: Optional[str] = None) -> None:
+        """대기 중인 기억을 배치로 업서트합니다. user_id가 있으면 해당 사용자 것만 처리합니다."""
+        async with self._flush_lock:
+            if user_id is None:
+                batch, self._pending = self._pending, []
+            else:
+                batch = [item for item in self._pending if item.user_id == user_id]
+                self._pending = [item for item in self._pending if item.user_id != user_id]
+            
+            while batch:
+                chunk, batch = batch[:self.max_batch_size], batch[self.max_batch_size:]
+                await self._flush_chunk(chunk)
+
+    async def _flush_chunk(self, chunk: List[PendingMemory]) -> None:
+        self._in_flight.extend(chunk)
+        try:
+            embeddings = await asyncio.gather(
+                *(item.embedding_task for item in chunk), return_exceptions=True
+            )
+            ready, vectors, dropped = [], [], []
+            for item, embedding in zip(chunk, embeddings):
+                if isinstance(embedding, BaseException) or not embedding:
+                    logger.error(f"Dropping memory {item.memory_id}: embedding failed")
+                    dropped.append(self._dead_letter_record(item, None, "embedding failed"))
+                    continue
+                ready.append(item)
+                vectors.append({"id": item.memory_id, "values": embedding, "metadata": item.metadata})
+            
+            if vectors:
+                self.total_flushes += 1
+                if await self._upsert(vectors):
+                    self.total_upserted += len(vectors)
+                    logger.info(f"Flushed {len(vectors)} buffered memories")
+                else:
+                    # 실패한 항목은 재시도 한도 내에서 다시 대기열로
+                    for item, vector in zip(ready, vectors):
+                        item.attempts += 1
+                        if item.attempts < self.max_attempts:
+                            self._pending.append(item)
+                        else:
+                            logger.error(f"Dropping memory {item.memory_id} after {item.attempts} failed upserts")
+                            dropped.append(self._dead_letter_record(item, vector["values"], "upsert failed"))
+            
+            if dropped:
+                await self._store_dead_letters(dropped)
+        finally:
+            self._in_flight = [item for item in self._in_flight if item not in chunk]
+
+    @staticmethod
+    def _dead_letter_record(item: PendingMemory, embedding: Optional[List[float]], error: str) -> Dict[str, Any]:
+        """재처리에 필요한 내용을 담은 dead-letter 문서"""
+        return {
+            "memory_id": item.memory_id,
+            "user_id": item.user_id,
+            "content": item.content,
+            "metadata": item.metadata,
+            "embedding": embedding,
+            "error": error,
+            "attempts": item.attempts,
+            "created_at": datetime.datetime.now(),
+        }
+
+    async def _store_dead_letters(self, records: List[Dict[str, Any]]) -> None:
+        self.total_dropped += len(records)
+        if not self._dead_letter:
+            return
+        try:
+            await self._dead_letter(records)
+            self.total_dead_lettered += len(records)
+        except Exception as e:
+            # 마지막 수단으로 내용을 로그에 남김
+            logger.error(f"Failed to store {len(records)} dead-letter memories: {e}; contents={[r['content'] for r in records]}")
+
+    async def search(self, user_id: str, query_embedding: List[float], top_k: int) -> List[MemorySearchResult]:
+        """아직 업서트되지 않은 사용자 기억을 코사인 유사도로 검색합니다."""
+        items = [item for item in self._pending + self._in_flight if item.user_id == user_id]
+        if not items or not query_embedding:
+            return []
+        
+        embeddings = await asyncio.gather(*(item.embedding_task for item in items), return_exceptions=True)
+        candidates = [
+            (item, embedding) for item, embedding in zip(items, embeddings)
+            if not isinstance(embedding, BaseException) and embedding
+        ]
+        if not candidates:
+            return []
+        
+        matrix = np.asarray([embedding for _, embedding in candidates], dtype=np.float32)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        scores = (matrix @ query) / np.maximum(np.linalg.norm(matrix, axis=1) * np.linalg.norm(query), 1e-12)
+        
+        order = np.argsort(-scores)[:top_k]
+        return [MemorySearchResult(score=float(scores[i]), metadata=candidates[i][0].metadata) for i in order]
+
+    async def close(self) -> None:
+        """타이머를 멈추고 남은 기억을 모두 업서트합니다."""
+        if self._timer_task:
+            self._timer_task.cancel()
+            self._timer_task = None
+        await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """버퍼 통계"""
+        return {
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "saved": self.total_saved,
+            "flushes": self.total_flushes,
+            "upserted": self.total_upserted,
+            "dropped": self.total_dropped,
+            "dead_lettered": self.total_dead_lettered,
+        }
 
 class MemoryService:
     def __init__(self):
@@ -27,44 +301,97 @@ class MemoryService:
         # Pinecone 임베딩 모델 설정 (multilingual-e5-large 사용)
         self.embedding_model = os.getenv("EMBEDDING_MODEL", "multilingual-e5-large")
         
+        # 임베딩 캐시 (LRU + 선택적 디스크 캐시)
+        self.embedding_cache = EmbeddingCache(
+            max_size=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+            ttl_seconds=float(os.getenv("EMBEDDING_CACHE_TTL", "86400")),
+            disk_path=os.getenv("EMBEDDING_CACHE_PATH") or None
+        )
+        
+        # 비동기 API 설정 (이벤트 루프 밖의 스레드 풀에서 Pinecone 호출 실행)
+        self.max_concurrency = int(os.getenv("MEMORY_MAX_CONCURRENCY", "8"))
+        self.call_timeout = float(os.getenv("MEMORY_CALL_TIMEOUT", "5.0"))
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency,
+            thread_name_prefix="memory-service"
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._background_tasks: Set[asyncio.Task] = set()  # 기다리지 않는 디스크 캐시 기록
+        
+        # 세션 간 임베딩 요청 마이크로 배칭
+        self.embedding_batcher = EmbeddingBatcher(
+            self._embed_batch_async,
+            window_ms=float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "10")),
+            max_batch_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+        )
+        
+        # 기억 저장 write-behind 버퍼 (배치 업서트)
+        self.write_behind = os.getenv("MEMORY_WRITE_BEHIND", "true").lower() == "true"
+        self.write_buffer = MemoryWriteBuffer(
+            self.get_embedding_async,
+            self._upsert_vectors_async,
+            dead_letter=self._store_dead_letters,
+            max_batch_size=int(os.getenv("MEMORY_WRITE_BATCH_SIZE", "20")),
+            flush_interval=float(os.getenv("MEMORY_WRITE_FLUSH_INTERVAL", "2.0"))
+        )
+        
         # Pinecone 클라이언트 초기화
         if self.pinecone_api_key:
             self.pinecone = Pinecone(api_key=self.pinecone_api_key)
         else:
-            logger.warning("PINECONE_API_KEY not found. Memory functions will be disabled.")
+            logger.warning("PINECONE_API_KEY not found. Pinecone backends will be disabled.")
             self.pinecone = None
+        
+        # 벡터 저장소 백엔드 (pinecone 또는 local)
+        self.vector_store_backend = os.getenv("VECTOR_STORE_BACKEND", "pinecone")
+        self.vector_store = self._create_vector_store()
+        
+        # 임베딩 백엔드 (pinecone 또는 local)
+        self.embedding_backend = os.getenv("EMBEDDING_BACKEND", "pinecone")
+        self.embedder = self._create_embedder()
 
-    def get_embedding(self, text: str) -> List[float]:
-        """주어진 텍스트를 Pinecone inference API를 사용하여 임베딩합니다."""
+    def _create_embedder(self) -> Optional[Embedder]:
+        """설정에 따라 임베딩 백엔드를 생성합니다."""
+        if self.embedding_backend == "local":
+            logger.info(f"Using local n-gram hashing embedder ({self.dimension} dims)")
+            return LocalEmbedder(self.dimension)
+        
+        if self.embedding_backend != "pinecone":
+            logger.warning(f"Unknown EMBEDDING_BACKEND '{self.embedding_backend}', using pinecone")
+        if not self.pinecone:
+            return None
+        return PineconeEmbedder(self.pinecone, self.embedding_model)
+
+    def _create_vector_store(self) -> Optional[VectorStore]:
+        """설정에 따라 벡터 저장소 백엔드를 생성합니다."""
+        if self.vector_store_backend == "local":
+            path = os.getenv("LOCAL_VECTOR_STORE_PATH", "/app/data/vector_store")
+            logger.info(f"Using local vector store: {path}")
+            return LocalVectorStore(path, self.dimension)
+        
+        if self.vector_store_backend != "pinecone":
+            logger.warning(f"Unknown VECTOR_STORE_BACKEND '{self.vector_store_backend}', using pinecone")
         if not self.pinecone:
-            logger.warning("Pinecone client not initialized")
+            return None
+        return PineconeVectorStore(
+            self.pinecone, self.index_name, self.dimension, self.metric, self.cloud, self.region
+        )
+
+    def get_embedding(self, text: str) -> List[float]:
+        """주어진 텍스트를 설정된 임베딩 백엔드로 임베딩합니다."""
+        if not self.embedder:
+            logger.warning("Embedder not initialized")
             return []
+        
+        cached = self.embedding_cache.get(self.embedder.model, text)
+        if cached is not None:
+            return cached
             
         try:
-            # Pinecone inference API 사용
-            result = self.pinecone.inference.embed(
-                model=self.embedding_model,
-                inputs=[text],
-                parameters={"input_type": "query", "truncate": "END"}
-            )
-            
-            # EmbeddingsList 객체 처리
-            if hasattr(result, '__iter__') and len(result) > 0:
-                first_embedding = result[0]
-                
-                # DenseEmbedding 객체에서 값 추출
-                if hasattr(first_embedding, 'to_dict'):
-                    embedding_dict = first_embedding.to_dict()
-                    if 'values' in embedding_dict:
-                        return embedding_dict['values']
-                    elif 'embedding' in embedding_dict:
-                        return embedding_dict['embedding']
-                
-                # 직접 속성 접근 시도
-                if hasattr(first_embedding, 'values'):
-                    return first_embedding.values
-                elif hasattr(first_embedding, 'embedding'):
-                    return first_embedding.embedding
+            values = self._embed_texts([text])[0]
+            if values:
+                self.embedding_cache.put(self.embedder.model, text, values)
+                return values
             
             logger.debug("No embeddings found in result")
             return []
@@ -72,103 +399,91 @@ class MemoryService:
             logger.error(f"Error generating embedding: {e}")
             return []
 
+    def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """여러 텍스트를 한 번의 임베딩 호출로 처리합니다. 입력 순서대로 반환합니다."""
+        return self.embedder.embed(texts)
+
     def setup_pinecone(self) -> None:
-        """Pinecone 인덱스를 확인하고, 없으면 생성합니다."""
-        if not self.pinecone:
+        """벡터 저장소 인덱스를 확인하고, 없으면 생성합니다."""
+        if not self.vector_store:
             return
             
         try:
-            if self.index_name not in self.pinecone.list_indexes().names():
-                logger.info(f"Creating Pinecone index: {self.index_name}")
-                self.pinecone.create_index(
-                    name=self.index_name,
-                    dimension=self.dimension,
-                    metric=self.metric,
-                    spec=ServerlessSpec(
-                        cloud=self.cloud,
-                        region=self.region
-                    )
-                )
-                time.sleep(2)
-                logger.info("Index created successfully.")
-            else:
-                logger.info(f"Pinecone index '{self.index_name}' already exists.")
+            self.vector_store.setup()
         except Exception as e:
-            logger.error(f"Error setting up Pinecone: {e}")
+            logger.error(f"Error setting up vector store: {e}")
+
+    def warm_up(self) -> None:
+        """벡터 저장소 연결을 미리 엽니다."""
+        if self.vector_store:
+            self.vector_store.warm_up()
 
     def retrieve_memories(self, query: str, top_k: int = 3, user_id: str = None) -> List[MemorySearchResult]:
         """주어진 쿼리와 가장 유사한 기억을 Pinecone에서 검색합니다."""
         logger.debug(f"retrieve_memories called with query='{query}', user_id='{user_id}'")
         
-        if not self.pinecone:
-            logger.debug("Pinecone client not initialized")
+        if not self.embedder or not self.vector_store:
+            logger.debug("Embedder or vector store not initialized")
             return []
             
-        try:
-            index = self.pinecone.Index(self.index_name)
-            logger.debug(f"Getting embedding for query: '{query}'")
-            query_embedding = self.get_embedding(query)
-            
-            if not query_embedding:
-                logger.debug("Failed to get embedding")
-                return []
-                
-            logger.debug(f"Got embedding with length: {len(query_embedding)}")
-
-            if user_id:
-                logger.debug(f"Searching with user_id filter: {user_id}")
-                results = index.query(
-                    vector=query_embedding,
-                    top_k=top_k,
-                    include_metadata=True,
-                    filter={"user_id": {"$eq": user_id}}
-                )
-            else:
-                logger.debug("Searching without user_id filter")
-                results = index.query(
-                    vector=query_embedding,
-                    top_k=top_k,
-                    include_metadata=True
-                )
-
-            logger.debug(f"Pinecone query returned: {results}")
+        logger.debug(f"Getting embedding for query: '{query}'")
+        query_embedding = self.get_embedding(query)
+        
+        if not query_embedding:
+            logger.debug("Failed to get embedding")
+            return []
             
-            retrieved_memories = []
-            if results.get("matches"):
-                logger.debug(f"Found {len(results['matches'])} matches")
-                for match in results["matches"]:
-                    retrieved_memories.append(MemorySearchResult(
-                        score=match.get("score", 0.0),
-                        metadata=match.get("metadata", {})
-                    ))
-            else:
-                logger.debug("No matches found in Pinecone results")
+        return self._query_index(query_embedding, top_k, user_id)
 
-            return retrieved_memories
+    def _query_index(self, query_embedding: List[float], top_k: int, user_id: str = None) -> List[MemorySearchResult]:
+        """임베딩 벡터로 벡터 저장소를 검색합니다."""
+        try:
+            logger.debug(f"Got embedding with length: {len(query_embedding)}")
+            with track_latency(self.vector_store_backend, "query"):
+                return self.vector_store.query(query_embedding, top_k, user_id)
         except Exception as e:
             logger.error(f"Error retrieving memories: {e}")
             import traceback
             traceback.print_exc()
             return []
 
+    def fetch_user_memories(self, user_id: str, limit: int = 1000) -> Optional[List[Tuple[str, List[float], Dict]]]:
+        """사용자의 기억 (id, 벡터, 메타데이터)를 최대 limit개까지 가져옵니다. 실패하면 None.
+
+        사용자의 기억이 limit개보다 많으면 일부만 반환될 수 있으므로 (VectorStore.fetch_user_vectors 참고)
+        호출자는 limit을 필요한 개수보다 하나 크게 요청해 잘림을 감지해야 합니다.
+        """
+        if not self.vector_store:
+            return None
+            
+        try:
+            with track_latency(self.vector_store_backend, "fetch"):
+                return self.vector_store.fetch_user_vectors(user_id, limit)
+        except Exception as e:
+            logger.error(f"Error fetching memories for user {user_id}: {e}")
+            return None
+
     def add_memory(self, user_id: str, content: str, metadata: Dict[str, Any]) -> str:
-        """새로운 기억을 Pinecone에 추가합니다."""
-        if not self.pinecone:
+        """새로운 기억을 벡터 저장소에 추가합니다."""
+        if not self.embedder or not self.vector_store:
             return ""
             
+        # 임베딩 생성
+        embedding = self.get_embedding(content)
+        if not embedding:
+            return ""
+        
+        return self._upsert_memory(user_id, content, metadata, embedding)
+
+    def _upsert_memory(self, user_id: str, content: str, metadata: Dict[str, Any], embedding: List[float]) -> str:
+        """임베딩된 기억을 벡터 저장소에 업서트합니다."""
         try:
-            index = self.pinecone.Index(self.index_name)
             memory_id = str(uuid.uuid4())
             
             # 메타데이터에 user_id와 content 추가
             metadata["user_id"] = user_id
             metadata["content"] = content
             
-            # 임베딩 생성
-            embedding = self.get_embedding(content)
-            if not embedding:
-                return ""
-            
             # 벡터 생성
             vector = {
                 "id": memory_id,
@@ -176,8 +491,8 @@ class MemoryService:
                 "metadata": metadata
             }
             
-            # Pinecone에 업서트
-            index.upsert(vectors=[vector])
+            # 벡터 저장소에 업서트
+            self.vector_store.upsert([vector])
             logger.info(f"Memory added for user {user_id}: {memory_id}")
             
             return memory_id
@@ -185,5 +500,156 @@ class MemoryService:
             logger.error(f"Error adding memory: {e}")
             return ""
 
+    def _upsert_vectors(self, vectors: List[Dict[str, Any]]) -> bool:
+        """여러 벡터를 한 번의 요청으로 업서트합니다."""
+        try:
+            with track_latency(self.vector_store_backend, "upsert"):
+                self.vector_store.upsert(vectors)
+            return True
+        except Exception as e:
+            logger.error(f"Error upserting {len(vectors)} memories: {e}")
+            return False
+
+    async def _run_blocking(self, operation: str, func: Callable, *args, default=None):
+        """블로킹 호출을 스레드 풀에서 실행합니다. 동시 실행 수를 제한하고 타임아웃을 적용합니다.
+
+        타임아웃은 기다리기만 멈추고 스레드는 끝까지 실행되므로, 세마포어 자리는 스레드가 실제로 끝날 때
+        반납합니다. 시간 초과된 호출이 쌓여도 스레드 풀에 max_concurrency개보다 많은 작업이 밀려들지 않고,
+        자리가 없으면 새 호출은 기다리다 타임아웃으로 기본값을 반환합니다.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.call_timeout
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.call_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"{operation} timed out after {self.call_timeout}s waiting for a worker")
+            return default
+
+        future = loop.run_in_executor(self._executor, functools.partial(func, *args))
+        future.add_done_callback(self._release_worker)
+        try:
+            # shield: 타임아웃으로 future가 취소되면 스레드가 끝나기 전에 자리가 반납되므로
+            return await asyncio.wait_for(asyncio.shield(future), timeout=max(0.0, deadline - loop.time()))
+        except asyncio.TimeoutError:
+            logger.error(f"{operation} timed out after {self.call_timeout}s")
+            return default
+        except Exception as e:
+            logger.error(f"{operation} failed: {e}")
+            return default
+
+    def _release_worker(self, future: asyncio.Future) -> None:
+        """스레드가 끝나면 세마포어 자리 반납 (기다리던 호출이 타임아웃으로 떠났어도 예외는 여기서 수거)"""
+        self._semaphore.release()
+        if not future.cancelled():
+            future.exception()
+
+    async def get_embedding_async(self, text: str) -> List[float]:
+        """get_embedding의 비동기 버전. 캐시 미스는 배처를 통해 다른 요청과 묶어서 임베딩합니다."""
+        if not self.embedder:
+            logger.warning("Embedder not initialized")
+            return []
+        
+        # LRU 조회는 이벤트 루프에서, sqlite 디스크 캐시는 스레드 풀에서
+        cached = self.embedding_cache.get_memory(self.embedder.model, text)
+        if cached is None and self.embedding_cache.has_disk:
+            cached = await self._run_blocking(
+                "embedding_cache_read", self.embedding_cache.get_disk, self.embedder.model, text
+            )
+        if cached is not None:
+            return cached
+        
+        try:
+            values = await asyncio.wait_for(self.embedding_batcher.embed(text), timeout=self.call_timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"get_embedding timed out after {self.call_timeout}s")
+            return []
+        
+        if values:
+            self.embedding_cache.put_memory(self.embedder.model, text, values)
+            if self.embedding_cache.has_disk:
+                # 디스크 기록은 기다리지 않음 (put_disk는 오류를 직접 로그로 남김)
+                task = asyncio.create_task(self._run_blocking(
+                    "embedding_cache_write", self.embedding_cache.put_disk, self.embedder.model, text, values
+                ))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+        return values
+
+    async def _embed_batch_async(self, texts: List[str]) -> List[List[float]]:
+        """배처가 모은 텍스트를 스레드 풀에서 한 번에 임베딩합니다."""
+        return await self._run_blocking("embed_batch", self._embed_texts, texts, default=[])
+
+    async def retrieve_memories_async(self, query: str, top_k: int = 3, user_id: str = None) -> List[MemorySearchResult]:
+        """retrieve_memories의 비동기 버전 (이벤트 루프를 막지 않음)"""
+        if not self.embedder or not self.vector_store:
+            logger.debug("Embedder or vector store not initialized")
+            return []
+        
+        query_embedding = await self.get_embedding_async(query)
+        if not query_embedding:
+            logger.debug("Failed to get embedding")
+            return []
+        
+        memories = await self._run_blocking(
+            "query_index", self._query_index, query_embedding, top_k, user_id, default=[]
+        )
+        
+        # 아직 업서트되지 않은 기억도 함께 검색 (read-your-writes)
+        if user_id:
+            buffered = await self.write_buffer.search(user_id, query_embedding, top_k)
+            if buffered:
+                contents = {memory.metadata.get("content") for memory in buffered}
+                memories = buffered + [m for m in memories if m.metadata.get("content") not in contents]
+                memories = sorted(memories, key=lambda m: m.score, reverse=True)[:top_k]
+        
+        return memories
+
+    async def fetch_user_memories_async(self, user_id: str, limit: int = 1000) -> Optional[List[Tuple[str, List[float], Dict]]]:
+        """fetch_user_memories의 비동기 버전 (이벤트 루프를 막지 않음)"""
+        return await self._run_blocking(
+            "fetch_user_memories", self.fetch_user_memories, user_id, limit, default=None
+        )
+
+    async def add_memory_async(self, user_id: str, content: str, metadata: Dict[str, Any]) -> str:
+        """add_memory의 비동기 버전 (이벤트 루프를 막지 않음)"""
+        if not self.embedder or not self.vector_store:
+            return ""
+        
+        if self.write_behind:
+            # 즉시 응답하고 업서트는 배치로 처리
+            return self.write_buffer.add(user_id, content, metadata)
+        
+        embedding = await self.get_embedding_async(content)
+        if not embedding:
+            return ""
+        
+        return await self._run_blocking(
+            "upsert_memory", self._upsert_memory, user_id, content, metadata, embedding, default=""
+        )
+
+    async def _upsert_vectors_async(self, vectors: List[Dict[str, Any]]) -> bool:
+        """_upsert_vectors의 비동기 버전 (이벤트 루프를 막지 않음)"""
+        return await self._run_blocking("upsert_vectors", self._upsert_vectors, vectors, default=False)
+
+    async def _store_dead_letters(self, records: List[Dict[str, Any]]) -> None:
+        """업서트하지 못한 기억을 MongoDB dead-letter 컬렉션에 보존합니다 (임베딩이 있으면 함께 저장)."""
+        await db.memory_dead_letters.insert_many(records)
+        logger.warning(f"Stored {len(records)} memories in memory_dead_letters")
+
+    async def flush_pending_memories(self, user_id: Optional[str] = None) -> None:
+        """write-behind 버퍼에 남은 기억을 업서트합니다."""
+        await self.write_buffer.flush(user_id)
+
+    async def close(self) -> None:
+        """남은 기억을 업서트하고 리소스를 정리합니다."""
+        await self.write_buffer.close()
+        logger.info(f"Memory write buffer stats: {self.write_buffer.stats()}")
+        logger.info(f"Embedding batch stats: {self.embedding_batcher.stats()}")
+        logger.info(f"Embedding cache stats: {self.embedding_cache.stats()}")
+        self._executor.shutdown(wait=False)
+        self.embedding_cache.close()
+        if self.vector_store:
+            self.vector_store.close()
+
 # 전역 인스턴스 생성
 memory_service = MemoryService()
\ No newline at end of file
@@ -0,0 +1,127 @@
+import logging
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+import numpy as np
+
+from services.memory_service import memory_service, MemorySearchResult
+
+logger = logging.getLogger(__name__)
+
+class MemoryWorkingSet:
+    """세션별 사용자 기억 작업 집합 (NumPy 행렬 기반 로컬 코사인 유사도 검색)
+
+    세션 시작 시 사용자의 기억 벡터를 한 번 불러와 정규화된 float32 행렬로 보관합니다.
+    기억이 max_size개를 넘거나 (이때 Pinecone 질의 결과는 일부만 담기므로) 불러오기에 실패하면
+    ready가 False로 유지되어 Pinecone 검색으로 대체됩니다.
+    불러오는 중에 저장된 기억은 보류했다가 로드가 끝난 뒤 반영합니다.
+    """
+
+    def __init__(self, user_id: str, max_size: int = 1000):
+        self.user_id = user_id
+        self.max_size = max_size
+        self.ready = False
+
+        self._matrix: Optional[np.ndarray] = None  # (capacity, dimension), 행 단위 L2 정규화
+        self._count = 0
+        self._metadata: List[Dict[str, Any]] = []
+        self._ids: Set[str] = set()
+
+        # 로드 중 저장된 기억 (memory_id, embedding, metadata)
+        self._loading = False
+        self._pending_adds: List[Tuple[str, List[float], Dict[str, Any]]] = []
+
+    @property
+    def size(self) -> int:
+        return self._count
+
+    @property
+    def loading(self) -> bool:
+        return self._loading
+
+    async def load(self) -> bool:
+        """사용자의 기억 벡터를 불러와 행렬을 구성합니다."""
+        self._loading = True
+        try:
+            # 하나 더 요청해 max_size를 넘는지 (결과가 잘렸는지) 확인
+            records = await memory_service.fetch_user_memories_async(self.user_id, limit=self.max_size + 1)
+        finally:
+            self._loading = False
+        pending, self._pending_adds = self._pending_adds, []
+
+        if records is None:
+            logger.warning(f"Memory working set load failed for user {self.user_id}; falling back to Pinecone")
+            return False
+
+        if len(records) > self.max_size:
+            logger.info(f"Memory working set too large for user {self.user_id} (> {self.max_size}); falling back to Pinecone")
+            return False
+
+        if records:
+            vectors = np.asarray([values for _, values, _ in records], dtype=np.float32)
+            self._matrix = self._normalize(vectors)
+            self._metadata = [metadata for _, _, metadata in records]
+            self._ids = {memory_id for memory_id, _, _ in records}
+            self._count = len(records)
+
+        self.ready = True
+
+        # 로드 중 저장된 기억 반영 (질의 결과에 이미 포함된 것은 건너뜀)
+        for memory_id, embedding, metadata in pending:
+            self.add(embedding, metadata, memory_id)
+
+        logger.info(f"Memory working set loaded for user {self.user_id}: {self._count} memories")
+        return True
+
+    def search(self, query_embedding: List[float], top_k: int = 3) -> List[MemorySearchResult]:
+        """코사인 유사도 기준 상위 top_k 기억을 반환합니다."""
+        if self._count == 0 or top_k <= 0:
+            return []
+
+        query = self._normalize(np.asarray(query_embedding, dtype=np.float32)[np.newaxis, :])[0]
+        scores = self._matrix[:self._count] @ query
+
+        k = min(top_k, self._count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            MemorySearchResult(score=float(scores[i]), metadata=self._metadata[i])
+            for i in top
+        ]
+
+    def add(self, embedding: List[float], metadata: Dict[str, Any], memory_id: str = "") -> None:
+        """새로 저장된 기억을 작업 집합에 반영합니다."""
+        if not embedding:
+            return
+
+        if self._loading:
+            self._pending_adds.append((memory_id, embedding, metadata))
+            return
+
+        if not self.ready or (memory_id and memory_id in self._ids):
+            return
+
+        if self._count >= self.max_size:
+            logger.info(f"Memory working set exceeded {self.max_size} memories; falling back to Pinecone")
+            self.ready = False
+            return
+
+        row = self._normalize(np.asarray(embedding, dtype=np.float32)[np.newaxis, :])
+        if self._matrix is None:
+            self._matrix = np.empty((16, row.shape[1]), dtype=np.float32)
+        elif self._count == self._matrix.shape[0]:
+            # 용량을 두 배로 늘려 추가 비용을 상각
+            grown = np.empty((self._matrix.shape[0] * 2, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._count] = self._matrix[:self._count]
+            self._matrix = grown
+
+        self._matrix[self._count] = row[0]
+        self._metadata.append(metadata)
+        if memory_id:
+            self._ids.add(memory_id)
+        self._count += 1
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
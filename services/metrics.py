@@ -0,0 +1,125 @@
+import time
+import logging
+import weakref
+from contextlib import contextmanager
+
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client.core import GaugeMetricFamily, REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# 레이블 값은 모두 코드에 고정된 작은 집합만 사용 (사용자/세션별 레이블 금지)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SESSION_BUCKETS = (10, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+DELIVERY_BUCKETS = (0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0, 21600.0)
+
+SESSIONS_TOTAL = Counter("voice_sessions_total", "시작된 실시간 세션 수")
+SESSIONS_ACTIVE = Gauge("voice_sessions_active", "진행 중인 실시간 세션 수")
+SESSION_DURATION = Histogram("voice_session_duration_seconds", "세션 길이", buckets=SESSION_BUCKETS)
+
+# direction: client_in(마이크 수신) | to_gemini | vad_suppressed | from_gemini | to_client
+AUDIO_CHUNKS = Counter("voice_audio_chunks_total", "오디오 청크 수", ["direction"])
+AUDIO_BYTES = Counter("voice_audio_bytes_total", "오디오 바이트 수", ["direction"])
+AUDIO_DROPPED = Counter("voice_audio_dropped_total", "큐 정책으로 버린 오디오 청크 수", ["queue"])
+
+# service: pinecone | local | gcs | disk | mongo | analysis | gemini
+# operation 예: embed, query, upsert, fetch, write, finalize, compose, upload, insert, post, post_batch, resume
+EXTERNAL_CALL_SECONDS = Histogram(
+    "voice_external_call_seconds", "외부 서비스 호출 지연",
+    ["service", "operation", "outcome"], buckets=LATENCY_BUCKETS
+)
+
+KNOWN_TOOLS = ("search_memories", "save_new_memory")
+TOOL_CALL_SECONDS = Histogram(
+    "voice_tool_call_seconds", "도구 호출 처리 시간", ["function", "outcome"], buckets=LATENCY_BUCKETS
+)
+
+# 세션 간 임베딩 마이크로 배칭: 배치당 (중복 제거 후) 입력 수
+EMBEDDING_BATCH_SIZE = Histogram(
+    "voice_embedding_batch_size", "임베딩 배치당 입력 수", buckets=(1, 2, 4, 8, 16, 32, 64)
+)
+EMBEDDING_REQUESTS = Counter("voice_embedding_requests_total", "배처로 들어온 임베딩 요청 수")
+EMBEDDING_BATCHES = Counter("voice_embedding_batches_total", "임베딩 배치 호출 수")
+
+# 사용자 발화 끝(마지막 입력 전사)부터 첫 AI 오디오까지, 턴 안의 도구 호출 처리 시간 합계
+TURN_TTFA_SECONDS = Histogram("voice_turn_ttfa_seconds", "턴별 첫 오디오까지의 지연", buckets=LATENCY_BUCKETS)
+TURN_TOOL_SECONDS = Histogram("voice_turn_tool_seconds", "턴별 도구 호출 처리 시간", buckets=LATENCY_BUCKETS)
+
+# 분석 서버 아웃박스: status는 pending | dead, outcome은 delivered | retry | dead
+ANALYSIS_OUTBOX_JOBS = Gauge("voice_analysis_outbox_jobs", "분석 서버 전송 아웃박스 작업 수", ["status"])
+ANALYSIS_OUTBOX_RESULTS = Counter("voice_analysis_outbox_results_total", "분석 서버 전송 시도 결과", ["outcome"])
+ANALYSIS_DELIVERY_SECONDS = Histogram(
+    "voice_analysis_delivery_seconds", "대기열 추가부터 분석 서버 전송 완료까지", buckets=DELIVERY_BUCKETS
+)
+
+# kind: audio | text
+WS_SEND_SECONDS = Histogram("voice_ws_send_seconds", "클라이언트 WebSocket 전송 지연", ["kind"], buckets=LATENCY_BUCKETS)
+
+@contextmanager
+def track_latency(service: str, operation: str):
+    """with 블록의 실행 시간을 외부 호출 지연으로 기록 (예외가 나면 outcome=error)"""
+    started_at = time.perf_counter()
+    outcome = "success"
+    try:
+        yield
+    except BaseException:
+        outcome = "error"
+        raise
+    finally:
+        EXTERNAL_CALL_SECONDS.labels(service, operation, outcome).observe(time.perf_counter() - started_at)
+
+def observe_tool_call(function_name: str, seconds: float, outcome: str = "success"):
+    function = function_name if function_name in KNOWN_TOOLS else "other"
+    TOOL_CALL_SECONDS.labels(function, outcome).observe(seconds)
+
+def count_audio(direction: str, data: bytes):
+    AUDIO_CHUNKS.labels(direction).inc()
+    AUDIO_BYTES.labels(direction).inc(len(data))
+
+# --- 세션별 큐 깊이 (스크레이프 시점에 진행 중인 세션들을 모아 합계/최댓값으로 노출) ---
+
+_live_sessions = weakref.WeakSet()
+
+def session_started(session_manager):
+    SESSIONS_TOTAL.inc()
+    SESSIONS_ACTIVE.inc()
+    _live_sessions.add(session_manager)
+
+def session_finished(session_manager, duration_seconds: float):
+    SESSIONS_ACTIVE.dec()
+    SESSION_DURATION.observe(duration_seconds)
+    _live_sessions.discard(session_manager)
+
+class _SessionQueueCollector:
+    """진행 중인 세션의 큐 깊이와 지연을 큐 종류별로 집계"""
+
+    def collect(self):
+        depth = GaugeMetricFamily("voice_queue_depth", "큐 깊이 (진행 중인 세션 합계)", labels=["queue"])
+        max_depth = GaugeMetricFamily("voice_queue_depth_max", "세션 중 가장 깊은 큐 깊이", labels=["queue"])
+        max_lag = GaugeMetricFamily("voice_queue_lag_max_seconds", "세션 중 가장 오래 기다린 항목의 대기 시간", labels=["queue"])
+
+        queues = {"audio_in": [], "outbound": [], "recording": []}
+        for session in list(_live_sessions):
+            try:
+                queues["audio_in"].append((session.audio_queue.qsize(), session.audio_queue.lag))
+                queues["outbound"].append((session.outbound.queue_depth, session.outbound.lag))
+                recorder = session.audio_recorder
+                if recorder is not None:
+                    queues["recording"].append((recorder.writer.queue_depth, 0.0))
+            except Exception as e:
+                logger.debug(f"세션 큐 지표 수집 실패: {e}")
+
+        for name, values in queues.items():
+            depth.add_metric([name], sum(d for d, _ in values))
+            max_depth.add_metric([name], max((d for d, _ in values), default=0))
+            max_lag.add_metric([name], max((lag for _, lag in values), default=0.0))
+        yield depth
+        yield max_depth
+        yield max_lag
+
+REGISTRY.register(_SessionQueueCollector())
+
+def render_latest():
+    """Prometheus 텍스트 형식의 현재 지표와 Content-Type"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
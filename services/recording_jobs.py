@@ -0,0 +1,242 @@
+import uuid
+import asyncio
+import datetime
+import logging
+from typing import Optional, Dict, Any, Set
+
+from pymongo import ReturnDocument
+
+from database import db
+from services.audio_service import audio_service, compose_wav_from_pcm, compose_flac_from_frames, StreamingAudioRecorder
+from services.analysis_outbox import analysis_outbox
+from settings import (
+    INSTANCE_ID, RECORDING_JOB_MAX_ATTEMPTS, RECORDING_JOB_RETRY_BASE_DELAY,
+    RECORDING_JOB_POLL_INTERVAL, RECORDING_JOB_LEASE_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+class JobStatus:
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    DEAD = "dead"
+
+class RecordingJobQueue:
+    """녹음 마무리 작업을 백그라운드에서 처리하는 작업 큐
+
+    작업은 MongoDB 컬렉션에 저장되어 재시작 후에도 이어서 처리되고, 실패하면 지수 백오프로 재시도합니다.
+    대화 기록 문서의 audio_recording_url을 갱신한 뒤에야 작업을 완료로 기록하고, 녹음 결과가 정해진 뒤
+    (URL 반영, 녹음 없음, 재시도 중단)에 대화 기록을 분석 서버 전송 대기열에 넣어 분석 서버가 항상
+    최종 문서를 받게 합니다.
+    작업을 꺼낸 프로세스는 owner와 lease_until을 기록하고 실행하는 동안 점유를 연장하므로, 여러 인스턴스가
+    같은 컬렉션을 써도 점유가 만료된 작업만 다시 대기열로 돌아갑니다.
+    """
+
+    def __init__(self, owner: str, max_attempts: int = 5, retry_base_delay: float = 5.0,
+                 poll_interval: float = 10.0, lease_seconds: float = 300.0):
+        self.collection = None
+        self.owner = owner
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+
+        self._worker: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self, collection):
+        """작업 워커 시작 (점유가 만료된 running 작업은 다시 대기 상태로)"""
+        if self._worker is not None:
+            return
+        self.collection = collection
+        await self._requeue_expired()
+        self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """진행 중인 세션 마무리를 기다린 뒤 워커 중단 (남은 작업은 다음 시작 시 처리)"""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+        if self._worker:
+            self._worker.cancel()
+            self._worker = None
+
+    def finalize_in_background(self, recorder, session_id: str):
+        """세션 녹음 마무리를 백그라운드로 넘기고 즉시 반환"""
+        task = asyncio.create_task(self._finalize(recorder, session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _finalize(self, recorder, session_id: str):
+        send_now = True  # compose 작업으로 넘기면 작업이 끝난 뒤 전송
+        try:
+            if isinstance(recorder, StreamingAudioRecorder):
+                # 스트림 닫기는 이 프로세스에서만 가능, 이후 compose는 저장된 작업으로 처리
+                if not await recorder.close_stream():
+                    return
+                kind, params = recorder.compose_job()
+                await self.enqueue(kind, session_id, params)
+                send_now = False
+            else:
+                audio_url = await recorder.finalize_recording()
+                if audio_url:
+                    await self._patch_transcript(session_id, audio_url, recorder.codec)
+        except Exception as e:
+            logger.error(f"녹음 마무리 중 오류 (세션 {session_id}): {e}")
+        finally:
+            recorder.cleanup()
+            if send_now:
+                await self._send_for_analysis(session_id)
+
+    async def _send_for_analysis(self, session_id: str):
+        """녹음 결과가 반영된 대화 기록을 분석 서버 전송 대기열에 추가"""
+        try:
+            await analysis_outbox.enqueue_transcript(db.transcripts, session_id)
+        except Exception as e:
+            logger.error(f"분석 서버 전송 대기열 추가 실패 (세션 {session_id}): {e}")
+
+    async def enqueue(self, kind: str, session_id: str, params: Dict[str, Any]):
+        """작업을 저장하고 워커를 깨움"""
+        now = datetime.datetime.now()
+        await self.collection.insert_one({
+            "_id": str(uuid.uuid4()),
+            "kind": kind,
+            "session_id": session_id,
+            "params": params,
+            "status": JobStatus.PENDING,
+            "attempts": 0,
+            "next_attempt_at": now,
+            "created_at": now,
+            "last_error": None,
+        })
+        self._wakeup.set()
+
+    async def _requeue_expired(self):
+        """점유가 만료된 작업(점유한 프로세스가 죽은 작업)을 다시 대기 상태로"""
+        result = await self.collection.update_many(
+            {"status": JobStatus.RUNNING,
+             "$or": [{"lease_until": {"$lte": datetime.datetime.now()}}, {"lease_until": None}]},
+            {"$set": {"status": JobStatus.PENDING}, "$unset": {"owner": "", "lease_until": ""}}
+        )
+        if result.modified_count:
+            logger.info(f"점유가 만료된 녹음 작업 {result.modified_count}개를 다시 대기열에 추가")
+
+    async def _run(self):
+        while True:
+            try:
+                await self._requeue_expired()
+                while await self._run_next():
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"녹음 작업 큐 오류: {e}")
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run_next(self) -> bool:
+        """실행 시각이 된 작업 하나를 가져와 처리. 처리한 작업이 있으면 True."""
+        now = datetime.datetime.now()
+        job = await self.collection.find_one_and_update(
+            {"status": JobStatus.PENDING, "next_attempt_at": {"$lte": now}},
+            {"$set": {"status": JobStatus.RUNNING, "owner": self.owner,
+                      "lease_until": now + datetime.timedelta(seconds=self.lease_seconds)},
+             "$inc": {"attempts": 1}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER
+        )
+        if job is None:
+            return False
+
+        try:
+            heartbeat = asyncio.create_task(self._extend_lease(job))
+            try:
+                audio_url = await self._execute(job)
+                # URL 반영이 실패하면 작업을 완료로 기록하지 않고 재시도 (compose는 다시 실행해도 안전)
+                if audio_url:
+                    await self._patch_transcript(job["session_id"], audio_url, job["params"].get("codec", "pcm_s16le"))
+            finally:
+                heartbeat.cancel()
+            if not await self._release(job, {"status": JobStatus.DONE, "completed_at": datetime.datetime.now()}):
+                logger.warning(f"점유가 만료된 뒤 끝난 녹음 작업: {job['_id']} (다른 인스턴스가 다시 처리할 수 있음)")
+                return True
+            await self._send_for_analysis(job["session_id"])
+        except Exception as e:
+            attempts = job["attempts"]
+            if attempts >= self.max_attempts:
+                logger.error(f"녹음 작업 실패, 재시도 중단 ({attempts}회): {job['_id']} - {e}")
+                if await self._release(job, {"status": JobStatus.DEAD, "last_error": str(e)}):
+                    await self._send_for_analysis(job["session_id"])  # 음성 파일 없이 전송
+                return True
+            
+            delay = self.retry_base_delay * (2 ** (attempts - 1))
+            logger.warning(f"녹음 작업 실패 ({attempts}/{self.max_attempts}), {delay:.0f}초 후 재시도: {e}")
+            await self._release(job, {
+                "status": JobStatus.PENDING,
+                "last_error": str(e),
+                "next_attempt_at": datetime.datetime.now() + datetime.timedelta(seconds=delay),
+            })
+        return True
+
+    async def _extend_lease(self, job: Dict[str, Any]):
+        """실행 중인 작업의 점유를 lease_seconds의 1/3마다 연장"""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            try:
+                result = await self.collection.update_one(
+                    {"_id": job["_id"], "owner": self.owner, "status": JobStatus.RUNNING},
+                    {"$set": {"lease_until": datetime.datetime.now() + datetime.timedelta(seconds=self.lease_seconds)}}
+                )
+                if not result.matched_count:
+                    logger.warning(f"녹음 작업 점유를 잃었습니다: {job['_id']}")
+                    return
+            except Exception as e:
+                logger.warning(f"녹음 작업 점유 연장 실패 (다음 주기에 다시 시도): {e}")
+
+    async def _release(self, job: Dict[str, Any], fields: Dict[str, Any]) -> bool:
+        """점유를 풀고 결과 상태 기록 (아직 이 프로세스가 점유 중일 때만). 기록했으면 True."""
+        result = await self.collection.update_one(
+            {"_id": job["_id"], "owner": self.owner},
+            {"$set": fields, "$unset": {"owner": "", "lease_until": ""}}
+        )
+        return bool(result.matched_count)
+
+    async def _execute(self, job: Dict[str, Any]) -> Optional[str]:
+        """작업 종류별 처리"""
+        params = job["params"]
+        if job["kind"] == "compose_wav":
+            return await asyncio.to_thread(
+                compose_wav_from_pcm, audio_service._get_bucket(), params["pcm_blob_name"], params["wav_blob_name"]
+            )
+        if job["kind"] == "compose_flac":
+            # 헤더는 스트림을 닫을 때 최종 STREAMINFO로 만들어 작업에 저장해 둠
+            return await asyncio.to_thread(
+                compose_flac_from_frames, audio_service._get_bucket(),
+                params["frames_blob_name"], params["flac_blob_name"], bytes(params["header"])
+            )
+        raise ValueError(f"알 수 없는 녹음 작업 종류: {job['kind']}")
+
+    async def _patch_transcript(self, session_id: str, audio_url: str, codec: str):
+        """대화 기록 문서에 음성 파일 URL과 코덱 반영"""
+        result = await db.transcripts.update_one(
+            {"session_id": session_id},
+            {"$set": {"audio_recording_url": audio_url, "audio_codec": codec}}
+        )
+        if result.matched_count:
+            logger.info(f"음성 파일 URL 갱신: {session_id} -> {audio_url}")
+        else:
+            logger.warning(f"음성 파일 URL을 갱신할 대화 기록이 없습니다: {session_id}")
+
+# 전역 녹음 작업 큐
+recording_job_queue = RecordingJobQueue(
+    owner=INSTANCE_ID,
+    max_attempts=RECORDING_JOB_MAX_ATTEMPTS,
+    retry_base_delay=RECORDING_JOB_RETRY_BASE_DELAY,
+    poll_interval=RECORDING_JOB_POLL_INTERVAL,
+    lease_seconds=RECORDING_JOB_LEASE_SECONDS
+)
@@ -0,0 +1,173 @@
+import os
+import json
+import time
+import struct
+import logging
+import datetime
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from google.genai import types
+
+from services.audio_service import RecordingWriter
+
+logger = logging.getLogger(__name__)
+
+# 캡처 파일 형식
+#   파일 헤더: MAGIC(4) + 버전(u8)
+#   레코드:    RECORD_HEADER(종류 u8, 캡처 시작 기준 시각 f64 초, 페이로드 길이 u32) + 페이로드
+# LIVE_EVENT 페이로드는 JSON 길이(u32) + JSON + 바이너리 블롭들이며, 응답 안의 bytes 값(오디오)은
+# JSON에서 {"$blob": 번호}로 바꾸고 원본 바이트를 뒤에 그대로 붙여 base64로 부풀리지 않습니다.
+CAPTURE_MAGIC = b"VCAP"
+CAPTURE_VERSION = 1
+RECORD_HEADER = struct.Struct("<BdI")
+LENGTH = struct.Struct("<I")
+BLOB_KEY = "$blob"
+
+class CaptureRecordType:
+    METADATA = 0       # 세션 정보 JSON (첫 레코드)
+    CLIENT_AUDIO = 1   # 클라이언트가 보낸 원본 마이크 메시지 (입력 변환 전)
+    LIVE_EVENT = 2     # Live API 응답 이벤트 (LiveServerMessage)
+    CLIENT_END = 3     # 클라이언트 오디오 스트림 종료
+
+@dataclass
+class CaptureRecord:
+    kind: int
+    timestamp: float
+    payload: bytes
+
+    def metadata(self) -> Dict[str, Any]:
+        return json.loads(self.payload)
+
+    def live_event(self) -> types.LiveServerMessage:
+        return decode_live_event(self.payload)
+
+def _extract_blobs(value: Any, blobs: List[bytes]) -> Any:
+    if isinstance(value, (bytes, bytearray)):
+        blobs.append(bytes(value))
+        return {BLOB_KEY: len(blobs) - 1}
+    if isinstance(value, dict):
+        return {k: _extract_blobs(v, blobs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_extract_blobs(v, blobs) for v in value]
+    return value
+
+def _restore_blobs(value: Any, blobs: List[bytes]) -> Any:
+    if isinstance(value, dict):
+        if len(value) == 1 and BLOB_KEY in value:
+            return blobs[value[BLOB_KEY]]
+        return {k: _restore_blobs(v, blobs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_restore_blobs(v, blobs) for v in value]
+    return value
+
+def encode_live_event(message: types.LiveServerMessage) -> bytes:
+    blobs: List[bytes] = []
+    document = _extract_blobs(message.model_dump(exclude_none=True), blobs)
+    encoded = json.dumps(document, ensure_ascii=False, separators=(",", ":"), default=str).encode()
+    parts = [LENGTH.pack(len(encoded)), encoded]
+    for blob in blobs:
+        parts.append(LENGTH.pack(len(blob)))
+        parts.append(blob)
+    return b"".join(parts)
+
+def decode_live_event(payload: bytes) -> types.LiveServerMessage:
+    (json_length,) = LENGTH.unpack_from(payload, 0)
+    offset = LENGTH.size
+    document = json.loads(payload[offset:offset + json_length])
+    offset += json_length
+    blobs = []
+    while offset < len(payload):
+        (blob_length,) = LENGTH.unpack_from(payload, offset)
+        offset += LENGTH.size
+        blobs.append(payload[offset:offset + blob_length])
+        offset += blob_length
+    return types.LiveServerMessage.model_validate(_restore_blobs(document, blobs))
+
+class SessionCaptureWriter:
+    """세션의 원본 마이크 입력과 Live API 응답 이벤트를 시각과 함께 캡처 파일에 기록
+
+    디스크 기록은 녹음과 같은 RecordingWriter(block 정책)가 백그라운드에서 수행하므로 레코드는 버려지지 않습니다.
+    캡처에는 사용자 음성이 그대로 들어가므로 CAPTURE_ENABLED일 때만, CAPTURE_SAMPLE_RATE 비율의 세션만 기록합니다.
+    """
+
+    def __init__(self, path: str, metadata: Dict[str, Any], max_queue_size: int = 1024):
+        self.path = path
+        self.part_path = path + ".part"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(self.part_path, "wb")
+        self._file.write(CAPTURE_MAGIC + bytes([CAPTURE_VERSION]))
+        self._started_at = time.monotonic()
+        self._closed = False
+        self.records = 0
+        self.writer = RecordingWriter(self._file.write, max_queue_size=max_queue_size, overflow_policy="block")
+        self._record_now(CaptureRecordType.METADATA, json.dumps(metadata, ensure_ascii=False, default=str).encode())
+
+    @classmethod
+    def create(cls, capture_dir: str, session_id: str, metadata: Dict[str, Any]) -> Optional["SessionCaptureWriter"]:
+        """캡처 파일 생성 (실패하면 로그만 남기고 None)"""
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = os.path.join(capture_dir, f"{timestamp}_{session_id}.vcap")
+        try:
+            return cls(path, metadata)
+        except OSError as e:
+            logger.error(f"세션 캡처 파일 생성 실패: {e}")
+            return None
+
+    def _record_now(self, kind: int, payload: bytes):
+        self._file.write(RECORD_HEADER.pack(kind, time.monotonic() - self._started_at, len(payload)) + payload)
+        self.records += 1
+
+    async def _record(self, kind: int, payload: bytes):
+        if self._closed:
+            return
+        self.records += 1
+        await self.writer.submit(RECORD_HEADER.pack(kind, time.monotonic() - self._started_at, len(payload)) + payload)
+
+    async def client_audio(self, message: bytes):
+        await self._record(CaptureRecordType.CLIENT_AUDIO, message)
+
+    async def client_end(self):
+        await self._record(CaptureRecordType.CLIENT_END, b"")
+
+    async def live_event(self, message: types.LiveServerMessage):
+        try:
+            payload = encode_live_event(message)
+        except Exception as e:
+            logger.error(f"Live 이벤트 캡처 실패: {e}")
+            return
+        await self._record(CaptureRecordType.LIVE_EVENT, payload)
+
+    async def close(self):
+        """남은 레코드를 기록하고 파일을 완성 (.part 이름을 떼어냄)"""
+        if self._closed:
+            return
+        self._closed = True
+        await self.writer.close()
+        self._file.close()
+        os.replace(self.part_path, self.path)
+        logger.info(f"세션 캡처 저장: {self.path} ({self.records}개 레코드, {self.writer.written_bytes} bytes)")
+
+def read_capture(path: str) -> Tuple[Dict[str, Any], List[CaptureRecord]]:
+    """캡처 파일을 읽어 (메타데이터, 나머지 레코드 목록) 반환 (끝이 잘린 마지막 레코드는 무시)"""
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != CAPTURE_MAGIC:
+        raise ValueError(f"세션 캡처 파일이 아닙니다: {path}")
+    if data[4] != CAPTURE_VERSION:
+        raise ValueError(f"지원하지 않는 캡처 버전: {data[4]}")
+
+    records = list(_iter_records(data, 5))
+    if not records or records[0].kind != CaptureRecordType.METADATA:
+        raise ValueError(f"캡처 메타데이터가 없습니다: {path}")
+    return records[0].metadata(), records[1:]
+
+def _iter_records(data: bytes, offset: int) -> Iterator[CaptureRecord]:
+    while offset + RECORD_HEADER.size <= len(data):
+        kind, timestamp, length = RECORD_HEADER.unpack_from(data, offset)
+        offset += RECORD_HEADER.size
+        if offset + length > len(data):
+            logger.warning("캡처 파일 끝의 잘린 레코드를 무시합니다.")
+            return
+        yield CaptureRecord(kind, timestamp, data[offset:offset + length])
+        offset += length
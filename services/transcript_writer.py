@@ -0,0 +1,145 @@
+import asyncio
+import datetime
+import logging
+from typing import Optional, Dict, Any, List
+
+from models.models import ConversationLog, ConversationTurn, TurnLatency
+from services.metrics import track_latency
+
+logger = logging.getLogger(__name__)
+
+# 통화 중 $push로 늘어나는 필드와 종료 시 $set하는 필드 (upsert의 $setOnInsert와 겹치면 안 됨)
+APPENDED_FIELDS = ("conversation", "turn_latencies")
+FINAL_FIELDS = ("end_time",)
+
+class TranscriptWriter:
+    """세션 대화 기록을 통화 중에 나눠서 MongoDB에 기록
+
+    세션이 시작되면 end_time 없는 문서를 만들고, 완료된 턴은 모아 두었다가 max_pending_turns개가 쌓이거나
+    flush_interval초가 지나면 $push 한 번으로 추가합니다. 메모리에는 아직 기록하지 않은 턴만 남으며,
+    프로세스가 죽어도 마지막 기록까지의 대화는 남습니다. 모든 쓰기는 session_id 기준 upsert라서 시작 시
+    문서 생성이 실패해도 이후 기록에서 문서가 만들어집니다. 음성 파일 URL은 녹음 마무리 작업이 반영합니다.
+    """
+
+    def __init__(self, collection, log: ConversationLog, turn_latencies: List[TurnLatency],
+                 max_pending_turns: int = 20, flush_interval: float = 10.0):
+        self.collection = collection
+        self.document = log.model_dump()
+        self.document["session_id"] = str(self.document["session_id"])
+        self.session_id: str = self.document["session_id"]
+        self.turn_latencies = turn_latencies  # 세션의 턴 지연 목록 (계속 늘어나며 아직 기록하지 않은 부분만 추가)
+        self.max_pending_turns = max(1, max_pending_turns)
+        self.flush_interval = flush_interval
+
+        self.pending: List[ConversationTurn] = []
+        self.turns_written = 0
+        self.latencies_written = 0
+        self._wakeup = asyncio.Event()
+        self._inflight: Optional[asyncio.Task] = None
+
+        # 지표
+        self.flushes = 0
+        self.failed_flushes = 0
+        self.max_pending = 0
+
+    @property
+    def turn_count(self) -> int:
+        return self.turns_written + len(self.pending)
+
+    def add(self, turn: ConversationTurn):
+        """완료된 턴 추가 (많이 쌓이면 기록 태스크를 깨움)"""
+        self.pending.append(turn)
+        self.max_pending = max(self.max_pending, len(self.pending))
+        if len(self.pending) >= self.max_pending_turns:
+            self._wakeup.set()
+
+    def _insert_fields(self) -> Dict[str, Any]:
+        return {k: v for k, v in self.document.items() if k not in APPENDED_FIELDS + FINAL_FIELDS}
+
+    async def create(self):
+        """세션 시작 시 진행 중(end_time 없음) 문서 생성"""
+        with track_latency("mongo", "insert"):
+            await self.collection.update_one(
+                {"session_id": self.session_id},
+                {"$setOnInsert": self.document},
+                upsert=True
+            )
+
+    async def run(self):
+        """문서를 만들고, 완료된 턴을 flush_interval마다 (많이 쌓이면 바로) 기록"""
+        try:
+            await self.create()
+        except Exception as e:
+            logger.error(f"대화 기록 문서 생성 실패 (이후 기록 시 다시 생성): {e}")
+
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error(f"대화 기록 중간 저장 실패 (다음 주기에 다시 시도): {e}")
+
+    async def flush(self, final_fields: Optional[Dict[str, Any]] = None):
+        """쌓인 턴과 턴 지연을 기록 (세션 태스크가 취소돼도 진행 중인 쓰기는 끝까지 수행)"""
+        await self._wait_inflight()
+        if not self.pending and self.latencies_written >= len(self.turn_latencies) and not final_fields:
+            return
+        self._inflight = asyncio.create_task(self._write(len(self.pending), len(self.turn_latencies), final_fields))
+        await asyncio.shield(self._inflight)
+
+    async def _wait_inflight(self):
+        """취소된 태스크가 남긴 쓰기가 끝날 때까지 대기 (그 쓰기의 실패는 이미 보고됨)"""
+        if self._inflight and not self._inflight.done():
+            try:
+                await asyncio.shield(self._inflight)
+            except Exception:
+                pass
+
+    async def _write(self, turn_count: int, latency_end: int, final_fields: Optional[Dict[str, Any]]):
+        push = {}
+        if turn_count:
+            push["conversation"] = {"$each": [turn.model_dump() for turn in self.pending[:turn_count]]}
+        if latency_end > self.latencies_written:
+            push["turn_latencies"] = {
+                "$each": [latency.model_dump() for latency in self.turn_latencies[self.latencies_written:latency_end]]
+            }
+        update: Dict[str, Any] = {"$setOnInsert": self._insert_fields()}
+        if push:
+            update["$push"] = push
+        if final_fields:
+            update["$set"] = final_fields
+
+        with track_latency("mongo", "update"):
+            await self.collection.update_one({"session_id": self.session_id}, update, upsert=True)
+
+        # 기록에 성공한 만큼만 메모리에서 제거
+        del self.pending[:turn_count]
+        self.turns_written += turn_count
+        self.latencies_written = latency_end
+        self.flushes += 1
+
+    async def close(self, end_time: datetime.datetime):
+        """남은 턴과 종료 시각 기록"""
+        await self.flush({"end_time": end_time})
+
+    async def discard(self):
+        """대화가 없는 세션의 문서 삭제"""
+        await self._wait_inflight()
+        with track_latency("mongo", "delete"):
+            await self.collection.delete_one({"session_id": self.session_id})
+
+    def stats(self) -> dict:
+        return {
+            "turns": self.turn_count,
+            "flushes": self.flushes,
+            "failed_flushes": self.failed_flushes,
+            "pending_turns": len(self.pending),
+            "max_pending_turns": self.max_pending,
+        }
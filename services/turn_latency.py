@@ -0,0 +1,118 @@
+import time
+import datetime
+import logging
+from typing import List, Optional
+
+from models.models import TurnLatency
+from services.metrics import TURN_TTFA_SECONDS, TURN_TOOL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+def _ms(start: Optional[float], end: Optional[float]) -> Optional[int]:
+    if start is None or end is None:
+        return None
+    return max(0, round((end - start) * 1000))
+
+class TurnLatencyTracker:
+    """Gemini 응답 이벤트로 턴별 타임라인을 기록하고 지연 요약을 만듦
+
+    턴은 직전 턴이 끝난 뒤 처음 들어온 이벤트(입력 전사, 도구 호출, 모델 오디오)에서 시작해
+    turn_complete 또는 interrupted에서 끝납니다. 서버 VAD가 발화 끝을 따로 알려주지 않으므로
+    첫 모델 오디오 직전의 마지막 입력 전사 시각을 발화 끝으로 보고 TTFA를 계산합니다.
+    첫 오디오 이후에 들어온 입력 전사는 끼어든 발화로 보고, 중단되면 다음 턴의 입력으로 넘깁니다.
+    """
+
+    def __init__(self):
+        self.turns: List[TurnLatency] = []
+        self._reset()
+        self._barge_in: List[float] = []
+
+    def _reset(self):
+        self._started_at: Optional[float] = None
+        self._started_wall: Optional[datetime.datetime] = None
+        self._first_input: Optional[float] = None
+        self._last_input: Optional[float] = None
+        self._first_audio: Optional[float] = None
+        self._tool_calls = 0
+        self._tool_seconds = 0.0
+
+    def _touch(self, now: float):
+        if self._started_at is None:
+            self._started_at = now
+            self._started_wall = datetime.datetime.now()
+
+    def input_transcript(self):
+        now = time.monotonic()
+        self._touch(now)
+        if self._first_audio is not None:
+            self._barge_in.append(now)
+            return
+        if self._first_input is None:
+            self._first_input = now
+        self._last_input = now
+
+    def tool_calls(self, count: int, seconds: float):
+        """tool_call 하나의 처리(동시 실행된 함수 호출 count개)가 끝났을 때 호출"""
+        self._touch(time.monotonic() - seconds)
+        self._tool_calls += count
+        self._tool_seconds += seconds
+
+    def model_audio(self):
+        now = time.monotonic()
+        self._touch(now)
+        if self._first_audio is None:
+            self._first_audio = now
+
+    def interrupted(self):
+        barge_in = self._barge_in
+        self._finish(interrupted=True)
+        # 끼어든 발화는 다음 턴의 입력
+        if barge_in:
+            self._started_at = barge_in[0]
+            self._started_wall = datetime.datetime.now() - datetime.timedelta(seconds=time.monotonic() - barge_in[0])
+            self._first_input = barge_in[0]
+            self._last_input = barge_in[-1]
+
+    def turn_complete(self):
+        self._finish(interrupted=False)
+
+    def close(self):
+        """세션 종료 시 진행 중인 턴을 마무리 (모델 응답이 시작된 경우만 기록)"""
+        if self._first_audio is not None or self._tool_calls:
+            self._finish(interrupted=False, completed=False)
+        self._reset()
+        self._barge_in = []
+
+    def _finish(self, interrupted: bool, completed: bool = True):
+        self._barge_in = []
+        if self._started_at is None:
+            self._reset()
+            return
+        now = time.monotonic()
+        turn = TurnLatency(
+            turn_index=len(self.turns),
+            started_at=self._started_wall,
+            ttfa_ms=_ms(self._last_input, self._first_audio),
+            first_audio_ms=_ms(self._started_at, self._first_audio),
+            tool_calls=self._tool_calls,
+            tool_ms=round(self._tool_seconds * 1000),
+            duration_ms=_ms(self._started_at, now) if completed else None,
+            interrupted=interrupted,
+        )
+        self.turns.append(turn)
+        if turn.ttfa_ms is not None:
+            TURN_TTFA_SECONDS.observe(turn.ttfa_ms / 1000)
+        if turn.tool_calls:
+            TURN_TOOL_SECONDS.observe(self._tool_seconds)
+        logger.debug(f"턴 지연: {turn.model_dump(exclude={'started_at'})}")
+        self._reset()
+
+    def stats(self) -> dict:
+        ttfa = sorted(t.ttfa_ms for t in self.turns if t.ttfa_ms is not None)
+        return {
+            "turns": len(self.turns),
+            "interrupted": sum(1 for t in self.turns if t.interrupted),
+            "ttfa_p50_ms": ttfa[len(ttfa) // 2] if ttfa else None,
+            "ttfa_max_ms": ttfa[-1] if ttfa else None,
+            "tool_ms": sum(t.tool_ms for t in self.turns),
+        }
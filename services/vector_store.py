@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import logging
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from pinecone import ServerlessSpec
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class MemorySearchResult:
+    score: float
+    metadata: Dict
+
+class VectorStore(ABC):
+    """기억 벡터 저장소 백엔드 인터페이스
+
+    upsert의 벡터 형식은 Pinecone과 동일합니다: {"id": str, "values": List[float], "metadata": dict}
+    """
+
+    @abstractmethod
+    def setup(self) -> None:
+        """인덱스를 확인하고, 없으면 생성합니다."""
+
+    @abstractmethod
+    def query(self, vector: List[float], top_k: int, user_id: Optional[str] = None) -> List[MemorySearchResult]:
+        """벡터와 가장 유사한 기억을 검색합니다. user_id가 있으면 해당 사용자로 필터링합니다."""
+
+    @abstractmethod
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        """벡터들을 추가하거나 같은 id면 덮어씁니다."""
+
+    @abstractmethod
+    def fetch_user_vectors(self, user_id: str, limit: int) -> List[Tuple[str, List[float], Dict]]:
+        """사용자의 기억 (id, 벡터, 메타데이터)를 최대 limit개까지 반환합니다.
+
+        사용자의 기억이 limit개보다 많을 때 어떤 limit개가 반환되는지는 백엔드마다 다릅니다.
+        """
+
+    def warm_up(self) -> None:
+        """연결을 미리 열어 첫 요청 지연을 줄입니다."""
+
+    def close(self) -> None:
+        """리소스 정리"""
+
+class PineconeVectorStore(VectorStore):
+    """Pinecone 서버리스 인덱스 백엔드"""
+
+    def __init__(self, pinecone, index_name: str, dimension: int, metric: str, cloud: str, region: str):
+        self.pinecone = pinecone
+        self.index_name = index_name
+        self.dimension = dimension
+        self.metric = metric
+        self.cloud = cloud
+        self.region = region
+        self._index = None
+
+    @property
+    def index(self):
+        """인덱스 핸들 (한 번만 생성해 재사용)"""
+        if self._index is None:
+            self._index = self.pinecone.Index(self.index_name)
+        return self._index
+
+    def setup(self) -> None:
+        if self.index_name not in self.pinecone.list_indexes().names():
+            logger.info(f"Creating Pinecone index: {self.index_name}")
+            self.pinecone.create_index(
+                name=self.index_name,
+                dimension=self.dimension,
+                metric=self.metric,
+                spec=ServerlessSpec(
+                    cloud=self.cloud,
+                    region=self.region
+                )
+            )
+            time.sleep(2)
+            logger.info("Index created successfully.")
+        else:
+            logger.info(f"Pinecone index '{self.index_name}' already exists.")
+
+    def query(self, vector: List[float], top_k: int, user_id: Optional[str] = None) -> List[MemorySearchResult]:
+        index = self.index
+
+        if user_id:
+            logger.debug(f"Searching with user_id filter: {user_id}")
+            results = index.query(
+                vector=vector,
+                top_k=top_k,
+                include_metadata=True,
+                filter={"user_id": {"$eq": user_id}}
+            )
+        else:
+            logger.debug("Searching without user_id filter")
+            results = index.query(
+                vector=vector,
+                top_k=top_k,
+                include_metadata=True
+            )
+
+        logger.debug(f"Pinecone query returned: {results}")
+
+        retrieved_memories = []
+        if results.get("matches"):
+            logger.debug(f"Found {len(results['matches'])} matches")
+            for match in results["matches"]:
+                retrieved_memories.append(MemorySearchResult(
+                    score=match.get("score", 0.0),
+                    metadata=match.get("metadata", {})
+                ))
+        else:
+            logger.debug("No matches found in Pinecone results")
+
+        return retrieved_memories
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        index = self.index
+        index.upsert(vectors=vectors)
+
+    def fetch_user_vectors(self, user_id: str, limit: int) -> List[Tuple[str, List[float], Dict]]:
+        index = self.index
+        # Pinecone은 메타데이터 필터로 목록을 조회할 수 없어 user_id 필터를 건 질의로 가져옴
+        # 질의 벡터는 순서에만 영향을 주며, 기억이 limit개보다 많으면 유사도 순으로 잘린 일부가 반환됨
+        probe = [1.0] * self.dimension
+        results = index.query(
+            vector=probe,
+            top_k=limit,
+            include_values=True,
+            include_metadata=True,
+            filter={"user_id": {"$eq": user_id}}
+        )
+        return [
+            (match.get("id", ""), match.get("values", []), match.get("metadata", {}))
+            for match in results.get("matches", [])
+        ]
+
+    def warm_up(self) -> None:
+        self.index.describe_index_stats()
+
+    def close(self) -> None:
+        if self._index is not None and hasattr(self._index, "close"):
+            self._index.close()
+        self._index = None
+
+class LocalVectorStore(VectorStore):
+    """로컬 파일 기반 인덱스 백엔드 (단일 노드 배포 및 오프라인 테스트/벤치마크용)
+
+    - vectors.f32: L2 정규화된 float32 벡터를 담은 메모리 맵 배열 (capacity x dimension)
+    - metadata.jsonl: id, 행 번호, 메타데이터를 한 줄씩 추가 기록하는 사이드카 (같은 id는 마지막 줄이 유효)
+    """
+
+    def __init__(self, path: str, dimension: int, initial_capacity: int = 1024):
+        self.path = path
+        self.dimension = dimension
+        self.initial_capacity = initial_capacity
+
+        self.vectors_path = os.path.join(path, "vectors.f32")
+        self.metadata_path = os.path.join(path, "metadata.jsonl")
+
+        self._lock = threading.Lock()
+        self._vectors: Optional[np.memmap] = None
+        self._count = 0
+        self._ids: Dict[str, int] = {}              # id -> 행 번호
+        self._metadata: List[Dict[str, Any]] = []    # 행 번호 -> 메타데이터
+        self._row_ids: List[str] = []                # 행 번호 -> id
+        self._user_rows: Dict[str, List[int]] = {}   # user_id -> 행 번호 목록
+        self._metadata_file = None
+
+    def setup(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                return
+            os.makedirs(self.path, exist_ok=True)
+
+            # 사이드카 메타데이터 재생 (같은 id는 마지막 기록이 유효)
+            if os.path.exists(self.metadata_path):
+                with open(self.metadata_path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        line = line.strip()
+                        if not line:
+                            continue
+                        record = json.loads(line)
+                        self._index_row(record["id"], record["row"], record["metadata"])
+
+            capacity = self.initial_capacity
+            if os.path.exists(self.vectors_path):
+                existing = os.path.getsize(self.vectors_path) // (4 * self.dimension)
+                capacity = max(capacity, existing)
+            while capacity < self._count:
+                capacity *= 2
+            self._open_vectors(capacity)
+
+            self._metadata_file = open(self.metadata_path, "a", encoding="utf-8")
+            logger.info(f"Local vector store ready: {self.path} ({self._count} vectors)")
+
+    def warm_up(self) -> None:
+        self.setup()
+
+    def _open_vectors(self, capacity: int) -> None:
+        """메모리 맵 파일을 capacity 행 크기로 열기 (필요하면 파일 확장)"""
+        if self._vectors is not None:
+            self._vectors.flush()
+            del self._vectors
+        size = capacity * self.dimension * 4
+        with open(self.vectors_path, "ab") as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, self.dimension))
+
+    def _index_row(self, memory_id: str, row: int, metadata: Dict[str, Any]) -> None:
+        """메모리 내 id/사용자 인덱스 갱신"""
+        previous = self._ids.get(memory_id)
+        if previous is not None:
+            old_user = self._metadata[previous].get("user_id")
+            if old_user in self._user_rows and previous in self._user_rows[old_user]:
+                self._user_rows[old_user].remove(previous)
+
+        while len(self._metadata) <= row:
+            self._metadata.append({})
+            self._row_ids.append("")
+        self._metadata[row] = metadata
+        self._row_ids[row] = memory_id
+        self._ids[memory_id] = row
+        self._count = max(self._count, row + 1)
+
+        user_id = metadata.get("user_id")
+        if user_id is not None:
+            self._user_rows.setdefault(user_id, []).append(row)
+
+    def query(self, vector: List[float], top_k: int, user_id: Optional[str] = None) -> List[MemorySearchResult]:
+        self.setup()
+        with self._lock:
+            if user_id is not None:
+                rows = np.asarray(self._user_rows.get(user_id, []), dtype=np.int64)
+            else:
+                rows = np.asarray(sorted(self._ids.values()), dtype=np.int64)
+            if rows.size == 0 or top_k <= 0:
+                return []
+
+            query = np.asarray(vector, dtype=np.float32)
+            query = query / max(float(np.linalg.norm(query)), 1e-12)
+            scores = self._vectors[rows] @ query
+
+            k = min(top_k, rows.size)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [
+                MemorySearchResult(score=float(scores[i]), metadata=dict(self._metadata[rows[i]]))
+                for i in top
+            ]
+
+    def upsert(self, vectors: List[Dict[str, Any]]) -> None:
+        self.setup()
+        with self._lock:
+            for vector in vectors:
+                memory_id = vector["id"]
+                metadata = dict(vector.get("metadata", {}))
+                values = np.asarray(vector["values"], dtype=np.float32)
+                if values.shape != (self.dimension,):
+                    raise ValueError(f"Vector dimension mismatch: expected {self.dimension}, got {values.shape}")
+
+                row = self._ids.get(memory_id, self._count)
+                if row >= self._vectors.shape[0]:
+                    self._open_vectors(self._vectors.shape[0] * 2)
+
+                self._vectors[row] = values / max(float(np.linalg.norm(values)), 1e-12)
+                self._index_row(memory_id, row, metadata)
+                self._metadata_file.write(
+                    json.dumps({"id": memory_id, "row": row, "metadata": metadata}, ensure_ascii=False) + "\n"
+                )
+
+            self._vectors.flush()
+            self._metadata_file.flush()
+
+    def fetch_user_vectors(self, user_id: str, limit: int) -> List[Tuple[str, List[float], Dict]]:
+        self.setup()
+        with self._lock:
+            rows = self._user_rows.get(user_id, [])[:limit]
+            return [(self._row_ids[row], self._vectors[row].tolist(), dict(self._metadata[row])) for row in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._vectors is not None:
+                self._vectors.flush()
+                del self._vectors
+                self._vectors = None
+            if self._metadata_file:
+                self._metadata_file.close()
+                self._metadata_file = None
@@ -0,0 +1,142 @@
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class VadResult:
+    send: List[bytes] = field(default_factory=list)   # Gemini로 보낼 청크 (발화 시작 시 프리롤 포함)
+    is_speech: bool = False
+    end_stream: bool = False                          # 긴 무음이 시작되어 audio_stream_end를 보내야 함
+
+class VoiceActivityDetector:
+    """16비트 모노 PCM 청크 단위 음성 구간 검출 (NumPy 에너지 + 영교차율, 행오버)
+
+    청크를 frame_ms 단위 프레임으로 나눠 RMS 에너지(dBFS)와 영교차율을 한 번에 계산하고,
+    발화 프레임이 하나라도 있으면 발화 청크로 봅니다. 마지막 발화 후 hangover_ms 동안은 계속 보내서
+    말끝과 Gemini 쪽 턴 종료 판단에 필요한 무음을 살리고, 그 뒤의 무음은 모드에 따라 처리합니다.
+    - throttle: throttle_interval_ms마다 한 청크만 보냄
+    - suppress: 보내지 않음
+    무음이 stream_end_ms 이상 이어지면 한 번 end_stream을 알리고, 그 뒤로는 다음 발화까지 보내지 않습니다.
+    발화가 다시 시작되면 직전 preroll_ms 분량의 청크를 먼저 보내 첫소리가 잘리지 않게 합니다.
+    """
+
+    MODES = ("throttle", "suppress")
+
+    def __init__(self, sample_rate: int = 16000, mode: str = "throttle", frame_ms: int = 20,
+                 energy_threshold_db: float = -45.0, noise_margin_db: float = 10.0, zcr_max: float = 0.35,
+                 hangover_ms: int = 600, throttle_interval_ms: int = 500, stream_end_ms: int = 2000,
+                 preroll_ms: int = 200):
+        if mode not in self.MODES:
+            logger.warning(f"알 수 없는 VAD 모드 '{mode}', throttle 사용")
+            mode = "throttle"
+        self.sample_rate = sample_rate
+        self.mode = mode
+        self.frame_size = max(1, sample_rate * frame_ms // 1000)
+        self.energy_threshold_db = energy_threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.zcr_max = zcr_max
+        self.hangover = hangover_ms / 1000
+        self.throttle_interval = throttle_interval_ms / 1000
+        self.stream_end = stream_end_ms / 1000
+        self.preroll = preroll_ms / 1000
+
+        self.noise_floor_db = energy_threshold_db - noise_margin_db
+        self._silence = 0.0              # 마지막 발화 이후 누적 무음 길이(초)
+        self._since_throttled = 0.0      # 마지막으로 보낸 무음 청크 이후 경과(초)
+        self._stream_ended = True        # 첫 발화 전에는 무음을 보내지 않음
+        self._preroll: Deque[bytes] = deque()
+        self._preroll_duration = 0.0
+
+        # 지표
+        self.chunks_in = 0
+        self.chunks_sent = 0
+        self.speech_chunks = 0
+        self.bytes_in = 0
+        self.bytes_sent = 0
+        self.stream_ends = 0
+
+    def _speech_frames(self, samples: np.ndarray) -> np.ndarray:
+        """프레임별 발화 여부 (에너지가 임계값을 넘고, 영교차율이 잡음 수준보다 낮거나 충분히 큰 소리)"""
+        frame_count = max(1, len(samples) // self.frame_size)
+        usable = min(len(samples), frame_count * self.frame_size)
+        frames = samples[:usable].reshape(frame_count, -1)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        energy_db = 20 * np.log10(rms / 32768.0 + 1e-10)
+        signs = np.signbit(frames)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1) if frames.shape[1] > 1 else np.zeros(frame_count)
+
+        threshold = max(self.energy_threshold_db, self.noise_floor_db + self.noise_margin_db)
+        speech = (energy_db > threshold) & ((zcr <= self.zcr_max) | (energy_db > threshold + self.noise_margin_db))
+
+        # 발화가 아닌 프레임으로 잡음 수준을 천천히 추적
+        if not speech.all():
+            quiet = float(np.median(energy_db[~speech]))
+            self.noise_floor_db += 0.05 * (quiet - self.noise_floor_db)
+        return speech
+
+    def process(self, pcm: bytes) -> VadResult:
+        """청크 하나를 판정해 보낼 청크와 스트림 종료 여부를 반환"""
+        self.chunks_in += 1
+        self.bytes_in += len(pcm)
+        samples = np.frombuffer(pcm[:len(pcm) - len(pcm) % 2], dtype="<i2").astype(np.float32)
+        if samples.size == 0:
+            return VadResult()
+        duration = samples.size / self.sample_rate
+        result = VadResult(is_speech=bool(self._speech_frames(samples).any()))
+
+        if result.is_speech:
+            self.speech_chunks += 1
+            if self._stream_ended:
+                result.send.extend(self._preroll)
+            self._preroll.clear()
+            self._preroll_duration = 0.0
+            result.send.append(pcm)
+            self._silence = 0.0
+            self._since_throttled = 0.0
+            self._stream_ended = False
+        else:
+            self._silence += duration
+            if self._stream_ended:
+                self._remember_preroll(pcm, duration)
+            elif self._silence >= self.stream_end:
+                result.end_stream = True
+                self._stream_ended = True
+                self.stream_ends += 1
+                self._remember_preroll(pcm, duration)
+            elif self._silence <= self.hangover:
+                result.send.append(pcm)
+            else:
+                self._since_throttled += duration
+                if self.mode == "throttle" and self._since_throttled >= self.throttle_interval:
+                    result.send.append(pcm)
+                    self._since_throttled = 0.0
+
+        self.chunks_sent += len(result.send)
+        self.bytes_sent += sum(len(chunk) for chunk in result.send)
+        return result
+
+    def _remember_preroll(self, pcm: bytes, duration: float):
+        self._preroll.append(pcm)
+        self._preroll_duration += duration
+        while len(self._preroll) > 1 and self._preroll_duration - self._duration(self._preroll[0]) >= self.preroll:
+            self._preroll_duration -= self._duration(self._preroll.popleft())
+
+    def _duration(self, pcm: bytes) -> float:
+        return len(pcm) // 2 / self.sample_rate
+
+    def stats(self) -> dict:
+        return {
+            "chunks_in": self.chunks_in,
+            "chunks_sent": self.chunks_sent,
+            "speech_chunks": self.speech_chunks,
+            "bytes_saved": self.bytes_in - self.bytes_sent,
+            "sent_ratio": round(self.bytes_sent / self.bytes_in, 3) if self.bytes_in else 0.0,
+            "stream_ends": self.stream_ends,
+            "noise_floor_db": round(self.noise_floor_db, 1),
+        }
@@ -1,4 +1,6 @@
 import os
+import uuid
+import socket
 from dotenv import load_dotenv
 from google.genai.types import (
     FunctionDeclaration,
@@ -9,6 +11,7 @@ from google.genai.types import (
     LiveConnectConfig,
     ProactivityConfig,
     GenerationConfig,
+    SessionResumptionConfig,
 )
 
 # 환경 변수 로드
@@ -23,7 +26,36 @@ ANALYZE_SERVER = "http://host.docker.internal:8000/analyze"
 
 # --- 서버 설정 ---
 SEND_SAMPLE_RATE = 16000
+RECEIVE_SAMPLE_RATE = 24000  # Gemini 출력 오디오 샘플레이트
 PORT = 8765
+INSTANCE_ID = os.getenv("INSTANCE_ID") or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"  # 작업 큐에서 작업을 점유한 프로세스 식별자
+
+# --- 마이크 입력 설정 ---
+# 클라이언트는 ?sample_rate=48000&format=f32le&channels=1 로 실제 형식을 선언할 수 있음 (기본: 16kHz s16le 모노)
+INGEST_FRAME_MS = int(os.getenv("INGEST_FRAME_MS", "40"))  # Gemini로 보낼 프레임 길이 (짧을수록 지연↓, 전송 횟수↑)
+AUDIO_QUEUE_MAX_MS = int(os.getenv("AUDIO_QUEUE_MAX_MS", "1000"))  # Gemini 전송 대기 오디오 최대 길이 (넘치면 정책 적용)
+AUDIO_QUEUE_POLICY = os.getenv("AUDIO_QUEUE_POLICY", "skip_to_live")  # block | drop_oldest | skip_to_live
+AUDIO_QUEUE_LIVE_MS = int(os.getenv("AUDIO_QUEUE_LIVE_MS", "200"))  # skip_to_live 시 남길 최신 오디오 길이
+
+# --- 클라이언트 전송 설정 ---
+AUDIO_COALESCE_WINDOW_MS = float(os.getenv("AUDIO_COALESCE_WINDOW_MS", "0"))  # 오디오 파트를 모으는 시간 (0: 전송 대기 중 쌓인 것만 합침)
+AUDIO_COALESCE_MAX_BYTES = int(os.getenv("AUDIO_COALESCE_MAX_BYTES", "48000"))  # 한 메시지로 합칠 최대 오디오 크기 (24kHz 1초)
+OUTBOUND_QUEUE_MAX_ITEMS = int(os.getenv("OUTBOUND_QUEUE_MAX_ITEMS", "256"))  # 세션별 송신 큐 최대 항목 수 (넘치면 오래된 오디오부터 버림)
+OUTBOUND_SLOW_CONSUMER_SECONDS = float(os.getenv("OUTBOUND_SLOW_CONSUMER_SECONDS", "2.0"))  # 이 이상 송신이 밀리면 느린 클라이언트로 판단
+
+# --- 음성 구간 검출 (Gemini로 보내는 무음 줄이기) ---
+VAD_ENABLED = os.getenv("VAD_ENABLED", "false").lower() == "true"
+VAD_MODE = os.getenv("VAD_MODE", "throttle")  # throttle: 무음을 간격마다 한 청크만 전송 | suppress: 무음 전송 안 함
+VAD_ENERGY_THRESHOLD_DB = float(os.getenv("VAD_ENERGY_THRESHOLD_DB", "-45"))  # 발화로 볼 최소 에너지 (dBFS)
+VAD_HANGOVER_MS = int(os.getenv("VAD_HANGOVER_MS", "600"))  # 발화 후 계속 보낼 무음 길이
+VAD_THROTTLE_INTERVAL_MS = int(os.getenv("VAD_THROTTLE_INTERVAL_MS", "500"))  # throttle 모드의 무음 청크 전송 간격
+VAD_STREAM_END_MS = int(os.getenv("VAD_STREAM_END_MS", "2000"))  # 이 이상 무음이면 audio_stream_end 전송
+
+# --- Gemini Live 세션 재개 (go_away/연결 끊김 시 같은 대화로 다시 연결) ---
+GEMINI_SESSION_RESUMPTION_ENABLED = os.getenv("GEMINI_SESSION_RESUMPTION_ENABLED", "true").lower() == "true"
+GEMINI_RECONNECT_MARGIN_SECONDS = float(os.getenv("GEMINI_RECONNECT_MARGIN_SECONDS", "5.0"))  # go_away 종료 시각 이만큼 전에는 응답 중이어도 전환
+GEMINI_RECONNECT_MAX_ATTEMPTS = int(os.getenv("GEMINI_RECONNECT_MAX_ATTEMPTS", "3"))  # 재연결 최대 시도 횟수
+GEMINI_RESUME_BUFFER_MS = int(os.getenv("GEMINI_RESUME_BUFFER_MS", "5000"))  # 전환 중 보관할 입력 오디오 최대 길이
 
 # --- JWT 설정 (Spring 서버와 동일한 설정 사용) ---
 JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this")  # Spring의 jwt.key와 동일해야 함
@@ -32,9 +64,44 @@ JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-this")  # S
 GCS_BUCKET_NAME = os.getenv("GCS_BUCKET_NAME", "voice-recordings")
 GOOGLE_APPLICATION_CREDENTIALS = os.getenv("GOOGLE_APPLICATION_CREDENTIALS", "/app/config/key.json")  # GCS 인증 키 파일 경로
 
+# --- 대화 기록 저장 (통화 중 완료된 턴을 나눠서 기록) ---
+TRANSCRIPT_FLUSH_MAX_TURNS = int(os.getenv("TRANSCRIPT_FLUSH_MAX_TURNS", "20"))  # 이만큼 턴이 쌓이면 바로 기록
+TRANSCRIPT_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL_SECONDS", "10.0"))  # 쌓인 턴을 기록하는 최대 간격
+
+# --- 녹음 설정 ---
+RECORDING_QUEUE_MAX_CHUNKS = int(os.getenv("RECORDING_QUEUE_MAX_CHUNKS", "256"))  # 녹음 writer 큐 최대 청크 수
+RECORDING_OVERFLOW_POLICY = os.getenv("RECORDING_OVERFLOW_POLICY", "drop_oldest")  # drop_oldest | drop_newest | block
+RECORDING_MODE = os.getenv("RECORDING_MODE", "stream")  # stream: GCS 직접 스트리밍 | spool: 로컬 디스크 스풀 후 업로드
+RECORDING_SPOOL_DIR = os.getenv("RECORDING_SPOOL_DIR", "/app/spool")
+RECORDING_SPOOL_MMAP = os.getenv("RECORDING_SPOOL_MMAP", "false").lower() == "true"  # 스풀 파일을 메모리 맵으로 기록
+RECORDING_FORMAT = os.getenv("RECORDING_FORMAT", "wav")  # wav: 무압축 PCM | flac: 통화 중 스트리밍 FLAC 인코딩
+RECORDING_FLAC_BLOCK_SIZE = int(os.getenv("RECORDING_FLAC_BLOCK_SIZE", "4096"))  # FLAC 프레임당 샘플 수
+RECORDING_JOB_MAX_ATTEMPTS = int(os.getenv("RECORDING_JOB_MAX_ATTEMPTS", "5"))  # 녹음 마무리 작업 최대 시도 횟수
+RECORDING_JOB_RETRY_BASE_DELAY = float(os.getenv("RECORDING_JOB_RETRY_BASE_DELAY", "5.0"))  # 재시도 백오프 기본 지연(초)
+RECORDING_JOB_POLL_INTERVAL = float(os.getenv("RECORDING_JOB_POLL_INTERVAL", "10.0"))  # 재시도 대기 작업 확인 주기(초)
+RECORDING_JOB_LEASE_SECONDS = float(os.getenv("RECORDING_JOB_LEASE_SECONDS", "300.0"))  # 작업 점유 유지 시간(초), 실행 중에는 계속 연장
+
+# --- 분석 서버 전송 아웃박스 (MongoDB에 저장 후 백그라운드 전송) ---
+ANALYZE_BATCH_SERVER = os.getenv("ANALYZE_BATCH_SERVER", "")  # 여러 세션을 {"sessions": [...]}로 한 번에 받는 엔드포인트 (비우면 한 건씩 전송)
+ANALYSIS_OUTBOX_BATCH_SIZE = int(os.getenv("ANALYSIS_OUTBOX_BATCH_SIZE", "20"))  # 한 번에 꺼내 보낼 최대 세션 수
+ANALYSIS_OUTBOX_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_OUTBOX_MAX_ATTEMPTS", "8"))  # 최대 시도 횟수 (넘으면 dead)
+ANALYSIS_OUTBOX_RETRY_BASE_DELAY = float(os.getenv("ANALYSIS_OUTBOX_RETRY_BASE_DELAY", "5.0"))  # 재시도 백오프 기본 지연(초)
+ANALYSIS_OUTBOX_RETRY_MAX_DELAY = float(os.getenv("ANALYSIS_OUTBOX_RETRY_MAX_DELAY", "600.0"))  # 재시도 지연 상한(초)
+ANALYSIS_OUTBOX_POLL_INTERVAL = float(os.getenv("ANALYSIS_OUTBOX_POLL_INTERVAL", "10.0"))  # 재시도 대기 작업 확인 주기(초)
+ANALYSIS_OUTBOX_LEASE_SECONDS = float(os.getenv("ANALYSIS_OUTBOX_LEASE_SECONDS", "120.0"))  # 전송 중 점유 유지 시간(초), HTTP 타임아웃보다 길어야 함
+ANALYSIS_HTTP_TIMEOUT = float(os.getenv("ANALYSIS_HTTP_TIMEOUT", "10.0"))  # 분석 서버 요청 타임아웃(초)
+ANALYSIS_HTTP_MAX_CONNECTIONS = int(os.getenv("ANALYSIS_HTTP_MAX_CONNECTIONS", "10"))  # 분석 서버 연결 풀 크기
+
+# --- 세션 캡처 (재현/재생용, 사용자 음성이 그대로 저장되므로 기본 꺼짐) ---
+CAPTURE_ENABLED = os.getenv("CAPTURE_ENABLED", "false").lower() == "true"
+CAPTURE_SAMPLE_RATE = float(os.getenv("CAPTURE_SAMPLE_RATE", "1.0"))  # 캡처할 세션 비율 (0.0 ~ 1.0)
+CAPTURE_DIR = os.getenv("CAPTURE_DIR", "/app/captures")
+
 # --- 메모리 설정 ---
 MEMORY_RELEVANCE_THRESHOLD = 0.6
 MAX_MEMORY_RESULTS = 5
+MEMORY_WORKING_SET_ENABLED = os.getenv("MEMORY_WORKING_SET_ENABLED", "true").lower() == "true"
+MEMORY_WORKING_SET_MAX_SIZE = int(os.getenv("MEMORY_WORKING_SET_MAX_SIZE", "500"))  # 초과 시 Pinecone 검색 사용 (Pinecone include_values 한도 때문에 999 이하)
 
 # --- 음성 설정 ---
 DEFAULT_VOICE_NAME = "Aoede"
@@ -142,6 +209,7 @@ class ResponseType:
     TEXT = "text"
     INTERRUPT = "interrupt"
     TURN_COMPLETE = "turn_complete"
+    PROTOCOL = "protocol"
 
 # --- 라이브 API 설정 함수 ---
 def get_live_api_config(
@@ -150,8 +218,9 @@ def get_live_api_config(
     system_instruction=None,
     tools=None,
     generation_config=None,
+    session_handle=None,
 ):
-    """라이브 API 설정을 생성합니다."""
+    """라이브 API 설정을 생성합니다. (session_handle이 있으면 해당 세션을 이어서 재개)"""
     if response_modalities is None:
         response_modalities = DEFAULT_RESPONSE_MODALITIES
     if voice_name is None:
@@ -181,4 +250,5 @@ def get_live_api_config(
         generation_config=generation_config,
         system_instruction=system_instruction,
         tools=tools,
+        session_resumption=SessionResumptionConfig(handle=session_handle) if GEMINI_SESSION_RESUMPTION_ENABLED else None,
     )
\ No newline at end of file
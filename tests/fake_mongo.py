@@ -0,0 +1,100 @@
+import copy
+from types import SimpleNamespace
+
+from pymongo import ReturnDocument
+
+def _matches(document, query):
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(_matches(document, clause) for clause in condition):
+                return False
+            continue
+        value = document.get(key)
+        if isinstance(condition, dict):
+            for operator, operand in condition.items():
+                if operator == "$lte" and not (value is not None and value <= operand):
+                    return False
+                if operator == "$in" and value not in operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+def _apply(document, update, inserting=False):
+    for key, value in update.get("$set", {}).items():
+        document[key] = copy.deepcopy(value)
+    for key in update.get("$unset", {}):
+        document.pop(key, None)
+    for key, value in update.get("$inc", {}).items():
+        document[key] = document.get(key, 0) + value
+    for key, value in update.get("$push", {}).items():
+        items = value["$each"] if isinstance(value, dict) and "$each" in value else [value]
+        document.setdefault(key, []).extend(copy.deepcopy(items))
+    if inserting:
+        for key, value in update.get("$setOnInsert", {}).items():
+            document.setdefault(key, copy.deepcopy(value))
+
+class FakeCollection:
+    """테스트용 인메모리 Motor 컬렉션 (작업 큐와 대화 기록이 쓰는 연산만 지원)"""
+
+    def __init__(self):
+        self.documents = []
+        self.fail_next = 0  # 다음 n번의 쓰기 연산을 실패시킴
+
+    def _maybe_fail(self):
+        if self.fail_next:
+            self.fail_next -= 1
+            raise RuntimeError("fake mongo failure")
+
+    async def insert_one(self, document):
+        self._maybe_fail()
+        document = copy.deepcopy(document)
+        document.setdefault("_id", f"id-{len(self.documents)}")
+        self.documents.append(document)
+        return SimpleNamespace(inserted_id=document["_id"])
+
+    async def find_one(self, query):
+        for document in self.documents:
+            if _matches(document, query):
+                return copy.deepcopy(document)
+        return None
+
+    async def find_one_and_update(self, query, update, sort=None, return_document=ReturnDocument.BEFORE):
+        candidates = [document for document in self.documents if _matches(document, query)]
+        for key, direction in reversed(sort or []):
+            candidates.sort(key=lambda document: document.get(key), reverse=direction < 0)
+        if not candidates:
+            return None
+        document = candidates[0]
+        before = copy.deepcopy(document)
+        _apply(document, update)
+        return copy.deepcopy(document) if return_document == ReturnDocument.AFTER else before
+
+    async def update_one(self, query, update, upsert=False):
+        self._maybe_fail()
+        for document in self.documents:
+            if _matches(document, query):
+                _apply(document, update)
+                return SimpleNamespace(matched_count=1, modified_count=1, upserted_id=None)
+        if upsert:
+            document = {key: value for key, value in query.items() if not isinstance(value, dict)}
+            _apply(document, update, inserting=True)
+            await self.insert_one(document)
+            return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=self.documents[-1]["_id"])
+        return SimpleNamespace(matched_count=0, modified_count=0, upserted_id=None)
+
+    async def update_many(self, query, update):
+        matched = [document for document in self.documents if _matches(document, query)]
+        for document in matched:
+            _apply(document, update)
+        return SimpleNamespace(matched_count=len(matched), modified_count=len(matched))
+
+    async def delete_one(self, query):
+        for document in self.documents:
+            if _matches(document, query):
+                self.documents.remove(document)
+                return SimpleNamespace(deleted_count=1)
+        return SimpleNamespace(deleted_count=0)
+
+    async def count_documents(self, query):
+        return sum(1 for document in self.documents if _matches(document, query))
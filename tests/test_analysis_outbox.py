@@ -0,0 +1,145 @@
+import asyncio
+import datetime
+import json
+
+import httpx
+
+from fake_mongo import FakeCollection
+from services.analysis_outbox import AnalysisOutbox, OutboxStatus, analysis_payload
+
+def _outbox(handler, batch_url=""):
+    outbox = AnalysisOutbox("http://analysis/analyze", owner="me", batch_url=batch_url, max_attempts=2,
+                            retry_base_delay=0, lease_seconds=60)
+    outbox.collection = FakeCollection()
+    outbox.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return outbox
+
+def test_payload_tolerates_missing_started_at():
+    now = datetime.datetime(2026, 1, 1, 12, 0)
+    payload = analysis_payload({
+        "_id": 1,
+        "start_time": now,
+        "end_time": None,
+        "turn_latencies": [{"turn": 1, "started_at": now}, {"turn": 2, "started_at": None}, {"turn": 3}],
+    })
+    assert payload["_id"] == "1"
+    assert payload["start_time"] == now.isoformat()
+    assert payload["end_time"] is None
+    assert [turn["started_at"] for turn in payload["turn_latencies"]] == [now.isoformat(), None, None]
+    json.dumps(payload)
+
+def test_delivery_sends_idempotency_key_and_drops_payload():
+    received = []
+
+    def handler(request):
+        received.append((request.headers.get("Idempotency-Key"), json.loads(request.content)))
+        return httpx.Response(200, json={})
+
+    outbox = _outbox(handler)
+
+    async def main():
+        await outbox.enqueue("s", {"session_id": "s"})
+        assert await outbox._run_next()
+        assert not await outbox._run_next()
+        await outbox.client.aclose()
+
+    asyncio.run(main())
+    job = outbox.collection.documents[0]
+    assert received == [(job["_id"], {"session_id": "s"})]
+    assert job["status"] == OutboxStatus.DELIVERED
+    assert "payload" not in job and "owner" not in job
+
+def test_batch_sends_idempotency_keys():
+    bodies = []
+
+    def handler(request):
+        bodies.append((str(request.url), json.loads(request.content)))
+        return httpx.Response(200, json={})
+
+    outbox = _outbox(handler, batch_url="http://analysis/batch")
+
+    async def main():
+        for session_id in ("a", "b"):
+            await outbox.enqueue(session_id, {"session_id": session_id})
+        await outbox._run_next()
+        await outbox.client.aclose()
+
+    asyncio.run(main())
+    ids = sorted(job["_id"] for job in outbox.collection.documents)
+    assert len(bodies) == 1
+    url, body = bodies[0]
+    assert url == "http://analysis/batch"
+    assert sorted(body["idempotency_keys"]) == ids
+    assert sorted(s["session_id"] for s in body["sessions"]) == ["a", "b"]
+
+def test_server_errors_retry_and_client_errors_go_dead():
+    statuses = {"retry": 503, "dead": 400}
+
+    def handler(request):
+        return httpx.Response(statuses[json.loads(request.content)["session_id"]])
+
+    outbox = _outbox(handler)
+
+    async def main():
+        await outbox.enqueue("retry", {"session_id": "retry"})
+        await outbox.enqueue("dead", {"session_id": "dead"})
+        await outbox._run_next()
+        result = {job["session_id"]: (job["status"], job["attempts"]) for job in outbox.collection.documents}
+        # 재시도 지연이 0이므로 바로 다시 보내고, 최대 시도 횟수에서 중단
+        await outbox._run_next()
+        await outbox.client.aclose()
+        return result
+
+    first = asyncio.run(main())
+    assert first == {"retry": (OutboxStatus.PENDING, 1), "dead": (OutboxStatus.DEAD, 1)}
+    retried = next(job for job in outbox.collection.documents if job["session_id"] == "retry")
+    assert (retried["status"], retried["attempts"]) == (OutboxStatus.DEAD, 2)
+    assert retried["last_error"].startswith("HTTP 503")
+
+def test_requeue_only_touches_expired_claims():
+    outbox = _outbox(lambda request: httpx.Response(200))
+    now = datetime.datetime.now()
+
+    async def main():
+        for _id, claimed_at in (("fresh", now), ("expired", now - datetime.timedelta(seconds=120)), ("legacy", None)):
+            await outbox.collection.insert_one({"_id": _id, "status": OutboxStatus.SENDING, "owner": "other",
+                                                "claimed_at": claimed_at})
+        await outbox._requeue_expired()
+        await outbox.client.aclose()
+
+    asyncio.run(main())
+    statuses = {job["_id"]: job["status"] for job in outbox.collection.documents}
+    assert statuses == {"fresh": OutboxStatus.SENDING, "expired": OutboxStatus.PENDING, "legacy": OutboxStatus.PENDING}
+
+def test_release_leaves_job_reclaimed_by_another_instance():
+    outbox = _outbox(lambda request: httpx.Response(200))
+
+    async def main():
+        await outbox.enqueue("s", {"session_id": "s"})
+        job = await outbox._claim()
+        # 점유가 만료돼 다른 인스턴스가 다시 가져간 상태
+        await outbox.collection.update_one({"_id": job["_id"]}, {"$set": {"owner": "other",
+                                                                          "claimed_at": datetime.datetime.now()}})
+        await outbox._mark_delivered(job)
+        await outbox.client.aclose()
+
+    asyncio.run(main())
+    job = outbox.collection.documents[0]
+    assert (job["status"], job["owner"]) == (OutboxStatus.SENDING, "other")
+    assert "payload" in job
+
+def test_enqueue_transcript_reads_saved_document():
+    outbox = _outbox(lambda request: httpx.Response(200))
+    transcripts = FakeCollection()
+
+    async def main():
+        await transcripts.insert_one({"session_id": "s", "audio_recording_url": "gs://bucket/a.wav",
+                                      "start_time": datetime.datetime(2026, 1, 1)})
+        assert await outbox.enqueue_transcript(transcripts, "s")
+        assert not await outbox.enqueue_transcript(transcripts, "missing")
+        await outbox.client.aclose()
+
+    asyncio.run(main())
+    [job] = outbox.collection.documents
+    assert job["payload"]["audio_recording_url"] == "gs://bucket/a.wav"
+    assert job["payload"]["start_time"] == "2026-01-01T00:00:00"
@@ -0,0 +1,108 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from services.audio_ingest import AudioIngest, AudioInputQueue, InputAudioFormat, StreamingResampler
+
+def _tone(rate, seconds=1.0, frequency=440.0):
+    t = np.arange(int(rate * seconds)) / rate
+    return 10000 * np.sin(2 * np.pi * frequency * t)
+
+@pytest.mark.parametrize("input_rate", [48000, 44100])
+@pytest.mark.parametrize("chunk_size", [1, 160, 1024, 4096, 4800])
+def test_chunked_output_matches_whole_buffer(input_rate, chunk_size):
+    samples = _tone(input_rate)
+    whole = StreamingResampler(input_rate, 16000).process(samples)
+
+    resampler = StreamingResampler(input_rate, 16000)
+    chunked = np.concatenate([resampler.process(samples[i:i + chunk_size])
+                              for i in range(0, len(samples), chunk_size)])
+
+    # 청크 경계에서 입력을 잃거나 중복하지 않음
+    assert len(whole) == 16000
+    assert len(chunked) == len(whole)
+    assert np.allclose(chunked, whole, atol=1e-6)
+
+def test_downsampling_keeps_tone_and_removes_aliases():
+    # 12kHz 성분은 16kHz 출력의 나이퀴스트(8kHz) 위라서 걸러져야 함
+    samples = _tone(48000, frequency=440.0) + _tone(48000, frequency=12000.0)
+    output = StreamingResampler(48000, 16000).process(samples)
+
+    spectrum = np.abs(np.fft.rfft(output[1000:-1000]))
+    frequencies = np.fft.rfftfreq(len(output) - 2000, 1 / 16000)
+    tone = spectrum[np.argmin(np.abs(frequencies - 440))]
+    alias = spectrum[np.argmin(np.abs(frequencies - 4000))]   # 12kHz가 접히는 위치
+    assert alias < tone * 0.01
+
+def test_query_format_falls_back_on_invalid_values():
+    audio_format = InputAudioFormat.from_query("sample_rate=abc&format=mp3&channels=2")
+    assert (audio_format.sample_rate, audio_format.sample_format, audio_format.channels) == (16000, "s16le", 2)
+    assert InputAudioFormat.from_query("sample_rate=200000").sample_rate == 16000
+    assert InputAudioFormat.from_query("sample_rate=48000&format=f32le").bytes_per_frame == 4
+
+def test_passthrough_reframes_without_changing_bytes():
+    ingest = AudioIngest(InputAudioFormat(), frame_ms=40)
+    pcm = np.arange(2000, dtype="<i2").tobytes()
+
+    frames = ingest.process(pcm[:1001]) + ingest.process(pcm[1001:])
+    frames += ingest.flush()
+    assert ingest.passthrough
+    assert [len(frame) for frame in frames] == [1280, 1280, 1280, 160]
+    assert b"".join(frames) == pcm
+
+def test_stereo_float_input_is_downmixed_and_resampled():
+    mono = _tone(48000) / 32768.0
+    stereo = np.repeat(mono, 2).astype("<f4").tobytes()
+    ingest = AudioIngest(InputAudioFormat(sample_rate=48000, sample_format="f32le", channels=2), frame_ms=40)
+
+    # 샘플 경계에 맞지 않게 잘라 보내도 됨
+    frames = []
+    for i in range(0, len(stereo), 1001):
+        frames += ingest.process(stereo[i:i + 1001])
+    output = np.frombuffer(b"".join(frames + ingest.flush()), dtype="<i2")
+
+    assert len(output) == 16000
+    expected = StreamingResampler(48000, 16000).process(mono * 32768.0)
+    assert np.max(np.abs(output - expected)) <= 1
+
+def _fill(queue, chunks):
+    async def main():
+        for chunk in chunks:
+            await queue.put(chunk)
+        items = []
+        while queue.qsize():
+            items.append(await queue.get())
+        return items
+    return asyncio.run(main())
+
+def test_drop_oldest_keeps_newest_chunks():
+    queue = AudioInputQueue(max_chunks=3, policy="drop_oldest")
+    assert _fill(queue, [b"1", b"2", b"3", b"4", b"5"]) == [b"3", b"4", b"5"]
+    assert queue.stats()["dropped_chunks"] == 2
+
+def test_skip_to_live_keeps_only_live_window():
+    queue = AudioInputQueue(max_chunks=4, policy="skip_to_live", live_chunks=2)
+    assert _fill(queue, [b"1", b"2", b"3", b"4", b"5"]) == [b"4", b"5"]
+    assert queue.skips == 1 and queue.dropped_chunks == 3
+
+def test_end_of_stream_sentinel_is_never_dropped():
+    queue = AudioInputQueue(max_chunks=2, policy="skip_to_live", live_chunks=1)
+    assert _fill(queue, [b"1", None, b"2", b"3"]) == [None, b"3"]
+
+def test_block_policy_waits_for_consumer_and_records_lag():
+    async def main():
+        queue = AudioInputQueue(max_chunks=1, policy="block")
+        await queue.put(b"1")
+        producer = asyncio.create_task(queue.put(b"2"))
+        await asyncio.sleep(0.02)
+        assert not producer.done()
+        assert await queue.get() == b"1"
+        await producer
+        assert await queue.get() == b"2"
+        return queue
+
+    queue = asyncio.run(main())
+    stats = queue.stats()
+    assert stats["dropped_chunks"] == 0
+    assert stats["max_lag_ms"] >= 20
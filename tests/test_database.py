@@ -0,0 +1,32 @@
+import asyncio
+
+import pytest
+
+from database import Database
+from services.memory_service import memory_service
+
+def test_client_is_created_on_connect_not_at_construction():
+    database = Database("mongodb://localhost:27017", "test")
+    assert database.client is None
+    with pytest.raises(RuntimeError):
+        database.transcripts
+
+    database.connect()
+    client = database.client
+    database.connect()  # 이미 있으면 그대로 사용
+    assert database.client is client
+    assert database.transcripts.name == "transcripts"
+
+    database.close()
+    assert database.client is None and database.db is None
+
+def test_dead_letters_are_written_to_the_collection(monkeypatch):
+    inserted = []
+
+    class FakeCollection:
+        async def insert_many(self, records):
+            inserted.extend(records)
+
+    monkeypatch.setattr("database.db.db", {"memory_dead_letters": FakeCollection()})
+    asyncio.run(memory_service._store_dead_letters([{"memory_id": "m1", "content": "c"}]))
+    assert inserted == [{"memory_id": "m1", "content": "c"}]
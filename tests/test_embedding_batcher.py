@@ -0,0 +1,80 @@
+import asyncio
+from types import SimpleNamespace
+
+from services.embedder import PineconeEmbedder
+from services.memory_service import EmbeddingBatcher, MemoryService
+
+def _vector(text):
+    return [float(len(text)), float(ord(text[0]))]
+
+def test_concurrent_requests_share_one_call():
+    calls = []
+
+    async def embed_batch(texts):
+        calls.append(list(texts))
+        return [_vector(text) for text in texts]
+
+    async def main():
+        batcher = EmbeddingBatcher(embed_batch, window_ms=5, max_batch_size=32)
+        results = await asyncio.gather(*(batcher.embed(text) for text in ["a", "bb", "a", "ccc"]))
+        return batcher, results
+
+    batcher, results = asyncio.run(main())
+    # 같은 창의 중복 텍스트는 한 번만 임베딩
+    assert calls == [["a", "bb", "ccc"]]
+    assert results == [_vector("a"), _vector("bb"), _vector("a"), _vector("ccc")]
+    stats = batcher.stats()
+    assert (stats["requests"], stats["batches"], stats["inputs"]) == (4, 1, 3)
+    assert stats["batch_size_counts"] == {3: 1}
+
+def test_full_batch_is_sent_without_waiting_for_the_window():
+    calls = []
+
+    async def embed_batch(texts):
+        calls.append(list(texts))
+        return [_vector(text) for text in texts]
+
+    async def main():
+        batcher = EmbeddingBatcher(embed_batch, window_ms=10_000, max_batch_size=2)
+        return await asyncio.wait_for(asyncio.gather(batcher.embed("a"), batcher.embed("b")), timeout=1)
+
+    assert asyncio.run(main()) == [_vector("a"), _vector("b")]
+    assert calls == [["a", "b"]]
+
+def test_failed_batch_resolves_every_caller_with_empty_vector():
+    async def embed_batch(texts):
+        raise RuntimeError("inference down")
+
+    async def main():
+        batcher = EmbeddingBatcher(embed_batch, window_ms=1)
+        return await asyncio.gather(batcher.embed("a"), batcher.embed("b"))
+
+    assert asyncio.run(main()) == [[], []]
+
+def test_get_embedding_async_batches_and_caches(monkeypatch, tmp_path):
+    monkeypatch.delenv("PINECONE_API_KEY", raising=False)
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "embeddings.sqlite3"))
+    service = MemoryService()
+    calls = []
+
+    def embed(model, inputs, parameters=None):
+        calls.append(list(inputs))
+        return [SimpleNamespace(values=_vector(text)) for text in inputs]
+
+    service.embedder = PineconeEmbedder(SimpleNamespace(inference=SimpleNamespace(embed=embed)), service.embedding_model)
+
+    async def main():
+        first = await asyncio.gather(service.get_embedding_async("hello"), service.get_embedding_async("world"))
+        await asyncio.gather(*service._background_tasks)  # 디스크 기록 완료 대기
+        service.embedding_cache._memory.clear()
+        # LRU에 없으면 디스크 캐시에서 찾으므로 다시 임베딩하지 않음
+        second = await service.get_embedding_async("hello")
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first == [_vector("hello"), _vector("world")]
+    assert second == _vector("hello")
+    assert calls == [["hello", "world"]]
+    assert service.embedding_cache.stats()["disk_hits"] == 1
+    service._executor.shutdown(wait=True)
+    service.embedding_cache.close()
@@ -0,0 +1,85 @@
+import pytest
+
+from services import embedding_cache as embedding_cache_module
+from services.embedding_cache import EmbeddingCache
+
+def test_memory_hit_uses_normalized_text():
+    cache = EmbeddingCache(max_size=4)
+    cache.put("m", "  Hello   World ", [1.0, 2.0])
+
+    assert cache.get("m", "hello world") == [1.0, 2.0]
+    assert cache.get("other-model", "hello world") is None
+    assert cache.stats()["memory_hits"] == 1
+
+def test_lru_evicts_least_recently_used():
+    cache = EmbeddingCache(max_size=2)
+    cache.put("m", "a", [1.0])
+    cache.put("m", "b", [2.0])
+    cache.get("m", "a")
+    cache.put("m", "c", [3.0])
+
+    assert cache.get("m", "b") is None
+    assert cache.get("m", "a") == [1.0]
+    assert cache.get("m", "c") == [3.0]
+
+def test_expired_entries_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache_module.time, "time", lambda: now[0])
+    cache = EmbeddingCache(ttl_seconds=10)
+    cache.put("m", "a", [1.0])
+
+    now[0] += 11
+    assert cache.get("m", "a") is None
+    assert cache.stats()["size"] == 0
+
+def test_empty_vectors_are_not_cached():
+    cache = EmbeddingCache()
+    cache.put("m", "a", [])
+    assert cache.get("m", "a") is None
+
+def test_miss_is_counted_once_without_disk():
+    cache = EmbeddingCache()
+    assert not cache.has_disk
+    assert cache.get_memory("m", "a") is None
+    assert cache.get("m", "b") is None
+    assert cache.stats()["misses"] == 2
+
+def test_disk_tier_survives_restart_and_promotes_to_memory(tmp_path):
+    path = str(tmp_path / "cache" / "embeddings.sqlite3")
+    first = EmbeddingCache(disk_path=path)
+    first.put("m", "a", [0.5, -1.25])
+    first.close()
+
+    second = EmbeddingCache(disk_path=path)
+    assert second.has_disk
+    # LRU에는 없으므로 get_memory는 miss를 세지 않고 get_disk가 셈
+    assert second.get_memory("m", "a") is None
+    assert second.get_disk("m", "a") == pytest.approx([0.5, -1.25])
+    assert second.get_memory("m", "a") == pytest.approx([0.5, -1.25])
+    assert second.get_disk("m", "missing") is None
+
+    stats = second.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 1)
+    second.close()
+
+def test_put_memory_does_not_touch_disk(tmp_path):
+    cache = EmbeddingCache(disk_path=str(tmp_path / "embeddings.sqlite3"))
+    cache.put_memory("m", "a", [1.0])
+    cache._memory.clear()
+    assert cache.get("m", "a") is None
+
+    cache.put_disk("m", "a", [1.0])
+    assert cache.get("m", "a") == [1.0]
+    cache.close()
+
+def test_expired_disk_entries_are_deleted(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(embedding_cache_module.time, "time", lambda: now[0])
+    cache = EmbeddingCache(ttl_seconds=10, disk_path=str(tmp_path / "embeddings.sqlite3"))
+    cache.put_disk("m", "a", [1.0])
+
+    now[0] += 11
+    assert cache.get_disk("m", "a") is None
+    count = cache._disk.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+    assert count == 0
+    cache.close()
@@ -0,0 +1,153 @@
+import asyncio
+import io
+import os
+
+import numpy as np
+import pytest
+
+from services.audio_service import RecordingUploader, SpoolAudioRecorder, StreamingAudioRecorder
+from services.flac_encoder import StreamingFlacEncoder
+
+sf = pytest.importorskip("soundfile")
+
+class FakeBlob:
+    def __init__(self, bucket, name):
+        self.bucket = bucket
+        self.name = name
+        self.content_type = None
+
+    @property
+    def size(self):
+        return len(self.bucket.objects[self.name])
+
+    def open(self, mode):
+        blob = self
+
+        class Writer(io.BytesIO):
+            def close(self):
+                blob.bucket.objects[blob.name] = self.getvalue()
+                super().close()
+
+        return Writer()
+
+    def exists(self):
+        return self.name in self.bucket.objects
+
+    def reload(self):
+        pass
+
+    def upload_from_string(self, data):
+        self.bucket.objects[self.name] = bytes(data)
+
+    def compose(self, sources):
+        self.bucket.objects[self.name] = b"".join(self.bucket.objects[s.name] for s in sources)
+
+    def delete(self):
+        del self.bucket.objects[self.name]
+
+class FakeBucket:
+    name = "bucket"
+
+    def __init__(self):
+        self.objects = {}
+
+    def blob(self, name):
+        return FakeBlob(self, name)
+
+def _speech_like(num_samples, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(num_samples) / 16000
+    signal = 8000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 300, num_samples)
+    return signal.astype(np.int16)
+
+def _decode(data):
+    samples, sample_rate = sf.read(io.BytesIO(data), dtype="int16")
+    assert sample_rate == 16000
+    return samples
+
+@pytest.mark.parametrize("block_size", [1024, 4096, 4608])
+def test_encoder_round_trips_through_decoder(block_size):
+    samples = _speech_like(3 * block_size + 123)
+    encoder = StreamingFlacEncoder(16000, block_size)
+
+    # 블록 크기와 맞지 않는 청크로 나눠 넣어도 같은 결과
+    pcm = samples.tobytes()
+    frames = b"".join(encoder.encode(pcm[i:i + 1000]) for i in range(0, len(pcm), 1000))
+    frames += encoder.flush()
+
+    decoded = _decode(encoder.header(final=True) + frames)
+    assert np.array_equal(decoded, samples)
+    assert encoder.total_samples == len(samples)
+
+def test_silence_and_extremes_round_trip():
+    samples = np.concatenate([
+        np.zeros(4096, dtype=np.int16),
+        np.full(100, 32767, dtype=np.int16),
+        np.full(100, -32768, dtype=np.int16),
+    ])
+    encoder = StreamingFlacEncoder(16000, 4096)
+    data = encoder.encode(samples.tobytes()) + encoder.flush()
+    assert np.array_equal(_decode(encoder.header(final=True) + data), samples)
+
+def test_streamed_flac_gets_final_header_on_compose():
+    bucket = FakeBucket()
+    samples = _speech_like(10000)
+
+    async def main():
+        recorder = StreamingAudioRecorder("user", "session", bucket, recording_format="flac")
+        await recorder.append_audio_chunk(samples.tobytes())
+        return recorder, await recorder.finalize_recording()
+
+    recorder, url = asyncio.run(main())
+    assert url == f"gs://bucket/{recorder.flac_blob_name}"
+    # 임시 프레임/헤더 블롭은 지워지고 최종 파일만 남음
+    assert list(bucket.objects) == [recorder.flac_blob_name]
+    assert np.array_equal(_decode(bucket.objects[recorder.flac_blob_name]), samples)
+
+def test_streamed_flac_without_audio_leaves_no_file():
+    bucket = FakeBucket()
+
+    async def main():
+        recorder = StreamingAudioRecorder("user", "session", bucket, recording_format="flac")
+        return await recorder.finalize_recording()
+
+    assert asyncio.run(main()) is None
+    assert bucket.objects == {}
+
+def test_spool_flac_is_readable(tmp_path):
+    samples = _speech_like(10000)
+
+    async def main():
+        recorder = SpoolAudioRecorder("user", "session", "bucket", str(tmp_path), RecordingUploader(str(tmp_path)),
+                                      recording_format="flac")
+        recorder.uploader.enqueue = lambda path: None
+        await recorder.append_audio_chunk(samples.tobytes())
+        return recorder, await recorder.finalize_recording()
+
+    recorder, url = asyncio.run(main())
+    assert url.endswith(".flac")
+    with open(recorder.wav_path, "rb") as f:
+        assert np.array_equal(_decode(f.read()), samples)
+
+def test_orphaned_flac_part_keeps_written_frames(tmp_path):
+    samples = _speech_like(3 * 4096 + 500)
+
+    async def crash(pcm):
+        recorder = SpoolAudioRecorder("user", "session", "bucket", str(tmp_path), RecordingUploader(str(tmp_path)),
+                                      recording_format="flac")
+        await recorder.append_audio_chunk(pcm)
+        await recorder.writer.close()
+        recorder.cleanup()  # 남은 샘플과 헤더를 마무리하지 않고 종료
+        return recorder
+
+    recorder = asyncio.run(crash(samples.tobytes()))
+    assert RecordingUploader(str(tmp_path))._recover_orphans() == [recorder.wav_path]
+    with open(recorder.wav_path, "rb") as f:
+        # 완성된 프레임까지는 그대로 읽힘
+        assert np.array_equal(_decode(f.read()), samples[:3 * 4096])
+    os.remove(recorder.wav_path)
+
+    # 프레임이 하나도 없으면 읽을 수 없는 파일이므로 삭제
+    recorder = asyncio.run(crash(samples[:100].tobytes()))
+    assert RecordingUploader(str(tmp_path))._recover_orphans() == []
+    assert not os.path.exists(recorder.part_path)
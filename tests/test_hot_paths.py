@@ -0,0 +1,13 @@
+from benchmarks.hot_paths import compare
+
+def _result(ns, calibration):
+    return {"ns_per_call_min": ns, "calibration_ns": calibration}
+
+def test_compare_corrects_for_machine_speed():
+    baseline = {"machine": {}, "results": {"a": _result(100.0, 10.0)}}
+    # 두 배 느린 머신에서 두 배 느려진 것은 회귀가 아님
+    slower_machine = {"machine": {}, "results": {"a": _result(200.0, 20.0)}}
+    assert not compare(baseline, slower_machine, threshold=0.1)
+
+    regressed = {"machine": {}, "results": {"a": _result(130.0, 10.0), "new": _result(5.0, 10.0)}}
+    assert compare(baseline, regressed, threshold=0.1)
@@ -0,0 +1,113 @@
+import asyncio
+from types import SimpleNamespace
+
+from managers.live_connection import LiveConnection, parse_time_left
+
+class FakeContext:
+    def __init__(self, live, handle):
+        self.live = live
+        self.handle = handle
+        self.closed = False
+
+    async def __aenter__(self):
+        await asyncio.sleep(0)
+        if self.live.failures:
+            self.live.failures -= 1
+            raise ConnectionError("connect failed")
+        self.live.opened.append(self.handle)
+        return SimpleNamespace(handle=self.handle, context=self)
+
+    async def __aexit__(self, *exc_info):
+        self.closed = True
+
+class FakeLive:
+    def __init__(self, failures=0):
+        self.failures = failures
+        self.opened = []
+
+    def connect(self, model, config):
+        return FakeContext(self, config)
+
+def _connection(live, **kwargs):
+    client = SimpleNamespace(aio=SimpleNamespace(live=live))
+    # 설정 대신 핸들을 그대로 넘겨 어떤 핸들로 열었는지 확인
+    return LiveConnection(client, "model", lambda handle: handle, retry_base_delay=0, **kwargs)
+
+def _update(handle, resumable=True):
+    return SimpleNamespace(new_handle=handle, resumable=resumable)
+
+def test_parse_time_left():
+    assert parse_time_left("50s") == 50.0
+    assert parse_time_left(" 1.5s ") == 1.5
+    assert parse_time_left(3) == 3.0
+    assert parse_time_left("soon") is None
+    assert parse_time_left(None) is None
+
+def test_reconnect_uses_latest_handle_and_closes_previous():
+    live = FakeLive()
+
+    async def main():
+        async with _connection(live) as connection:
+            first = connection.session
+            assert not await connection.reconnect("error")   # 핸들이 없으면 재개 불가
+            connection.update_handle(_update("h1"))
+            connection.update_handle(_update("h2", resumable=False))
+            assert await connection.reconnect("go_away")
+            assert first.context.closed
+            return connection
+
+    connection = asyncio.run(main())
+    assert live.opened == [None, "h1"]
+    assert (connection.generation, connection.reconnects) == (1, 1)
+    assert connection.session.context.closed
+
+def test_concurrent_reconnects_switch_once():
+    live = FakeLive()
+
+    async def main():
+        async with _connection(live) as connection:
+            connection.update_handle(_update("h1"))
+            results = await asyncio.gather(connection.reconnect("error"), connection.reconnect("go_away"))
+            return connection, results
+
+    connection, results = asyncio.run(main())
+    assert results == [True, True]
+    assert live.opened == [None, "h1"]
+    assert connection.generation == 1
+
+def test_failed_resume_keeps_previous_session():
+    live = FakeLive()
+
+    async def main():
+        async with _connection(live, max_attempts=2) as connection:
+            first = connection.session
+            connection.update_handle(_update("h1"))
+            live.failures = 2
+            assert not await connection.reconnect("error")
+            assert connection.session is first and not first.context.closed
+            assert connection.ready.is_set()
+            return connection
+
+    assert asyncio.run(main()).failed_reconnects == 1
+
+def test_go_away_waits_for_idle_but_not_past_margin():
+    live = FakeLive()
+
+    async def main():
+        async with _connection(live) as connection:
+            connection.update_handle(_update("h1"))
+            idle = asyncio.Event()
+            connection.schedule_reconnect(idle, time_left=10.0, margin=0.0)
+            await asyncio.sleep(0.01)
+            assert connection.generation == 0   # 응답 중에는 전환하지 않음
+            idle.set()
+            await asyncio.sleep(0.01)
+            assert connection.generation == 1
+
+            # 응답이 끝나지 않아도 종료 margin초 전에는 전환
+            connection.update_handle(_update("h2"))
+            connection.schedule_reconnect(asyncio.Event(), time_left=0.02, margin=0.01)
+            await asyncio.sleep(0.05)
+
+    asyncio.run(main())
+    assert live.opened == [None, "h1", "h2"]
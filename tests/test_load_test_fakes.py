@@ -0,0 +1,49 @@
+import asyncio
+import datetime
+
+from benchmarks.fakes import FakeCollection, FakeLiveSession, FakeProfile, FakeVectorStore
+
+def _profile():
+    return FakeProfile(utterance_seconds=0.1, first_audio_delay=0, reply_seconds=0.04, tool_every=0, mongo_latency=0)
+
+def test_fake_model_counts_only_speech():
+    speech = b"\x10\x00" * 800   # 50ms
+    silence = b"\x00\x00" * 800
+
+    async def main():
+        session = FakeLiveSession(_profile(), reply_chunk=b"\x00\x00")
+        for data in (speech, silence, silence, silence):
+            await session.send_realtime_input(media={"data": data})
+        assert session._responding is None
+        await session.send_realtime_input(media={"data": speech})
+        responding = session._responding
+        # 응답 중에 들어온 오디오는 다음 발화로 세지 않음
+        await session.send_realtime_input(media={"data": speech * 2})
+        await responding
+        return session
+
+    session = asyncio.run(main())
+    assert session.turns == 1
+    assert session._received == 0
+
+def test_claimable_collection_hands_out_due_jobs_once():
+    async def main():
+        jobs = FakeCollection(_profile(), claimable=True)
+        now = datetime.datetime.now()
+        await jobs.insert_one({"status": "pending", "next_attempt_at": now})
+        query = {"status": "pending", "next_attempt_at": {"$lte": now}}
+        update = {"$set": {"status": "running", "owner": "me"}, "$inc": {"attempts": 1}}
+        claimed = await jobs.find_one_and_update(query, update)
+        again = await jobs.find_one_and_update(query, update)
+        unclaimable = await FakeCollection(_profile()).find_one_and_update(query, update)
+        return claimed, again, unclaimable
+
+    claimed, again, unclaimable = asyncio.run(main())
+    assert (claimed["status"], claimed["attempts"]) == ("running", 1)
+    assert again is None and unclaimable is None
+
+def test_fake_vector_store_fetch_returns_ids():
+    store = FakeVectorStore(FakeProfile(query_latency=0))
+    store.upsert([{"id": "m1", "values": [1.0], "metadata": {"user_id": "u"}},
+                  {"id": "m2", "values": [0.0], "metadata": {"user_id": "other"}}])
+    assert store.fetch_user_vectors("u", limit=10) == [("m1", [1.0], {"user_id": "u"})]
@@ -0,0 +1,82 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from services.memory_service import MemoryService
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.delenv("PINECONE_API_KEY", raising=False)
+    monkeypatch.setenv("MEMORY_MAX_CONCURRENCY", "2")
+    monkeypatch.setenv("MEMORY_CALL_TIMEOUT", "0.1")
+    service = MemoryService()
+    yield service
+    service._executor.shutdown(wait=True)
+
+def test_run_blocking_returns_result(service):
+    async def main():
+        return await service._run_blocking("add", lambda a, b: a + b, 1, 2)
+
+    assert asyncio.run(main()) == 3
+
+def test_run_blocking_returns_default_on_error(service):
+    def fail():
+        raise RuntimeError("boom")
+
+    async def main():
+        return await service._run_blocking("fail", fail, default="fallback")
+
+    assert asyncio.run(main()) == "fallback"
+
+def test_run_blocking_limits_concurrency(service):
+    running = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def work():
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        time.sleep(0.02)
+        with lock:
+            running -= 1
+        return True
+
+    async def main():
+        return await asyncio.gather(*(service._run_blocking("work", work) for _ in range(6)))
+
+    service.call_timeout = 1.0
+    assert asyncio.run(main()) == [True] * 6
+    assert peak <= service.max_concurrency
+
+def test_timed_out_call_keeps_worker_slot_until_thread_finishes(service):
+    release = threading.Event()
+    started = []
+
+    def stuck(name):
+        started.append(name)
+        release.wait(2)
+        return name
+
+    async def main():
+        # 두 호출 모두 타임아웃되지만 스레드는 계속 실행 중
+        timed_out = await asyncio.gather(
+            service._run_blocking("stuck", stuck, "a", default="timeout"),
+            service._run_blocking("stuck", stuck, "b", default="timeout"),
+        )
+        # 자리가 없으므로 세 번째 호출은 스레드 풀에 들어가지 못하고 타임아웃
+        blocked = await service._run_blocking("stuck", stuck, "c", default="timeout")
+        release.set()
+        await asyncio.sleep(0.05)
+        # 스레드가 끝나 자리가 반납되면 다시 실행됨
+        recovered = await service._run_blocking("stuck", stuck, "d", default="timeout")
+        return timed_out, blocked, recovered
+
+    timed_out, blocked, recovered = asyncio.run(main())
+    assert timed_out == ["timeout", "timeout"]
+    assert blocked == "timeout"
+    assert recovered == "d"
+    assert sorted(started) == ["a", "b", "d"]
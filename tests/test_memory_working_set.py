@@ -0,0 +1,83 @@
+import asyncio
+
+import numpy as np
+
+from services import memory_working_set as working_set_module
+from services.memory_working_set import MemoryWorkingSet
+
+def _install_fetch(monkeypatch, records, gate=None):
+    requested = []
+
+    async def fetch(user_id, limit=1000):
+        requested.append(limit)
+        if gate is not None:
+            await gate.wait()
+        return records
+
+    monkeypatch.setattr(working_set_module.memory_service, "fetch_user_memories_async", fetch)
+    return requested
+
+def test_search_ranks_by_cosine_similarity(monkeypatch):
+    records = [
+        ("m1", [1.0, 0.0], {"content": "x"}),
+        ("m2", [0.0, 2.0], {"content": "y"}),
+        ("m3", [1.0, 1.0], {"content": "xy"}),
+    ]
+    _install_fetch(monkeypatch, records)
+    working_set = MemoryWorkingSet("user", max_size=10)
+
+    assert asyncio.run(working_set.load())
+    results = working_set.search([0.0, 5.0], top_k=2)
+    assert [r.metadata["content"] for r in results] == ["y", "xy"]
+    assert np.isclose(results[0].score, 1.0)
+    assert np.isclose(results[1].score, np.sqrt(0.5))
+
+def test_load_requests_one_extra_and_falls_back_when_truncated(monkeypatch):
+    records = [(f"m{i}", [1.0, float(i)], {}) for i in range(3)]
+    requested = _install_fetch(monkeypatch, records)
+    working_set = MemoryWorkingSet("user", max_size=2)
+
+    # max_size를 넘으면 질의 결과가 일부일 수 있으므로 사용하지 않음
+    assert not asyncio.run(working_set.load())
+    assert requested == [3]
+    assert not working_set.ready
+
+def test_load_failure_keeps_working_set_disabled(monkeypatch):
+    _install_fetch(monkeypatch, None)
+    working_set = MemoryWorkingSet("user")
+
+    assert not asyncio.run(working_set.load())
+    assert not working_set.ready
+
+def test_add_grows_past_initial_capacity_and_falls_back_at_limit(monkeypatch):
+    _install_fetch(monkeypatch, [])
+    working_set = MemoryWorkingSet("user", max_size=20)
+    asyncio.run(working_set.load())
+
+    for i in range(20):
+        working_set.add([1.0, float(i)], {"i": i}, f"m{i}")
+    assert working_set.size == 20
+    assert working_set.search([0.0, 1.0], top_k=1)[0].metadata == {"i": 19}
+
+    working_set.add([1.0, 1.0], {}, "m20")
+    assert not working_set.ready
+
+def test_writes_during_load_are_applied_once(monkeypatch):
+    gate = asyncio.Event()
+    # m1은 로드 질의 결과에도 포함된 쓰기
+    records = [("m0", [1.0, 0.0], {"content": "old"}), ("m1", [0.0, 1.0], {"content": "during"})]
+    _install_fetch(monkeypatch, records, gate)
+    working_set = MemoryWorkingSet("user", max_size=10)
+
+    async def main():
+        load = asyncio.create_task(working_set.load())
+        await asyncio.sleep(0)
+        assert working_set.loading
+        working_set.add([0.0, 1.0], {"content": "during"}, "m1")
+        working_set.add([1.0, 1.0], {"content": "new"}, "m2")
+        gate.set()
+        return await load
+
+    assert asyncio.run(main())
+    assert working_set.size == 3
+    assert [r.metadata["content"] for r in working_set.search([1.0, 1.0], top_k=3)][0] == "new"
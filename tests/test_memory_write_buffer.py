@@ -0,0 +1,78 @@
+import asyncio
+
+from services.memory_service import MemoryWriteBuffer
+
+async def _embed(text):
+    return [1.0, float(len(text))]
+
+def test_add_returns_immediately_and_flushes_in_batches():
+    upserts = []
+
+    async def upsert(vectors):
+        upserts.append([vector["id"] for vector in vectors])
+        return True
+
+    async def main():
+        buffer = MemoryWriteBuffer(_embed, upsert, max_batch_size=2, flush_interval=60)
+        ids = [buffer.add("u", f"memory {i}", {}) for i in range(2)]
+        await asyncio.sleep(0.01)  # 크기 도달로 시작된 flush
+        assert upserts == [ids]
+        ids.append(buffer.add("u", "memory 2", {}))
+        await buffer.close()
+        return buffer, ids
+
+    buffer, ids = asyncio.run(main())
+    assert upserts == [ids[:2], ids[2:]]
+    assert buffer.stats()["upserted"] == 3
+
+def test_buffered_memories_are_searchable_before_upsert():
+    async def upsert(vectors):
+        return True
+
+    async def main():
+        buffer = MemoryWriteBuffer(_embed, upsert, max_batch_size=10, flush_interval=60)
+        buffer.add("u", "a", {"category": "x"})
+        buffer.add("other", "bbbb", {})
+        results = await buffer.search("u", [1.0, 1.0], top_k=5)
+        await buffer.close()
+        return results
+
+    results = asyncio.run(main())
+    assert [r.metadata["content"] for r in results] == ["a"]
+    assert results[0].metadata["user_id"] == "u"
+
+def test_failed_memories_are_retried_then_dead_lettered():
+    attempts = []
+    dead_letters = []
+
+    async def upsert(vectors):
+        attempts.append(len(vectors))
+        return False
+
+    async def failing_embed(text):
+        raise RuntimeError("embed failed")
+
+    async def dead_letter(records):
+        dead_letters.extend(records)
+
+    async def main():
+        buffer = MemoryWriteBuffer(_embed, upsert, dead_letter=dead_letter, flush_interval=60, max_attempts=2)
+        memory_id = buffer.add("u", "keep me", {})
+        await buffer.flush()
+        await buffer.flush()
+
+        broken = MemoryWriteBuffer(failing_embed, upsert, dead_letter=dead_letter, flush_interval=60)
+        broken.add("u", "no embedding", {})
+        await broken.flush()
+        return buffer, memory_id
+
+    buffer, memory_id = asyncio.run(main())
+    assert attempts == [1, 1]
+    assert [(r["memory_id"], r["content"], r["error"], r["attempts"]) for r in dead_letters[:1]] == [
+        (memory_id, "keep me", "upsert failed", 2)
+    ]
+    # 재처리할 수 있도록 임베딩도 함께 보존
+    assert dead_letters[0]["embedding"] == [1.0, 7.0]
+    assert (dead_letters[1]["content"], dead_letters[1]["embedding"]) == ("no embedding", None)
+    assert buffer.stats()["pending"] == 0
+    assert buffer.stats()["dead_lettered"] == 1
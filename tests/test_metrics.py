@@ -0,0 +1,64 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from prometheus_client.core import REGISTRY
+
+from managers.websocket_manager import OutboundWriter, WireProtocol
+from services import metrics
+from services.memory_service import EmbeddingBatcher
+
+def _value(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def test_track_latency_records_error_outcome():
+    before = _value("voice_external_call_seconds_count", service="gcs", operation="compose", outcome="error")
+    with pytest.raises(OSError):
+        with metrics.track_latency("gcs", "compose"):
+            raise OSError("boom")
+    assert _value("voice_external_call_seconds_count", service="gcs", operation="compose", outcome="error") == before + 1
+
+def test_outbound_overflow_counts_dropped_audio():
+    before = _value("voice_audio_dropped_total", queue="outbound")
+    writer = OutboundWriter(SimpleNamespace(), WireProtocol.BINARY, 24000, max_queue_size=1)
+    writer.send_audio(b"a")
+    writer.send_audio(b"b")
+    assert _value("voice_audio_dropped_total", queue="outbound") == before + 1
+
+def test_embedding_batches_are_observed():
+    requests_before = _value("voice_embedding_requests_total")
+    batches_before = _value("voice_embedding_batches_total")
+    size_before = _value("voice_embedding_batch_size_sum")
+
+    async def embed_batch(texts):
+        return [[1.0] for _ in texts]
+
+    async def main():
+        batcher = EmbeddingBatcher(embed_batch, window_ms=1)
+        await asyncio.gather(*(batcher.embed(text) for text in ["a", "b", "a"]))
+
+    asyncio.run(main())
+    assert _value("voice_embedding_requests_total") == requests_before + 3
+    assert _value("voice_embedding_batches_total") == batches_before + 1
+    assert _value("voice_embedding_batch_size_sum") == size_before + 2
+
+class FakeSession:
+    def __init__(self, audio_depth, outbound_lag):
+        self.audio_queue = SimpleNamespace(qsize=lambda: audio_depth, lag=0.1)
+        self.outbound = SimpleNamespace(queue_depth=1, lag=outbound_lag)
+        self.audio_recorder = None
+
+def test_queue_depth_is_aggregated_across_live_sessions():
+    sessions = [FakeSession(3, 0.5), FakeSession(5, 2.0)]
+    for s in sessions:
+        metrics.session_started(s)
+    try:
+        assert _value("voice_queue_depth", queue="audio_in") == 8
+        assert _value("voice_queue_depth_max", queue="audio_in") == 5
+        assert _value("voice_queue_lag_max_seconds", queue="outbound") == 2.0
+        # 세션이나 사용자 식별자는 레이블로 노출하지 않음
+        body, _ = metrics.render_latest()
+        assert b"session_id" not in body and b"user_id" not in body
+    finally:
+        for s in sessions:
+            metrics.session_finished(s, 1.0)
@@ -0,0 +1,101 @@
+import asyncio
+import datetime
+
+from fake_mongo import FakeCollection
+from services.recording_jobs import JobStatus, RecordingJobQueue
+
+def _setup(monkeypatch, execute):
+    transcripts = FakeCollection()
+    monkeypatch.setattr("database.db.db", {"transcripts": transcripts})
+    queue = RecordingJobQueue(owner="me", max_attempts=2, retry_base_delay=0)
+    queue.collection = FakeCollection()
+    sent = []
+
+    async def send_for_analysis(session_id):
+        document = await transcripts.find_one({"session_id": session_id})
+        sent.append(document.get("audio_recording_url"))
+
+    monkeypatch.setattr(queue, "_execute", execute)
+    monkeypatch.setattr(queue, "_send_for_analysis", send_for_analysis)
+    return queue, transcripts, sent
+
+async def _url(job):
+    return "gs://bucket/a.wav"
+
+def test_transcript_is_patched_before_job_is_done_and_sent(monkeypatch):
+    queue, transcripts, sent = _setup(monkeypatch, _url)
+
+    async def main():
+        await transcripts.insert_one({"session_id": "s"})
+        await queue.enqueue("compose_wav", "s", {})
+        assert await queue._run_next()
+        assert not await queue._run_next()
+
+    asyncio.run(main())
+    job = queue.collection.documents[0]
+    assert job["status"] == JobStatus.DONE
+    assert "owner" not in job and "lease_until" not in job
+    assert sent == ["gs://bucket/a.wav"]
+
+def test_patch_failure_retries_instead_of_completing(monkeypatch):
+    queue, transcripts, sent = _setup(monkeypatch, _url)
+
+    async def main():
+        await transcripts.insert_one({"session_id": "s"})
+        await queue.enqueue("compose_wav", "s", {})
+        transcripts.fail_next = 1
+        await queue._run_next()
+        assert queue.collection.documents[0]["status"] == JobStatus.PENDING
+        assert sent == []
+        await queue._run_next()
+
+    asyncio.run(main())
+    assert queue.collection.documents[0]["status"] == JobStatus.DONE
+    assert sent == ["gs://bucket/a.wav"]
+
+def test_dead_job_is_sent_without_recording(monkeypatch):
+    async def fail(job):
+        raise OSError("compose failed")
+
+    queue, transcripts, sent = _setup(monkeypatch, fail)
+
+    async def main():
+        await transcripts.insert_one({"session_id": "s"})
+        await queue.enqueue("compose_wav", "s", {})
+        await queue._run_next()
+        await queue._run_next()
+
+    asyncio.run(main())
+    job = queue.collection.documents[0]
+    assert (job["status"], job["attempts"], job["last_error"]) == (JobStatus.DEAD, 2, "compose failed")
+    assert sent == [None]
+
+def test_result_is_not_recorded_after_losing_the_lease(monkeypatch):
+    async def execute(job):
+        # 점유가 만료되어 다른 인스턴스가 가져감
+        queue.collection.documents[0]["owner"] = "other"
+        return None
+
+    queue, transcripts, sent = _setup(monkeypatch, execute)
+
+    async def main():
+        await queue.enqueue("compose_wav", "s", {})
+        await queue._run_next()
+
+    asyncio.run(main())
+    assert queue.collection.documents[0]["status"] == JobStatus.RUNNING
+    assert sent == []
+
+def test_only_expired_running_jobs_are_requeued(monkeypatch):
+    queue, _, _ = _setup(monkeypatch, _url)
+    now = datetime.datetime.now()
+    queue.collection.documents = [
+        {"_id": "expired", "status": JobStatus.RUNNING, "owner": "dead", "lease_until": now - datetime.timedelta(seconds=1)},
+        {"_id": "legacy", "status": JobStatus.RUNNING},
+        {"_id": "leased", "status": JobStatus.RUNNING, "owner": "other", "lease_until": now + datetime.timedelta(minutes=5)},
+    ]
+
+    asyncio.run(queue._requeue_expired())
+    statuses = {job["_id"]: job["status"] for job in queue.collection.documents}
+    assert statuses == {"expired": JobStatus.PENDING, "legacy": JobStatus.PENDING, "leased": JobStatus.RUNNING}
+    assert "owner" not in queue.collection.documents[0]
@@ -0,0 +1,61 @@
+import asyncio
+import threading
+
+from services.audio_service import RecordingWriter
+
+def test_chunks_are_written_in_order_and_drained_on_close():
+    written = []
+
+    async def main():
+        writer = RecordingWriter(written.append, max_queue_size=16)
+        for i in range(5):
+            assert await writer.submit(bytes([i]))
+        await writer.close()
+        # 닫힌 뒤에는 받지 않음
+        assert not await writer.submit(b"x")
+        return writer
+
+    writer = asyncio.run(main())
+    assert b"".join(written) == bytes(range(5))
+    assert writer.stats()["written_chunks"] == 5
+    assert writer.stats()["queue_depth"] == 0
+
+def test_overflow_policies():
+    async def run(policy):
+        gate = threading.Event()
+        written = []
+
+        def write(data):
+            gate.wait(timeout=1)
+            written.append(data)
+
+        writer = RecordingWriter(write, max_queue_size=2, overflow_policy=policy)
+        await writer.submit(b"a")
+        await asyncio.sleep(0.01)  # writer가 a를 꺼내 기록 중 (대기)
+        results = [await writer.submit(chunk) for chunk in (b"b", b"c", b"d")]
+        gate.set()
+        await writer.close()
+        return results, b"".join(written), writer.dropped_chunks
+
+    assert asyncio.run(run("drop_oldest")) == ([True, True, True], b"acd", 1)
+    assert asyncio.run(run("drop_newest")) == ([True, True, False], b"abc", 1)
+
+def test_failed_write_is_counted_and_writer_keeps_going():
+    written = []
+
+    def write(data):
+        if data == b"bad":
+            raise OSError("upload failed")
+        written.append(data)
+
+    async def main():
+        writer = RecordingWriter(write)
+        await writer.submit(b"bad")
+        await asyncio.sleep(0.01)
+        await writer.submit(b"good")
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(main())
+    assert written == [b"good"]
+    assert writer.failed_writes == 1
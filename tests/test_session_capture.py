@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+from google.genai import types
+
+from services.session_capture import (
+    CaptureRecordType, SessionCaptureWriter, decode_live_event, encode_live_event, read_capture,
+)
+
+def _audio_event(data):
+    return types.LiveServerMessage(server_content=types.LiveServerContent(
+        model_turn=types.Content(role="model", parts=[types.Part(inline_data=types.Blob(
+            data=data, mime_type="audio/pcm;rate=24000"
+        ))]),
+        output_transcription=types.Transcription(text="안녕하세요"),
+    ))
+
+def test_live_event_round_trip_keeps_audio_as_raw_bytes():
+    audio = bytes(range(256)) * 8
+    payload = encode_live_event(_audio_event(audio))
+
+    # 오디오는 base64가 아니라 원본 바이트 그대로 들어감
+    assert audio in payload
+    assert len(payload) < len(audio) * 4 / 3
+    decoded = decode_live_event(payload)
+    assert decoded.server_content.model_turn.parts[0].inline_data.data == audio
+    assert decoded.server_content.output_transcription.text == "안녕하세요"
+
+def test_capture_file_round_trip(tmp_path):
+    async def main():
+        writer = SessionCaptureWriter(str(tmp_path / "s.vcap"), {"session_id": "s", "sample_rate": 16000})
+        await writer.client_audio(b"\x01\x02")
+        await writer.live_event(_audio_event(b"\x03\x04"))
+        await writer.client_end()
+        await writer.close()
+        return writer
+
+    writer = asyncio.run(main())
+    metadata, records = read_capture(writer.path)
+    assert metadata == {"session_id": "s", "sample_rate": 16000}
+    assert [r.kind for r in records] == [CaptureRecordType.CLIENT_AUDIO, CaptureRecordType.LIVE_EVENT, CaptureRecordType.CLIENT_END]
+    assert records[0].payload == b"\x01\x02"
+    assert records[1].live_event().server_content.model_turn.parts[0].inline_data.data == b"\x03\x04"
+    assert [r.timestamp for r in records] == sorted(r.timestamp for r in records)
+
+def test_truncated_last_record_is_ignored(tmp_path):
+    async def main():
+        writer = SessionCaptureWriter(str(tmp_path / "s.vcap"), {})
+        await writer.client_audio(b"\x01" * 100)
+        await writer.client_audio(b"\x02" * 100)
+        await writer.close()
+        return writer.path
+
+    path = asyncio.run(main())
+    with open(path, "r+b") as f:
+        f.truncate(f.seek(0, 2) - 10)
+    _, records = read_capture(path)
+    assert [r.payload for r in records] == [b"\x01" * 100]
+
+def test_non_capture_file_is_rejected(tmp_path):
+    path = tmp_path / "x.vcap"
+    path.write_bytes(b"RIFF0000")
+    with pytest.raises(ValueError):
+        read_capture(str(path))
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import wave
+
+import pytest
+
+from services.audio_service import RecordingUploader, SpoolAudioRecorder
+
+class FakeUploader:
+    def __init__(self):
+        self.paths = []
+
+    def enqueue(self, path):
+        self.paths.append(path)
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_spool_file_is_a_complete_wav(tmp_path, use_mmap):
+    uploader = FakeUploader()
+    pcm = bytes(range(256)) * 40
+
+    async def main():
+        recorder = SpoolAudioRecorder("user", "session", "bucket", str(tmp_path), uploader,
+                                      use_mmap=use_mmap, mmap_grow_bytes=1024)
+        for i in range(0, len(pcm), 1000):
+            await recorder.append_audio_chunk(pcm[i:i + 1000])
+        return recorder, await recorder.finalize_recording()
+
+    recorder, url = asyncio.run(main())
+    assert url == f"gs://bucket/{recorder.wav_blob_name}"
+    assert uploader.paths == [recorder.wav_path]
+    assert not os.path.exists(recorder.part_path)
+    with wave.open(recorder.wav_path, "rb") as wav:
+        assert wav.getnframes() == len(pcm) // 2
+        assert wav.readframes(wav.getnframes()) == pcm
+
+def test_empty_recording_is_discarded(tmp_path):
+    uploader = FakeUploader()
+
+    async def main():
+        recorder = SpoolAudioRecorder("user", "session", "bucket", str(tmp_path), uploader)
+        return recorder, await recorder.finalize_recording()
+
+    recorder, url = asyncio.run(main())
+    assert url is None
+    assert uploader.paths == []
+    assert not os.path.exists(recorder.part_path)
+
+def test_orphaned_part_file_is_repaired_on_startup(tmp_path):
+    pcm = b"\x01\x02" * 3000
+
+    async def crash():
+        recorder = SpoolAudioRecorder("user", "session", "bucket", str(tmp_path), FakeUploader(),
+                                      use_mmap=True, mmap_grow_bytes=4096)
+        await recorder.append_audio_chunk(pcm)
+        await recorder.writer.close()
+        recorder.cleanup()  # 헤더를 마무리하지 않고 종료
+        return recorder
+
+    recorder = asyncio.run(crash())
+    recovered = RecordingUploader(str(tmp_path))._recover_orphans()
+    assert recovered == [recorder.wav_path]
+    with wave.open(recorder.wav_path, "rb") as wav:
+        assert wav.readframes(wav.getnframes()) == pcm
@@ -0,0 +1,133 @@
+import asyncio
+import datetime
+
+from fake_mongo import FakeCollection
+from models.models import ConversationLog, ConversationTurn, SpeakerEnum, TurnLatency
+from services.transcript_writer import TranscriptWriter
+
+START = datetime.datetime(2026, 1, 1, 12, 0)
+
+def _writer(collection, latencies=None, max_pending_turns=20, flush_interval=10.0):
+    log = ConversationLog(user_id="user", start_time=START, conversation=[])
+    return TranscriptWriter(collection, log, latencies if latencies is not None else [],
+                            max_pending_turns=max_pending_turns, flush_interval=flush_interval)
+
+def _turn(i):
+    return ConversationTurn(speaker=SpeakerEnum.PATIENT if i % 2 == 0 else SpeakerEnum.AI, content=f"t{i}")
+
+def test_turns_are_appended_once_and_closed():
+    collection = FakeCollection()
+    latencies = []
+    writer = _writer(collection, latencies)
+
+    async def main():
+        await writer.create()
+        for i in range(3):
+            writer.add(_turn(i))
+        latencies.append(TurnLatency(turn_index=0, started_at=START))
+        await writer.flush()
+        assert writer.pending == []
+        writer.add(_turn(3))
+        latencies.append(TurnLatency(turn_index=1, started_at=START))
+        await writer.close(START + datetime.timedelta(minutes=1))
+
+    asyncio.run(main())
+    [document] = collection.documents
+    assert [turn["content"] for turn in document["conversation"]] == ["t0", "t1", "t2", "t3"]
+    assert [latency["turn_index"] for latency in document["turn_latencies"]] == [0, 1]
+    assert document["end_time"] == START + datetime.timedelta(minutes=1)
+    assert document["user_id"] == "user"
+    assert writer.stats()["flushes"] == 2
+
+def test_failed_create_is_recovered_by_next_flush():
+    collection = FakeCollection()
+    collection.fail_next = 1
+    writer = _writer(collection)
+
+    async def main():
+        try:
+            await writer.create()
+        except RuntimeError:
+            pass
+        writer.add(_turn(0))
+        await writer.flush()
+
+    asyncio.run(main())
+    [document] = collection.documents
+    assert document["session_id"] == writer.session_id
+    assert document["start_time"] == START
+    assert [turn["content"] for turn in document["conversation"]] == ["t0"]
+
+def test_failed_flush_keeps_turns_for_retry():
+    collection = FakeCollection()
+    writer = _writer(collection)
+
+    async def main():
+        await writer.create()
+        writer.add(_turn(0))
+        collection.fail_next = 1
+        try:
+            await writer.flush()
+        except RuntimeError:
+            pass
+        assert writer.turn_count == 1 and len(writer.pending) == 1
+        await writer.flush()
+
+    asyncio.run(main())
+    assert [turn["content"] for turn in collection.documents[0]["conversation"]] == ["t0"]
+
+def test_cancelled_write_finishes_before_close():
+    gate = asyncio.Event()
+
+    class SlowCollection(FakeCollection):
+        async def update_one(self, query, update, upsert=False):
+            if "$push" in update and not gate.is_set():
+                await gate.wait()
+            return await super().update_one(query, update, upsert)
+
+    collection = SlowCollection()
+    writer = _writer(collection)
+
+    async def main():
+        await writer.create()
+        writer.add(_turn(0))
+        flush = asyncio.create_task(writer.flush())
+        await asyncio.sleep(0)
+        # 세션 태스크가 취소돼도 진행 중인 쓰기는 이어서 끝남
+        flush.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        await writer.close(START)
+
+    asyncio.run(main())
+    document = collection.documents[0]
+    assert [turn["content"] for turn in document["conversation"]] == ["t0"]
+    assert document["end_time"] == START
+
+def test_run_flushes_when_enough_turns_are_pending():
+    collection = FakeCollection()
+    writer = _writer(collection, max_pending_turns=2, flush_interval=60.0)
+
+    async def main():
+        task = asyncio.create_task(writer.run())
+        await asyncio.sleep(0)
+        writer.add(_turn(0))
+        writer.add(_turn(1))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        task.cancel()
+        return writer.turns_written
+
+    assert asyncio.run(main()) == 2
+    assert len(collection.documents[0]["conversation"]) == 2
+
+def test_discard_removes_document():
+    collection = FakeCollection()
+    writer = _writer(collection)
+
+    async def main():
+        await writer.create()
+        await writer.discard()
+
+    asyncio.run(main())
+    assert collection.documents == []
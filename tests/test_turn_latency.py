@@ -0,0 +1,69 @@
+import pytest
+
+from services import turn_latency as turn_latency_module
+from services.turn_latency import TurnLatencyTracker
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(turn_latency_module.time, "monotonic", lambda: now[0])
+    return now
+
+def test_ttfa_is_measured_from_last_input_transcript(clock):
+    tracker = TurnLatencyTracker()
+    tracker.input_transcript()
+    clock[0] += 1.0
+    tracker.input_transcript()
+    clock[0] += 0.4
+    tracker.model_audio()
+    clock[0] += 0.1
+    tracker.model_audio()
+    clock[0] += 2.0
+    tracker.turn_complete()
+
+    turn = tracker.turns[0]
+    assert (turn.ttfa_ms, turn.first_audio_ms, turn.duration_ms) == (400, 1400, 3500)
+    assert not turn.interrupted
+
+def test_tool_time_is_counted_and_starts_the_turn(clock):
+    tracker = TurnLatencyTracker()
+    clock[0] += 0.3
+    # 0.3초 걸린 도구 호출 처리 2개가 끝난 시점
+    tracker.tool_calls(2, 0.3)
+    clock[0] += 0.2
+    tracker.model_audio()
+    tracker.turn_complete()
+
+    turn = tracker.turns[0]
+    assert (turn.tool_calls, turn.tool_ms, turn.first_audio_ms) == (2, 300, 500)
+    assert turn.ttfa_ms is None
+
+def test_barge_in_becomes_next_turn_input(clock):
+    tracker = TurnLatencyTracker()
+    tracker.input_transcript()
+    clock[0] += 0.5
+    tracker.model_audio()
+    clock[0] += 1.0
+    tracker.input_transcript()   # 모델이 말하는 중에 끼어듦
+    clock[0] += 0.2
+    tracker.interrupted()
+    clock[0] += 0.3
+    tracker.model_audio()
+    tracker.turn_complete()
+
+    first, second = tracker.turns
+    assert first.interrupted and first.ttfa_ms == 500
+    assert (second.turn_index, second.ttfa_ms, second.first_audio_ms) == (1, 500, 500)
+    assert tracker.stats()["interrupted"] == 1
+
+def test_close_records_only_started_responses(clock):
+    tracker = TurnLatencyTracker()
+    tracker.input_transcript()
+    tracker.close()
+    assert tracker.turns == []
+
+    tracker.input_transcript()
+    clock[0] += 0.2
+    tracker.model_audio()
+    tracker.close()
+    assert len(tracker.turns) == 1 and tracker.turns[0].duration_ms is None
@@ -0,0 +1,48 @@
+import numpy as np
+
+from services.embedder import LocalEmbedder
+from services.vector_store import LocalVectorStore
+
+def _vector(*values):
+    return list(values) + [0.0] * (4 - len(values))
+
+def test_query_filters_by_user_and_ranks_by_cosine(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=4)
+    store.upsert([
+        {"id": "a", "values": _vector(1.0), "metadata": {"user_id": "u1", "content": "a"}},
+        {"id": "b", "values": _vector(1.0, 1.0), "metadata": {"user_id": "u1", "content": "b"}},
+        {"id": "c", "values": _vector(1.0), "metadata": {"user_id": "u2", "content": "c"}},
+    ])
+
+    results = store.query(_vector(0.0, 3.0), top_k=5, user_id="u1")
+    assert [r.metadata["content"] for r in results] == ["b", "a"]
+    assert np.isclose(results[0].score, np.sqrt(0.5))
+    assert len(store.query(_vector(1.0), top_k=5)) == 3
+    store.close()
+
+def test_upsert_overwrites_and_reopens_from_disk(tmp_path):
+    store = LocalVectorStore(str(tmp_path), dimension=4, initial_capacity=2)
+    for i in range(5):
+        store.upsert([{"id": f"m{i}", "values": _vector(1.0, float(i)), "metadata": {"user_id": "u", "i": i}}])
+    # 같은 id는 덮어쓰고 다른 사용자로 옮겨짐
+    store.upsert([{"id": "m0", "values": _vector(0.0, 0.0, 1.0), "metadata": {"user_id": "v", "i": 0}}])
+    store.close()
+
+    reopened = LocalVectorStore(str(tmp_path), dimension=4)
+    records = reopened.fetch_user_vectors("u", limit=10)
+    assert [memory_id for memory_id, _, _ in records] == ["m1", "m2", "m3", "m4"]
+    assert [metadata["i"] for _, _, metadata in records] == [1, 2, 3, 4]
+    assert reopened.fetch_user_vectors("v", limit=10)[0][1] == _vector(0.0, 0.0, 1.0)
+    assert len(reopened.fetch_user_vectors("u", limit=2)) == 2
+    reopened.close()
+
+def test_local_embedder_is_deterministic_and_normalized():
+    embedder = LocalEmbedder(64)
+    first, second, other, empty = embedder.embed(["오늘 날씨 좋다", "오늘  날씨 좋다", "강아지 산책", "  "])
+
+    assert first == second
+    assert np.isclose(np.linalg.norm(first), 1.0)
+    assert empty == []
+    # 같은 단어가 겹치는 텍스트가 더 가까움
+    similar = embedder.embed(["오늘 날씨"])[0]
+    assert np.dot(first, similar) > np.dot(other, similar)
@@ -0,0 +1,59 @@
+import numpy as np
+
+from services.voice_activity import VoiceActivityDetector
+
+CHUNK = 1600  # 16kHz에서 100ms
+
+def _speech(seed=0):
+    t = (np.arange(CHUNK) + seed * CHUNK) / 16000
+    return (8000 * np.sin(2 * np.pi * 200 * t)).astype("<i2").tobytes()
+
+def _silence():
+    return np.zeros(CHUNK, dtype="<i2").tobytes()
+
+def _hiss(level=330):
+    # 약 -40dBFS 백색 잡음: 에너지는 임계값을 넘지만 영교차율이 높아 발화가 아님
+    return np.random.default_rng(0).normal(0, level, CHUNK).astype("<i2").tobytes()
+
+def test_leading_silence_is_held_and_sent_as_preroll():
+    vad = VoiceActivityDetector(preroll_ms=200)
+    silences = [_silence() for _ in range(5)]
+    assert all(vad.process(chunk).send == [] for chunk in silences)
+
+    speech = _speech()
+    result = vad.process(speech)
+    assert result.is_speech
+    # 직전 200ms(2청크)가 발화 앞에 붙음
+    assert result.send == silences[-2:] + [speech]
+
+def test_hangover_then_throttle_then_single_stream_end():
+    vad = VoiceActivityDetector(hangover_ms=600, throttle_interval_ms=500, stream_end_ms=2000)
+    vad.process(_speech())
+
+    results = [vad.process(_silence()) for _ in range(25)]
+    sent = [bool(result.send) for result in results]
+    assert sent[:6] == [True] * 6                     # 행오버 600ms
+    assert sent[6:19] == [False, False, False, False, True, False, False, False, False, True, False, False, False]
+    assert [i for i, result in enumerate(results) if result.end_stream] == [19]
+    assert not any(sent[19:])
+
+def test_suppress_mode_sends_nothing_after_hangover():
+    vad = VoiceActivityDetector(mode="suppress", hangover_ms=350)
+    vad.process(_speech())
+    sent = [bool(vad.process(_silence()).send) for _ in range(15)]
+    assert sent == [True] * 3 + [False] * 12
+
+def test_high_zero_crossing_noise_is_not_speech():
+    vad = VoiceActivityDetector()
+    assert not vad.process(_hiss()).is_speech
+    assert vad.process(_speech()).is_speech
+
+def test_stats_report_saved_bytes():
+    vad = VoiceActivityDetector(mode="suppress", hangover_ms=0)
+    vad.process(_speech())
+    for _ in range(3):
+        vad.process(_silence())
+
+    stats = vad.stats()
+    assert stats["chunks_in"] == 4 and stats["chunks_sent"] == 1
+    assert stats["bytes_saved"] == 3 * CHUNK * 2
@@ -0,0 +1,122 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+
+import numpy as np
+
+from managers.websocket_manager import (
+    BINARY_HEADER, BinaryFrameType, OutboundWriter, PayloadManager, WireProtocol,
+)
+
+def _websocket(query):
+    return SimpleNamespace(url=SimpleNamespace(query=query))
+
+def test_negotiate_defaults_to_json():
+    assert WireProtocol.negotiate(_websocket("protocol=binary&token=x")) == WireProtocol.BINARY
+    assert WireProtocol.negotiate(_websocket("protocol=msgpack")) == WireProtocol.JSON
+    assert WireProtocol.negotiate(_websocket("")) == WireProtocol.JSON
+
+def test_binary_frame_header_round_trip():
+    pcm = np.arange(-5, 5, dtype="<i2").tobytes()
+    frame = PayloadManager.to_binary_frame(BinaryFrameType.AUDIO_PCM16, 70000, 24000, pcm)
+
+    frame_type, flags, sequence, sample_rate = BINARY_HEADER.unpack_from(frame)
+    assert (frame_type, flags, sequence, sample_rate) == (BinaryFrameType.AUDIO_PCM16, 0, 70000 & 0xFFFF, 24000)
+    # 8바이트 헤더 뒤의 페이로드는 그대로 Int16 배열로 읽힘
+    assert np.array_equal(np.frombuffer(frame, dtype="<i2", offset=BINARY_HEADER.size), np.arange(-5, 5))
+
+class FakeWebSocket:
+    def __init__(self, gate=None):
+        self.sent = []
+        self.gate = gate
+
+    async def _send(self, message):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.sent.append(message)
+
+    async def send_text(self, message):
+        await self._send(message)
+
+    async def send_bytes(self, message):
+        await self._send(message)
+
+async def _drain(writer, delay=0.01):
+    task = asyncio.create_task(writer.run())
+    await asyncio.sleep(delay)
+    task.cancel()
+
+def test_queued_audio_is_merged_and_text_keeps_its_place():
+    websocket = FakeWebSocket()
+    writer = OutboundWriter(websocket, WireProtocol.BINARY, 24000)
+    writer.send_audio(b"\x01\x00")
+    writer.send_audio(b"\x02\x00")
+    writer.send_text("transcript")
+    writer.send_audio(b"\x03\x00")
+    asyncio.run(_drain(writer))
+
+    assert len(websocket.sent) == 3
+    first, text, last = websocket.sent
+    assert first[BINARY_HEADER.size:] == b"\x01\x00\x02\x00" and text == "transcript"
+    assert [BINARY_HEADER.unpack_from(frame)[2] for frame in (first, last)] == [0, 1]
+    assert writer.stats()["audio_messages_out"] == 2
+
+def test_coalesce_max_bytes_splits_messages():
+    websocket = FakeWebSocket()
+    writer = OutboundWriter(websocket, WireProtocol.BINARY, 24000, coalesce_max_bytes=4)
+    for _ in range(3):
+        writer.send_audio(b"\x00\x00")
+    asyncio.run(_drain(writer))
+
+    assert [len(frame) - BINARY_HEADER.size for frame in websocket.sent] == [4, 2]
+
+def test_json_protocol_sends_base64_audio():
+    websocket = FakeWebSocket()
+    writer = OutboundWriter(websocket, WireProtocol.JSON, 24000)
+    writer.send_audio(b"\x01\x02")
+    asyncio.run(_drain(writer))
+
+    payload = PayloadManager.from_payload(websocket.sent[0])
+    assert payload == {"type": "audio", "data": base64.b64encode(b"\x01\x02").decode()}
+
+def test_full_queue_drops_oldest_audio_but_keeps_text():
+    writer = OutboundWriter(FakeWebSocket(), WireProtocol.BINARY, 24000, max_queue_size=3)
+    writer.send_audio(b"a")
+    writer.send_text("t1")
+    writer.send_audio(b"b")
+    writer.send_text("t2")
+    writer.send_text("t3")
+    # 큐가 텍스트로만 가득 차면 새 오디오를 버림
+    writer.send_audio(b"c")
+
+    assert [data for _, data, _ in writer._items] == ["t1", "t2", "t3"]
+    assert writer.dropped_audio == 3
+
+def test_purge_audio_keeps_control_events():
+    writer = OutboundWriter(FakeWebSocket(), WireProtocol.BINARY, 24000)
+    writer.send_audio(b"a")
+    writer.send_text("interrupt")
+    writer.send_audio(b"b")
+
+    assert writer.purge_audio() == 2
+    assert [data for _, data, _ in writer._items] == ["interrupt"]
+
+def test_stalled_client_is_flagged_as_slow_consumer():
+    async def main():
+        gate = asyncio.Event()
+        writer = OutboundWriter(FakeWebSocket(gate), WireProtocol.BINARY, 24000, slow_consumer_seconds=0.01)
+        task = asyncio.create_task(writer.run())
+        writer.send_audio(b"a")
+        writer.send_audio(b"b")
+        await asyncio.sleep(0)
+        # 첫 메시지 전송이 막힌 동안 다음 항목이 밀림
+        writer.send_text("t")
+        await asyncio.sleep(0.03)
+        gate.set()
+        await asyncio.sleep(0.01)
+        task.cancel()
+        return writer
+
+    writer = asyncio.run(main())
+    assert writer.slow_consumer_events == 1
+    assert writer.stats()["max_lag_ms"] >= 10